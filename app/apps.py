@@ -6,4 +6,5 @@ class AppConfig(AppConfig):
     name = 'app'
 
     def ready(self):
+        import app.checks
         import app.signals
\ No newline at end of file
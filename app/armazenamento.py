@@ -0,0 +1,134 @@
+import hashlib
+import posixpath
+import re
+from urllib.request import urlopen
+
+from cloudinary import CloudinaryResource, api, uploader
+from cloudinary.exceptions import NotFound
+from cloudinary.models import CLOUDINARY_FIELD_DB_RE
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage, Storage, storages
+from django.utils.deconstruct import deconstructible
+from django.utils.functional import LazyObject
+
+# Limite de public_ids por chamada do Admin API do Cloudinary
+LOTE_CLOUDINARY = 100
+PASTA_CLOUDINARY = 'media/banners'
+TIMEOUT_CLOUDINARY = 30
+
+armazenamento_local = FileSystemStorage()
+
+
+@deconstructible
+class ArmazenamentoLocal(FileSystemStorage):
+    # Endereçado por conteúdo: o nome é o hash do arquivo, então reenviar o mesmo banner
+    # (ou usá-lo em outro evento) não grava nada e aponta para o arquivo que já existe
+    def __init__(self, **kwargs):
+        kwargs.setdefault('allow_overwrite', True)
+        super().__init__(**kwargs)
+
+    def _save(self, name, content):
+        digest = hashlib.sha256()
+        for bloco in content.chunks():
+            digest.update(bloco)
+        content.seek(0)
+        hash_conteudo = digest.hexdigest()[:32]
+        pasta, arquivo = posixpath.split(name)
+        extensao = posixpath.splitext(arquivo)[1].lower()
+        nome = posixpath.join(pasta, hash_conteudo[:2], f'{hash_conteudo}{extensao}')
+        if self.exists(nome):
+            return nome
+        # Dois envios simultâneos do mesmo conteúdo gravam os mesmos bytes; sobrescrever é inofensivo
+        return super()._save(nome, content)
+
+    def get_available_name(self, name, max_length=None):
+        return name
+
+
+def recurso_cloudinary(nome):
+    # Aceita tanto "image/upload/v1/media/banners/x.png" quanto só o public_id, como o CloudinaryField
+    m = re.match(CLOUDINARY_FIELD_DB_RE, nome)
+    return CloudinaryResource(
+        type=m.group('type') or 'upload',
+        resource_type=m.group('resource_type') or 'image',
+        version=m.group('version'),
+        public_id=m.group('public_id'),
+        format=m.group('format'),
+    )
+
+
+@deconstructible
+class ArmazenamentoCloudinary(Storage):
+    def __init__(self, pasta=PASTA_CLOUDINARY):
+        self.pasta = pasta
+
+    def _save(self, name, content):
+        content.seek(0)
+        # O Cloudinary escolhe o public_id; o nome gravado no banco segue o formato do CloudinaryField
+        return uploader.upload_resource(content, folder=self.pasta, resource_type='image').get_prep_value()
+
+    def _open(self, name, mode='rb'):
+        # Baixa o original pela URL de entrega; usado só fora do caminho das requisições
+        with urlopen(self.url(name), timeout=TIMEOUT_CLOUDINARY) as resposta:
+            return ContentFile(resposta.read(), name=posixpath.basename(name))
+
+    def get_available_name(self, name, max_length=None):
+        return name
+
+    def exists(self, name):
+        recurso = recurso_cloudinary(name)
+        try:
+            api.resource(recurso.public_id, type=recurso.type, resource_type=recurso.resource_type)
+        except NotFound:
+            return False
+        return True
+
+    def url(self, name):
+        return recurso_cloudinary(name).build_url()
+
+    def url_redimensionada(self, name, largura, altura):
+        # O Cloudinary redimensiona e escolhe o formato pela URL
+        return recurso_cloudinary(name).build_url(
+            width=largura, height=altura, crop='fill', fetch_format='auto', quality='auto',
+        )
+
+    def delete(self, name):
+        uploader.destroy(recurso_cloudinary(name).public_id, invalidate=True)
+
+    def apagar_em_lote(self, nomes):
+        public_ids = [recurso_cloudinary(nome).public_id for nome in nomes]
+        for inicio in range(0, len(public_ids), LOTE_CLOUDINARY):
+            api.delete_resources(public_ids[inicio:inicio + LOTE_CLOUDINARY])
+
+
+class ArmazenamentoBanners(LazyObject):
+    # Resolve STORAGES['banners'] no primeiro uso; os testes trocam o backend com override_settings
+    def _setup(self):
+        self._wrapped = storages['banners']
+
+
+armazenamento_banners = ArmazenamentoBanners()
+
+
+def obter_armazenamento_banners():
+    return armazenamento_banners
+
+
+def apagar_banners(nomes, em_uso):
+    # em_uso(nomes) devolve os nomes ainda referenciados; é consultado o mais perto possível da remoção
+    nomes = sorted(set(nomes))
+    if hasattr(armazenamento_banners, 'apagar_em_lote'):
+        # Cloudinary: uma conferência e chamadas de até LOTE_CLOUDINARY public_ids para o lote todo
+        referenciados = em_uso(nomes)
+        apagados = [nome for nome in nomes if nome not in referenciados]
+        if apagados:
+            armazenamento_banners.apagar_em_lote(apagados)
+        return apagados
+
+    # Disco local: o nome vem do conteúdo e um upload idêntico pode reaproveitá-lo a qualquer momento
+    apagados = []
+    for nome in nomes:
+        if not em_uso([nome]):
+            armazenamento_banners.delete(nome)
+            apagados.append(nome)
+    return apagados
@@ -0,0 +1,58 @@
+from django.db import transaction
+from django.db.models.fields.files import FieldFile
+
+from app.armazenamento import apagar_banners
+from app.filas import registrar_falha, reservar_lote
+from app.imagens import apagar_rendicoes, e_rendicao, hash_da_rendicao
+from app.models import Evento, RemocaoBanner
+
+LOTE_REMOCAO = 100
+
+
+def nome_do_banner(valor):
+    # Arquivo ainda não enviado ao storage não tem nome definitivo
+    if isinstance(valor, FieldFile):
+        return valor.name if valor and valor._committed else None
+    return valor if isinstance(valor, str) and valor else None
+
+
+def agendar_remocao_banners(nomes):
+    nomes = [nome for nome in nomes if nome]
+    if not nomes:
+        return
+
+    # Só entra na fila depois do commit: se a transação for desfeita, o banner continua válido
+    transaction.on_commit(lambda: RemocaoBanner.objects.bulk_create(
+        RemocaoBanner(nome=nome) for nome in nomes
+    ))
+
+
+def banners_em_uso(nomes):
+    return set(Evento.objects.filter(imagem_banner__in=nomes).values_list('imagem_banner', flat=True))
+
+
+def rendicoes_em_uso(nomes):
+    hashes = {hash_da_rendicao(nome) for nome in nomes}
+    em_uso = set(Evento.objects.filter(banner_hash__in=hashes).values_list('banner_hash', flat=True))
+    return {nome for nome in nomes if hash_da_rendicao(nome) in em_uso}
+
+
+def processar_remocoes(tamanho_lote=LOTE_REMOCAO):
+    lote = reservar_lote(RemocaoBanner.objects.all(), tamanho_lote)
+    if not lote:
+        return 0, 0
+
+    # Fora de transação: a reserva do lote já o protege de outros workers, e segurar o lock de escrita
+    # (IMMEDIATE no SQLite) durante as chamadas ao Cloudinary travaria inscrições e edições
+    nomes = [remocao.nome for remocao in lote]
+    try:
+        apagar_banners([nome for nome in nomes if not e_rendicao(nome)], banners_em_uso)
+        apagar_rendicoes([nome for nome in nomes if e_rendicao(nome)], rendicoes_em_uso)
+    except Exception as erro:
+        for remocao in lote:
+            registrar_falha(remocao, erro)
+        RemocaoBanner.objects.bulk_update(lote, ['tentativas', 'erro', 'proxima_tentativa'])
+        return 0, len(lote)
+
+    RemocaoBanner.objects.filter(pk__in=[remocao.pk for remocao in lote]).delete()
+    return len(lote), 0
@@ -0,0 +1,406 @@
+import asyncio
+import contextlib
+import io
+import itertools
+import json
+import statistics
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from wsgiref.util import setup_testing_defaults
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIHandler
+from django.core.management import call_command
+from django.core.handlers.wsgi import WSGIHandler
+from django.db import connection, connections, reset_queries, transaction
+from django.db.backends.signals import connection_created
+from django.db.models import F
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import get_resolver, reverse
+
+from app.models import Evento, Inscricao, ListaEspera, Organizador, Participante
+from app.transmissao import publicar_vagas
+
+ARQUIVO_BASELINE = Path(__file__).resolve().parent / 'benchmarks_baseline.json'
+PAPEIS = ('anonimo', 'participante', 'organizador')
+TAMANHOS = {
+    'pequeno': {'organizadores': 2, 'eventos': 10, 'participantes': 50, 'inscricoes': 200},
+    'medio': {'organizadores': 5, 'eventos': 100, 'participantes': 500, 'inscricoes': 5000},
+    'grande': {'organizadores': 10, 'eventos': 500, 'participantes': 5000, 'inscricoes': 50000},
+}
+# A exclusão do organizador faz uma rodada de DELETEs a cada LOTE_EXCLUSAO eventos dele
+ROTAS_PROPORCIONAIS = {'perfil-organizador-delete'}
+# Conexões SSE nunca terminam: não há latência ou memória por requisição a medir.
+# A mídia não usa banco nem template e depende de arquivos em disco; é medida pelo benchmark_armazenamento
+ROTAS_SEM_BENCHMARK = {'evento-vagas-stream', 'midia'}
+TOLERANCIA_LATENCIA = 3.0
+TOLERANCIA_MEMORIA = 2.0
+
+# Rotas que alteram dados: a requisição roda numa transação desfeita ao final
+ROTAS = {
+    'home': ('get', lambda dados: []),
+    'evento-list': ('get', lambda dados: []),
+    'evento-fragmento': ('get', lambda dados: []),
+    'evento-disponibilidade': ('get', lambda dados: []),
+    'evento-create': ('get', lambda dados: []),
+    'evento-update': ('get', lambda dados: [dados['evento']]),
+    'evento-delete': ('post', lambda dados: [dados['evento']]),
+    'evento-importar': ('get', lambda dados: [dados['evento']]),
+    'inscrever': ('post', lambda dados: [dados['evento_livre']]),
+    'desinscrever': ('post', lambda dados: [dados['inscricao']]),
+    'sair-espera': ('post', lambda dados: [dados['espera']]),
+    'perfil-participante': ('get', lambda dados: []),
+    'perfil-participante-update': ('get', lambda dados: [dados['participante']]),
+    'perfil-participante-delete': ('post', lambda dados: [dados['participante']]),
+    'perfil-organizador': ('get', lambda dados: []),
+    'perfil-organizador-update': ('get', lambda dados: [dados['organizador']]),
+    'perfil-organizador-delete': ('post', lambda dados: [dados['organizador']]),
+    'perfil-usuario-update': ('get', lambda dados: [dados['usuario']]),
+    'password_change': ('get', lambda dados: []),
+    'password_change_done': ('get', lambda dados: []),
+    'dashboard': ('get', lambda dados: []),
+    'dashboard-dados': ('get', lambda dados: []),
+    'dashboard-exportar': ('get', lambda dados: ['inscricoes']),
+    'cache-estatisticas': ('get', lambda dados: []),
+    'instrumentacao-estatisticas': ('get', lambda dados: []),
+    'signup_participante': ('get', lambda dados: []),
+    'signup_organizador': ('get', lambda dados: []),
+    'login': ('get', lambda dados: []),
+    'logout': ('post', lambda dados: []),
+}
+
+
+def rotas_sem_benchmark():
+    nomes = {padrao.name for padrao in get_resolver().url_patterns if getattr(padrao, 'name', None)}
+    return sorted(nomes - set(ROTAS) - ROTAS_SEM_BENCHMARK)
+
+
+def popular(tamanho):
+    # gerar_inscricoes imprime o progresso; aqui só interessa o banco populado
+    with contextlib.redirect_stdout(io.StringIO()):
+        call_command('gerar_inscricoes', **TAMANHOS[tamanho])
+
+    organizador = Organizador.objects.select_related('user').order_by('pk').first()
+    participante = Participante.objects.select_related('user').order_by('pk').first()
+    inscricao = Inscricao.objects.filter(participante=participante).order_by('pk').first()
+    nao_inscritos = Evento.objects.exclude(inscricao__participante=participante).order_by('pk')
+    evento_livre = nao_inscritos.filter(inscritos__lt=F('capacidade_max')).first()
+    espera = ListaEspera.objects.create(evento=nao_inscritos.last(), participante=participante)
+    return {
+        'usuarios': {'participante': participante.user, 'organizador': organizador.user},
+        'evento': Evento.objects.filter(organizador=organizador).order_by('pk').first().pk,
+        'evento_livre': evento_livre.pk if evento_livre else inscricao.evento_id,
+        'inscricao': inscricao.pk,
+        'espera': espera.pk,
+        'participante': participante.pk,
+        'organizador': organizador.pk,
+        'usuario': participante.user.pk,
+    }
+
+
+def requisitar(client, metodo, url):
+    cookies = client.cookies
+    client.cookies = cookies.__class__(cookies)
+    try:
+        with transaction.atomic():
+            response = getattr(client, metodo)(url)
+            if response.streaming:
+                b''.join(response.streaming_content)
+            transaction.set_rollback(True)
+    finally:
+        client.cookies = cookies
+    return response
+
+
+def configuracao_de_benchmark():
+    # Os benchmarks rodam com DEBUG=False, em que o manifest do whitenoise exigiria o collectstatic;
+    # o storage dos estáticos só muda as URLs geradas, não o custo das rotas
+    return override_settings(STORAGES={
+        **settings.STORAGES, 'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+    })
+
+
+def percentis_ms(tempos):
+    tempos = [tempo * 1000 for tempo in tempos]
+    percentis = statistics.quantiles(tempos, n=20, method='inclusive') if len(tempos) > 1 else tempos * 19
+    return round(statistics.median(tempos), 2), round(percentis[18], 2)
+
+
+def medir_rota(client, metodo, url, repeticoes):
+    cache.clear()
+    reset_queries()
+    with CaptureQueriesContext(connection) as capturadas:
+        response = requisitar(client, metodo, url)
+    # Conta agora: as próximas requisições limpam connection.queries. Os savepoints são do rollback acima.
+    consultas = [
+        consulta for consulta in capturadas.captured_queries
+        if not consulta['sql'].startswith(('SAVEPOINT', 'RELEASE SAVEPOINT', 'ROLLBACK TO SAVEPOINT'))
+    ]
+
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        requisitar(client, metodo, url)
+        tempos.append(time.perf_counter() - inicio)
+
+    tracemalloc.start()
+    requisitar(client, metodo, url)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    p50, p95 = percentis_ms(tempos)
+    return {
+        'status': response.status_code,
+        'consultas': len(consultas),
+        'p50_ms': p50,
+        'p95_ms': p95,
+        'memoria_kb': round(pico / 1024, 1),
+    }
+
+
+def medir_tamanho(tamanho, repeticoes=20):
+    resultados = {}
+    with transaction.atomic():
+        dados = popular(tamanho)
+        for papel in PAPEIS:
+            client = Client()
+            if papel != 'anonimo':
+                client.force_login(dados['usuarios'][papel])
+            for nome, (metodo, argumentos) in ROTAS.items():
+                url = reverse(nome, args=argumentos(dados))
+                resultados[f'{nome}:{papel}'] = medir_rota(client, metodo, url, repeticoes)
+        transaction.set_rollback(True)
+    return resultados
+
+
+def rotas_que_escalam(resultados):
+    # Uma rota sem N+1 faz o mesmo número de consultas em qualquer tamanho de base
+    tamanhos = list(resultados)
+    escalam = {}
+    for chave in resultados[tamanhos[0]]:
+        if chave.split(':')[0] in ROTAS_PROPORCIONAIS:
+            continue
+        consultas = {tamanho: resultados[tamanho][chave]['consultas'] for tamanho in tamanhos}
+        if len(set(consultas.values())) > 1:
+            escalam[chave] = consultas
+    return escalam
+
+
+def comparar_com_baseline(resultados, baseline,
+                          tolerancia_latencia=TOLERANCIA_LATENCIA, tolerancia_memoria=TOLERANCIA_MEMORIA):
+    regressoes = []
+    for tamanho, rotas in resultados.items():
+        for chave, atual in rotas.items():
+            anterior = baseline.get(tamanho, {}).get(chave)
+            if anterior is None:
+                continue
+            if atual['consultas'] > anterior['consultas']:
+                regressoes.append(f"{tamanho} {chave}: {anterior['consultas']} → {atual['consultas']} consultas")
+            # Latência e memória variam entre máquinas; só acusa quando passa da tolerância
+            if atual['p95_ms'] > anterior['p95_ms'] * tolerancia_latencia + 5:
+                regressoes.append(f"{tamanho} {chave}: p95 {anterior['p95_ms']} → {atual['p95_ms']} ms")
+            if atual['memoria_kb'] > anterior['memoria_kb'] * tolerancia_memoria + 256:
+                regressoes.append(f"{tamanho} {chave}: memória {anterior['memoria_kb']} → {atual['memoria_kb']} KB")
+    return regressoes
+
+
+def carregar_baseline(caminho=ARQUIVO_BASELINE):
+    if not Path(caminho).exists():
+        return {}
+    return json.loads(Path(caminho).read_text(encoding='utf-8'))
+
+
+def salvar_baseline(resultados, caminho=ARQUIVO_BASELINE):
+    Path(caminho).write_text(json.dumps(resultados, indent=2, ensure_ascii=False, sort_keys=True) + '\n',
+                             encoding='utf-8')
+
+
+def medir_conexoes(caminho, cookie, threads, requisicoes):
+    # Passa pelo WSGIHandler de verdade: o Client de testes desliga o close_old_connections,
+    # que é justamente o que decide se a conexão é reaproveitada entre requisições
+    handler = WSGIHandler()
+    ambiente = {}
+    setup_testing_defaults(ambiente)
+    caminho, _, query = caminho.partition('?')
+    ambiente.update(PATH_INFO=caminho, QUERY_STRING=query, HTTP_HOST='testserver', SERVER_NAME='testserver',
+                    HTTP_COOKIE=cookie)
+
+    def trabalhador(_):
+        tempos = []
+        try:
+            for _ in range(requisicoes):
+                inicio = time.perf_counter()
+                resposta = handler(dict(ambiente), lambda status, cabecalhos: None)
+                b''.join(resposta)
+                resposta.close()
+                tempos.append(time.perf_counter() - inicio)
+        finally:
+            connections.close_all()
+        return tempos
+
+    with contar_conexoes() as abertas:
+        inicio = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            tempos = [tempo for parte in executor.map(trabalhador, range(threads)) for tempo in parte]
+        duracao = time.perf_counter() - inicio
+
+    return resumo_carga(tempos, duracao, conexoes_abertas=next(abertas))
+
+
+@contextlib.contextmanager
+def contar_conexoes():
+    abertas = itertools.count()
+
+    def contar_conexao(sender, connection, **kwargs):
+        next(abertas)
+
+    connection_created.connect(contar_conexao)
+    try:
+        yield abertas
+    finally:
+        connection_created.disconnect(contar_conexao)
+
+
+def resumo_carga(tempos, duracao, **extras):
+    p50, p95 = percentis_ms(tempos)
+    return {
+        'requisicoes': len(tempos),
+        'por_segundo': round(len(tempos) / duracao, 1),
+        'p50_ms': p50,
+        'p95_ms': p95,
+        **extras,
+    }
+
+
+def escopo_asgi(caminho, cookie):
+    caminho, _, query = caminho.partition('?')
+    return {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET', 'scheme': 'http',
+        'path': caminho, 'raw_path': caminho.encode(), 'query_string': query.encode(), 'root_path': '',
+        'headers': [(b'host', b'testserver'), (b'cookie', cookie.encode())],
+        'client': ('127.0.0.1', 0), 'server': ('testserver', 80),
+    }
+
+
+async def requisitar_asgi(handler, caminho, cookie):
+    escopo = escopo_asgi(caminho, cookie)
+    corpo_enviado = False
+    desconectado = asyncio.Event()
+    resposta = {'status': None, 'corpo': []}
+
+    async def receive():
+        nonlocal corpo_enviado
+        if not corpo_enviado:
+            corpo_enviado = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        # O Django escuta a desconexão enquanto a view roda; o cliente só "sai" ao final
+        await desconectado.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(mensagem):
+        if mensagem['type'] == 'http.response.start':
+            resposta['status'] = mensagem['status']
+        elif mensagem['type'] == 'http.response.body':
+            resposta['corpo'].append(mensagem.get('body', b''))
+
+    try:
+        await handler(escopo, receive, send)
+    finally:
+        desconectado.set()
+    return resposta['status'], b''.join(resposta['corpo'])
+
+
+def medir_asgi(caminho, cookie, concorrencia, requisicoes):
+    # Mesma carga do medir_conexoes, mas com N requisições simultâneas num único event loop,
+    # como um worker do uvicorn
+    handler = ASGIHandler()
+
+    async def cliente():
+        tempos = []
+        for _ in range(requisicoes):
+            inicio = time.perf_counter()
+            status, _ = await requisitar_asgi(handler, caminho, cookie)
+            if status != 200:
+                raise RuntimeError(f'{caminho} respondeu {status} via ASGI')
+            tempos.append(time.perf_counter() - inicio)
+        return tempos
+
+    async def carga():
+        partes = await asyncio.gather(*(cliente() for _ in range(concorrencia)))
+        return [tempo for parte in partes for tempo in parte]
+
+    with contar_conexoes() as abertas:
+        inicio = time.perf_counter()
+        tempos = asyncio.run(carga())
+        duracao = time.perf_counter() - inicio
+
+    return resumo_carga(tempos, duracao, conexoes_abertas=next(abertas))
+
+
+def medir_transmissao(assinantes, evento_id):
+    # Abre N conexões SSE pela aplicação ASGI servida em produção, publica uma mudança de vagas
+    # e mede quanto custa manter as conexões ociosas e quanto demora para a mudança chegar a todas
+    from config.asgi import application as handler
+
+    async def carga():
+        desconectar = asyncio.Event()
+        conectados, todos_conectados = [], asyncio.Event()
+        entregas, todas_entregues = [], asyncio.Event()
+        inicio_publicacao = 0.0
+
+        async def cliente():
+            corpo_enviado = False
+
+            async def receive():
+                nonlocal corpo_enviado
+                if not corpo_enviado:
+                    corpo_enviado = True
+                    return {'type': 'http.request', 'body': b'', 'more_body': False}
+                await desconectar.wait()
+                return {'type': 'http.disconnect'}
+
+            async def send(mensagem):
+                corpo = mensagem.get('body', b'')
+                if corpo.startswith(b'retry:'):
+                    conectados.append(1)
+                    if len(conectados) == assinantes:
+                        todos_conectados.set()
+                elif corpo.startswith(b'event: vagas'):
+                    entregas.append(time.perf_counter() - inicio_publicacao)
+                    if len(entregas) == assinantes:
+                        todas_entregues.set()
+
+            await handler(escopo_asgi('/eventos/vagas/stream', ''), receive, send)
+
+        threads_antes = threading.active_count()
+        tracemalloc.start()
+        memoria_antes = tracemalloc.get_traced_memory()[0]
+        tarefas = [asyncio.ensure_future(cliente()) for _ in range(assinantes)]
+        await todos_conectados.wait()
+        memoria = tracemalloc.get_traced_memory()[0] - memoria_antes
+        tracemalloc.stop()
+        threads = threading.active_count() - threads_antes
+
+        inicio_publicacao = time.perf_counter()
+        await sync_to_async(publicar_vagas)(evento_id)
+        await todas_entregues.wait()
+
+        desconectar.set()
+        await asyncio.gather(*tarefas)
+        p50, p95 = percentis_ms(entregas)
+        return {
+            'assinantes': assinantes,
+            'memoria_por_conexao_kb': round(memoria / assinantes / 1024, 1),
+            'threads_por_conexao': round(threads / assinantes, 2),
+            'entrega_p50_ms': p50,
+            'entrega_p95_ms': p95,
+            'entrega_total_ms': round(max(entregas) * 1000, 2),
+        }
+
+    return asyncio.run(carga())
@@ -0,0 +1,104 @@
+import re
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+TABELA_FTS = 'app_evento_busca'
+CONFIG_BUSCA = 'portuguese'
+
+_fts_disponivel = {}
+
+
+def vetor_busca():
+    from django.contrib.postgres.search import SearchVector
+
+    return (
+        SearchVector('titulo', weight='A', config=CONFIG_BUSCA) +
+        SearchVector('descricao', weight='B', config=CONFIG_BUSCA) +
+        SearchVector('local', weight='C', config=CONFIG_BUSCA)
+    )
+
+
+def fts_disponivel():
+    if connection.vendor != 'sqlite':
+        return False
+
+    nome = connection.settings_dict['NAME']
+    if nome not in _fts_disponivel:
+        _fts_disponivel[nome] = TABELA_FTS in connection.introspection.table_names()
+    return _fts_disponivel[nome]
+
+
+def termos_fts(termo):
+    palavras = re.findall(r'\w+', termo)
+    return ' '.join(f'"{palavra}"*' for palavra in palavras)
+
+
+def buscar_eventos(queryset, termo):
+    if connection.vendor == 'postgresql':
+        from django.contrib.postgres.search import SearchQuery, SearchRank
+
+        consulta = SearchQuery(termo, search_type='websearch', config=CONFIG_BUSCA)
+        vetor = vetor_busca()
+        return queryset.annotate(
+            busca=vetor,
+            relevancia=SearchRank(vetor, consulta),
+        ).filter(busca=consulta).order_by('-relevancia', 'id')
+
+    termos = termos_fts(termo)
+    if termos and fts_disponivel():
+        # bm25 do FTS5: quanto menor, mais relevante; pesos na ordem titulo, descricao, local
+        relevancia = RawSQL(
+            f'SELECT bm25({TABELA_FTS}, 10.0, 2.0, 5.0) FROM {TABELA_FTS} '
+            f'WHERE {TABELA_FTS} MATCH %s AND rowid = app_evento.id',
+            (termos,)
+        )
+        encontrados = RawSQL(f'SELECT rowid FROM {TABELA_FTS} WHERE {TABELA_FTS} MATCH %s', (termos,))
+        return queryset.filter(pk__in=encontrados).annotate(relevancia=relevancia).order_by('relevancia', 'id')
+
+    return queryset.filter(
+        Q(titulo__icontains=termo) |
+        Q(descricao__icontains=termo) |
+        Q(local__icontains=termo)
+    ).order_by('data', 'id')
+
+
+def indexar_evento(evento):
+    if not fts_disponivel():
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {TABELA_FTS} WHERE rowid = %s', [evento.pk])
+        cursor.execute(
+            f'INSERT INTO {TABELA_FTS} (rowid, titulo, descricao, local) VALUES (%s, %s, %s, %s)',
+            [evento.pk, evento.titulo, evento.descricao, evento.local]
+        )
+
+
+def remover_evento(pk):
+    if not fts_disponivel():
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {TABELA_FTS} WHERE rowid = %s', [pk])
+
+
+def remover_eventos(pks):
+    if not fts_disponivel() or not pks:
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {TABELA_FTS} WHERE rowid IN ({', '.join(['%s'] * len(pks))})", list(pks))
+
+
+def reindexar_eventos():
+    if not fts_disponivel():
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {TABELA_FTS}')
+        cursor.execute(
+            f'INSERT INTO {TABELA_FTS} (rowid, titulo, descricao, local) '
+            f'SELECT id, titulo, descricao, local FROM app_evento'
+        )
@@ -0,0 +1,187 @@
+import hashlib
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+TEMPO_CACHE_CATALOGO = 10 * 60
+TEMPO_CACHE_DISPONIBILIDADE = 5
+MAX_EVENTOS_DISPONIBILIDADE = 500
+TIPOS_CACHE = ('cards', 'paginas')
+# Versão da listagem: muda só quando eventos entram, saem ou mudam de posição na lista
+CHAVE_VERSAO_CATALOGO = 'catalogo:versao'
+# Muda a cada invalidação; uma página renderizada enquanto ela mudou não é guardada
+CHAVE_ALTERACOES = 'catalogo:alteracoes'
+# Campos que filtram, ordenam ou entram na busca da lista de eventos
+CAMPOS_LISTAGEM = ('titulo', 'descricao', 'local', 'data')
+
+
+def chave_versao_evento(evento_id):
+    return f'catalogo:evento:{evento_id}:versao'
+
+
+def chave_contador(tipo, resultado):
+    return f'catalogo:estatisticas:{tipo}:{resultado}'
+
+
+def incrementar(chave, quantidade=1):
+    # incr falha quando a chave não existe (ou expirou); add resolve a corrida do primeiro incremento
+    try:
+        return cache.incr(chave, quantidade)
+    except ValueError:
+        if cache.add(chave, quantidade, None):
+            return quantidade
+        return cache.incr(chave, quantidade)
+
+
+def registrar_acessos(tipo, acertos=0, falhas=0):
+    if acertos:
+        incrementar(chave_contador(tipo, 'acertos'), acertos)
+    if falhas:
+        incrementar(chave_contador(tipo, 'falhas'), falhas)
+
+
+def estatisticas_cache():
+    chaves = {
+        (tipo, resultado): chave_contador(tipo, resultado)
+        for tipo in TIPOS_CACHE for resultado in ('acertos', 'falhas')
+    }
+    valores = cache.get_many(chaves.values())
+    estatisticas = {}
+    for tipo in TIPOS_CACHE:
+        acertos = valores.get(chaves[tipo, 'acertos'], 0)
+        falhas = valores.get(chaves[tipo, 'falhas'], 0)
+        total = acertos + falhas
+        estatisticas[tipo] = {
+            'acertos': acertos,
+            'falhas': falhas,
+            'taxa_acerto': round(acertos / total, 4) if total else None,
+        }
+    return estatisticas
+
+
+def versao_catalogo():
+    return cache.get_or_set(CHAVE_VERSAO_CATALOGO, 1, None)
+
+
+def alteracoes_catalogo():
+    return cache.get(CHAVE_ALTERACOES, 0)
+
+
+def invalidar_catalogo(*eventos_ids, listagem=False):
+    # Roda após o commit: invalidar antes deixaria outra requisição guardar o estado antigo
+    # entre a invalidação e o commit da transação que alterou o evento.
+    def invalidar():
+        for evento_id in eventos_ids:
+            incrementar(chave_versao_evento(evento_id))
+        if listagem:
+            incrementar(CHAVE_VERSAO_CATALOGO)
+        incrementar(CHAVE_ALTERACOES)
+
+    transaction.on_commit(invalidar)
+
+
+def versoes_atuais(versoes, atuais):
+    # Evento que nunca foi invalidado não tem a chave de versão: vale 0
+    return all(atuais.get(chave, 0) == versao for chave, versao in versoes.items())
+
+
+def variante_card(evento, is_organizador):
+    if getattr(evento, 'is_owner', False):
+        return 'dono'
+    if is_organizador:
+        return 'organizador'
+    if getattr(evento, 'is_inscrito', False):
+        return f'inscrito-{evento.inscricao_id}'
+    if getattr(evento, 'espera_id', None):
+        return f'espera-{evento.espera_id}'
+    return 'livre'
+
+
+def renderizar_cards(eventos, is_organizador):
+    # Devolve as versões dos eventos renderizados, guardadas junto da página que os exibe
+    if not eventos:
+        return {}
+    if not settings.CACHE_CATALOGO:
+        for evento in eventos:
+            evento.card_html = mark_safe(render_to_string('eventos/evento_card.html', {
+                'evento': evento,
+                'is_organizador': is_organizador,
+            }))
+        return {}
+
+    chaves_versao = [chave_versao_evento(evento.pk) for evento in eventos]
+    guardadas = cache.get_many(chaves_versao)
+    versoes = {chave: guardadas.get(chave, 0) for chave in chaves_versao}
+    # As vagas restantes entram na chave: o card nunca mostra uma contagem diferente da consulta
+    chaves = {
+        evento.pk: 'catalogo:card:{}:{}:{}:{}'.format(
+            evento.pk,
+            versoes[chave_versao_evento(evento.pk)],
+            evento.vagas_restantes,
+            variante_card(evento, is_organizador),
+        )
+        for evento in eventos
+    }
+    em_cache = cache.get_many(chaves.values())
+
+    novos = {}
+    for evento in eventos:
+        chave = chaves[evento.pk]
+        if chave not in em_cache:
+            novos[chave] = render_to_string('eventos/evento_card.html', {
+                'evento': evento,
+                'is_organizador': is_organizador,
+            })
+        evento.card_html = mark_safe(em_cache.get(chave) or novos[chave])
+
+    if novos:
+        cache.set_many(novos, TEMPO_CACHE_CATALOGO)
+    registrar_acessos('cards', acertos=len(eventos) - len(novos), falhas=len(novos))
+    return versoes
+
+
+def chave_pagina(request):
+    parametros = urlencode(sorted(request.GET.lists()), doseq=True)
+    parametros = hashlib.md5(parametros.encode()).hexdigest()
+    return f'catalogo:pagina:{versao_catalogo()}:{request.path}:{parametros}'
+
+
+def pagina_em_cache(chave):
+    # A página vale enquanto nenhum dos eventos exibidos nela mudou
+    guardada = cache.get(chave)
+    if guardada is None or not versoes_atuais(guardada[2], cache.get_many(guardada[2])):
+        return None
+    return guardada
+
+
+async def apagina_em_cache(chave):
+    guardada = await cache.aget(chave)
+    if guardada is None or not versoes_atuais(guardada[2], await cache.aget_many(guardada[2])):
+        return None
+    return guardada
+
+
+def guardar_pagina(chave, conteudo, cabecalhos, versoes, alteracoes):
+    # Uma invalidação durante a renderização pode ter chegado depois da consulta e antes da leitura das versões
+    if alteracoes_catalogo() == alteracoes:
+        cache.set(chave, (conteudo, cabecalhos, versoes), TEMPO_CACHE_CATALOGO)
+
+
+def ids_de_eventos(valor, limite=MAX_EVENTOS_DISPONIBILIDADE):
+    return sorted({int(pk) for pk in valor.split(',') if pk.isdigit()})[:limite]
+
+
+async def aversoes_eventos(ids):
+    versoes = await cache.aget_many([chave_versao_evento(pk) for pk in ids])
+    return [versoes.get(chave_versao_evento(pk), 0) for pk in ids]
+
+
+def chave_disponibilidade(versoes, ids):
+    # A versão de cada evento muda a cada inscrição ou cancelamento confirmado nele, então a chave
+    # (e o ETag derivado dela) identifica a resposta sem consultar o banco
+    assinatura = ','.join(f'{pk}:{versao}' for pk, versao in zip(ids, versoes))
+    return f'catalogo:disponibilidade:{hashlib.md5(assinatura.encode()).hexdigest()}'
@@ -0,0 +1,33 @@
+from django.conf import settings
+from django.core.checks import Warning, register
+
+
+def cache_por_processo():
+    return settings.CACHES['default']['BACKEND'].endswith('LocMemCache')
+
+
+@register(deploy=True)
+def verificar_cache_dos_perfis(app_configs, **kwargs):
+    # Cada worker do gunicorn tem o seu LocMemCache: invalidar_perfil() só limpa a cópia do worker
+    # que tratou a alteração, e os outros continuam servindo o perfil antigo até TEMPO_CACHE_PERFIL
+    if not cache_por_processo():
+        return []
+    return [Warning(
+        'O cache padrão é por processo (LocMemCache): com vários workers, um perfil criado ou excluído '
+        'continua em cache nos outros workers por até 1 hora.',
+        hint='Defina CACHE_BACKEND/CACHE_LOCATION com um cache compartilhado (ex.: Redis).',
+        id='app.W001',
+    )]
+
+
+@register(deploy=True)
+def verificar_cache_do_catalogo(app_configs, **kwargs):
+    # A versão do evento incrementada após uma inscrição só existiria no worker que a tratou
+    if not settings.CACHE_CATALOGO or not cache_por_processo():
+        return []
+    return [Warning(
+        'CACHE_CATALOGO está ligado com um cache por processo (LocMemCache): com vários workers, páginas '
+        'anônimas e a disponibilidade mostram vagas antigas por até 10 minutos.',
+        hint='Use um cache compartilhado (ex.: Redis) ou desligue CACHE_CATALOGO.',
+        id='app.W002',
+    )]
@@ -1,15 +1,7 @@
-from app.models import Participante, Organizador
-
 def perfil_usuario(request):
-    user = request.user
-    is_organizador = False
-    is_participante = False
-
-    if user.is_authenticated:
-        is_organizador = Organizador.objects.filter(user=user).exists()
-        is_participante = Participante.objects.filter(user=user).exists()
+    perfil = request.perfil
 
     return {
-        'is_organizador': is_organizador,
-        'is_participante': is_participante
-    }
\ No newline at end of file
+        'is_organizador': perfil.is_organizador,
+        'is_participante': perfil.is_participante
+    }
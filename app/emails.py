@@ -0,0 +1,105 @@
+from types import SimpleNamespace
+from urllib.parse import urljoin
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.html import escape, strip_tags
+
+from app.filas import registrar_falha, reservar_lote
+from app.models import EmailPendente
+
+REMETENTE = 'senac@eventoscontrole.com.br'
+
+
+def url_absoluta(caminho):
+    # O e-mail é aberto fora do site: caminhos locais (MEDIA_URL) precisam do domínio; URLs do Cloudinary já são absolutas
+    return urljoin(f'{settings.SITE_URL}/', caminho)
+
+
+def montar_email_confirmacao(participante, evento, promovido=False):
+    html_content = render_to_string('emails/confirmacao_inscricao.html', {
+        'participante': participante,
+        'evento': evento,
+        'promovido': promovido,
+        # JPEG de 1280px: clientes de e-mail nem sempre exibem AVIF/WebP
+        'banner_url': url_absoluta(evento.banner_responsivo.url('destaque')) if evento.imagem_banner else '',
+    })
+
+    return EmailPendente(
+        destinatario=participante.user.email,
+        assunto='Vaga Liberada: Inscrição Confirmada' if promovido else 'Confirmação de Inscrição no Evento',
+        corpo_texto=strip_tags(html_content),
+        corpo_html=html_content,
+    )
+
+
+def montar_emails_confirmacao(participantes, evento):
+    # Em importações em massa o template é renderizado uma vez; só o nome muda entre os e-mails
+    marcador = '\x00nome\x00'
+    modelo = montar_email_confirmacao(SimpleNamespace(nome=marcador, user=SimpleNamespace(email='')), evento)
+    for participante in participantes:
+        nome = escape(participante.nome)
+        yield EmailPendente(
+            destinatario=participante.user.email,
+            assunto=modelo.assunto,
+            corpo_texto=modelo.corpo_texto.replace(marcador, nome),
+            corpo_html=modelo.corpo_html.replace(marcador, nome),
+        )
+
+
+def enviar_email_confirmacao(participante, evento):
+    # Só enfileira: o envio SMTP acontece no worker (manage.py enviar_emails)
+    email = montar_email_confirmacao(participante, evento)
+    email.save()
+    return email
+
+
+def enfileirar_emails(emails, batch_size=500):
+    return EmailPendente.objects.bulk_create(emails, batch_size=batch_size)
+
+
+def processar_fila(tamanho_lote=100):
+    lote = reservar_lote(EmailPendente.objects.filter(enviado_em__isnull=True), tamanho_lote)
+    if not lote:
+        return 0, 0
+
+    enviados = 0
+    falhas = 0
+    conexao = get_connection(fail_silently=False)
+
+    try:
+        conexao.open()
+    except Exception as erro:
+        conexao = None
+        erro_conexao = erro
+
+    for email in lote:
+        try:
+            if conexao is None:
+                raise erro_conexao
+
+            mensagem = EmailMultiAlternatives(
+                subject=email.assunto,
+                body=email.corpo_texto,
+                from_email=REMETENTE,
+                to=[email.destinatario],
+                connection=conexao,
+            )
+            if email.corpo_html:
+                mensagem.attach_alternative(email.corpo_html, "text/html")
+            mensagem.send()
+
+            email.enviado_em = timezone.now()
+            email.erro = ''
+            enviados += 1
+        except Exception as erro:
+            registrar_falha(email, erro)
+            falhas += 1
+
+    if conexao is not None:
+        conexao.close()
+
+    EmailPendente.objects.bulk_update(lote, ['enviado_em', 'erro', 'tentativas', 'proxima_tentativa'])
+    return enviados, falhas
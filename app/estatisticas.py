@@ -0,0 +1,107 @@
+import datetime
+
+from django.db.models import Case, Count, F, FloatField, Value, When
+from django.db.models.functions import Cast, TruncDate
+from django.utils import timezone
+
+from app.models import GENERO, Evento, Inscricao
+
+DIAS_HISTORICO = 30
+MAX_CIDADES = 10
+
+
+def eventos_com_estatisticas(organizador):
+    return Evento.objects.filter(organizador=organizador).annotate(
+        total_inscritos=F('inscritos'),
+        taxa_ocupacao=Case(
+            When(capacidade_max__gt=0, then=Cast('inscritos', FloatField()) * 100 / F('capacidade_max')),
+            default=Value(0.0),
+            output_field=FloatField(),
+        ),
+    ).order_by('-data')
+
+
+def consulta_inscricoes_por_dia(organizador, dias=DIAS_HISTORICO):
+    inicio = timezone.now() - datetime.timedelta(days=dias)
+    return (
+        Inscricao.objects.filter(evento__organizador=organizador, data_envio__gte=inicio)
+        .annotate(dia=TruncDate('data_envio'))
+        .values('dia')
+        .annotate(total=Count('id'))
+        .order_by('dia')
+    )
+
+
+def consulta_inscricoes_por_genero(organizador):
+    return (
+        Inscricao.objects.filter(evento__organizador=organizador)
+        .values('participante__genero')
+        .annotate(total=Count('id'))
+        .order_by('-total')
+    )
+
+
+def consulta_inscricoes_por_cidade(organizador, limite=MAX_CIDADES):
+    return (
+        Inscricao.objects.filter(evento__organizador=organizador)
+        .values('participante__cidade')
+        .annotate(total=Count('id'))
+        .order_by('-total', 'participante__cidade')[:limite]
+    )
+
+
+def formatar_generos(grupos):
+    nomes = dict(GENERO)
+    return [
+        {'genero': nomes.get(grupo['participante__genero'], grupo['participante__genero']), 'total': grupo['total']}
+        for grupo in grupos
+    ]
+
+
+def formatar_cidades(grupos):
+    return [{'cidade': grupo['participante__cidade'], 'total': grupo['total']} for grupo in grupos]
+
+
+def inscricoes_por_dia(organizador, dias=DIAS_HISTORICO):
+    return list(consulta_inscricoes_por_dia(organizador, dias))
+
+
+def inscricoes_por_genero(organizador):
+    return formatar_generos(consulta_inscricoes_por_genero(organizador))
+
+
+def inscricoes_por_cidade(organizador, limite=MAX_CIDADES):
+    return formatar_cidades(consulta_inscricoes_por_cidade(organizador, limite))
+
+
+def montar_resumo(eventos, por_dia, por_genero, por_cidade):
+    total_inscricoes = sum(evento.total_inscritos for evento in eventos)
+    capacidade_total = sum(evento.capacidade_max for evento in eventos)
+
+    return {
+        'eventos': eventos,
+        'total_eventos': len(eventos),
+        'total_inscricoes': total_inscricoes,
+        'taxa_ocupacao_geral': total_inscricoes * 100 / capacidade_total if capacidade_total else 0,
+        'inscricoes_por_dia': por_dia,
+        'inscricoes_por_genero': por_genero,
+        'inscricoes_por_cidade': por_cidade,
+    }
+
+
+def resumo_dashboard(organizador):
+    return montar_resumo(
+        list(eventos_com_estatisticas(organizador)),
+        inscricoes_por_dia(organizador),
+        inscricoes_por_genero(organizador),
+        inscricoes_por_cidade(organizador),
+    )
+
+
+async def aresumo_dashboard(organizador):
+    return montar_resumo(
+        [evento async for evento in eventos_com_estatisticas(organizador)],
+        [grupo async for grupo in consulta_inscricoes_por_dia(organizador)],
+        formatar_generos([grupo async for grupo in consulta_inscricoes_por_genero(organizador)]),
+        formatar_cidades([grupo async for grupo in consulta_inscricoes_por_cidade(organizador)]),
+    )
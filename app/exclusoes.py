@@ -0,0 +1,61 @@
+from django.contrib.auth.models import User
+from django.db import transaction
+
+from app.banners import agendar_remocao_banners, nome_do_banner
+from app.busca import remover_eventos
+from app.catalogo import invalidar_catalogo
+from app.inscricoes import descontar_inscricoes_do_participante
+from app.models import Evento, Inscricao, ListaEspera, Organizador, Participante
+from app.transmissao import publicar_vagas_dos_eventos
+
+# Eventos apagados por transação; as inscrições deles saem num único DELETE por lote
+LOTE_EXCLUSAO = 100
+
+
+def apagar(queryset):
+    # DELETE direto no banco: o coletor do Django carregaria cada linha (e dispararia os sinais dela)
+    # só para descobrir dependentes que aqui já foram removidos
+    return queryset._raw_delete(queryset.db)
+
+
+def excluir_eventos(eventos, lote=LOTE_EXCLUSAO):
+    ids = list(eventos.values_list('pk', flat=True))
+    # Uma transação por lote: cada uma fica curta e segura poucos bloqueios. Se o processo cair no
+    # meio, os lotes já gravados estão consistentes e repetir a exclusão apaga o restante.
+    for inicio in range(0, len(ids), lote):
+        parte = ids[inicio:inicio + lote]
+        with transaction.atomic():
+            # O bloqueio faz uma inscrição simultânea esperar e então não encontrar mais o evento
+            banners = Evento.objects.filter(pk__in=parte).select_for_update().values_list('imagem_banner', flat=True)
+            agendar_remocao_banners([nome_do_banner(banner) for banner in banners])
+            apagar(Inscricao.objects.filter(evento__in=parte))
+            apagar(ListaEspera.objects.filter(evento__in=parte))
+            apagar(Evento.objects.filter(pk__in=parte))
+            remover_eventos(parte)
+            invalidar_catalogo(*parte, listagem=True)
+    return len(ids)
+
+
+def excluir_usuario(user_id):
+    # Participante/Organizador já foram apagados; o coletor só confirma que não sobrou dependente
+    User.objects.filter(pk=user_id).delete()
+
+
+def excluir_participante(participante):
+    with transaction.atomic():
+        eventos = list(Inscricao.objects.filter(participante=participante).values_list('evento_id', flat=True))
+        # Desconta as vagas e promove a lista de espera, como o pre_delete faria
+        descontar_inscricoes_do_participante(participante)
+        apagar(Inscricao.objects.filter(participante=participante))
+        apagar(ListaEspera.objects.filter(participante=participante))
+        apagar(Participante.objects.filter(pk=participante.pk))
+        excluir_usuario(participante.user_id)
+        invalidar_catalogo(*eventos)
+        transaction.on_commit(lambda: publicar_vagas_dos_eventos(eventos))
+
+
+def excluir_organizador(organizador, lote=LOTE_EXCLUSAO):
+    excluir_eventos(Evento.objects.filter(organizador=organizador), lote)
+    with transaction.atomic():
+        apagar(Organizador.objects.filter(pk=organizador.pk))
+        excluir_usuario(organizador.user_id)
@@ -0,0 +1,208 @@
+import csv
+import datetime
+import io
+import zipfile
+import zlib
+from xml.sax.saxutils import escape
+
+from asgiref.sync import sync_to_async
+from django.utils import timezone
+
+from app.models import Evento, Inscricao
+
+TAMANHO_CHUNK = 2000
+TAMANHO_BLOCO = 64 * 1024
+
+CABECALHO_INSCRICOES = ['Nome', 'Email', 'Evento', 'Telefone', 'Gênero', 'Cidade', 'CPF', 'Data']
+CABECALHO_EVENTOS = ['Título', 'Data', 'Local', 'Capacidade Máxima', 'Número de Participantes']
+# Texto começando assim vira fórmula ao abrir o CSV numa planilha
+INICIO_FORMULA = ('=', '+', '-', '@', '\t', '\r')
+
+
+def linhas_inscricoes(organizador):
+    return Inscricao.objects.filter(evento__organizador=organizador).order_by('-data_envio', '-id').values_list(
+        'participante__nome',
+        'participante__user__email',
+        'evento__titulo',
+        'participante__telefone',
+        'participante__genero',
+        'participante__cidade',
+        'participante__cpf',
+        'data_envio',
+    ).iterator(chunk_size=TAMANHO_CHUNK)
+
+
+def linhas_eventos(organizador):
+    return Evento.objects.filter(organizador=organizador).order_by('-data').values_list(
+        'titulo', 'data', 'local', 'capacidade_max', 'inscritos'
+    ).iterator(chunk_size=TAMANHO_CHUNK)
+
+
+def formatador_de_valores():
+    # O fuso é resolvido uma vez por exportação; timezone.localtime() o consultaria a cada célula
+    fuso = timezone.get_current_timezone()
+
+    def formatar(valor):
+        if isinstance(valor, datetime.datetime):
+            return valor.astimezone(fuso).strftime('%d/%m/%Y %H:%M')
+        return valor
+
+    return formatar
+
+
+class Eco:
+    def write(self, valor):
+        return valor
+
+
+def agrupar(partes, tamanho=TAMANHO_BLOCO):
+    # Junta as linhas em blocos de ~64 KB: poucos chunks HTTP grandes em vez de um por linha
+    bloco = []
+    acumulado = 0
+    for parte in partes:
+        bloco.append(parte)
+        acumulado += len(parte)
+        if acumulado >= tamanho:
+            yield b''.join(bloco)
+            bloco = []
+            acumulado = 0
+    if bloco:
+        yield b''.join(bloco)
+
+
+def neutralizar_formula(valor):
+    # Nome, cidade e título vêm dos usuários: o apóstrofo faz a planilha exibir o texto em vez de executá-lo
+    if isinstance(valor, str) and valor.startswith(INICIO_FORMULA):
+        return "'" + valor
+    return valor
+
+
+def gerar_csv(cabecalho, linhas):
+    escritor = csv.writer(Eco())
+    formatar = formatador_de_valores()
+    yield ('\ufeff' + escritor.writerow(cabecalho)).encode()
+    for linha in linhas:
+        yield escritor.writerow([neutralizar_formula(formatar(valor)) for valor in linha]).encode()
+
+
+class SaidaZip(io.RawIOBase):
+    def __init__(self):
+        self.partes = []
+
+    def writable(self):
+        return True
+
+    def write(self, dados):
+        self.partes.append(bytes(dados))
+        return len(dados)
+
+    def retirar(self):
+        dados = b''.join(self.partes)
+        self.partes.clear()
+        return dados
+
+
+XLSX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '</Types>'
+)
+XLSX_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+XLSX_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="Dados" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+XLSX_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '</Relationships>'
+)
+
+
+def celula_xlsx(valor):
+    if isinstance(valor, (int, float)) and not isinstance(valor, bool):
+        return f'<c><v>{valor}</v></c>'
+    # Texto sempre como inlineStr: nunca é interpretado como fórmula (que exigiria <f>), então vai sem alteração
+    texto = escape('' if valor is None else str(valor))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{texto}</t></is></c>'
+
+
+def linha_xlsx(valores, formatar):
+    return ('<row>' + ''.join(celula_xlsx(formatar(valor)) for valor in valores) + '</row>').encode()
+
+
+def gerar_xlsx(cabecalho, linhas):
+    # O zipfile aceita saída não pesquisável (data descriptors), então a planilha
+    # é montada e enviada aos pedaços sem nunca existir inteira em memória.
+    saida = SaidaZip()
+    formatar = formatador_de_valores()
+    with zipfile.ZipFile(saida, 'w', compression=zipfile.ZIP_DEFLATED) as arquivo:
+        arquivo.writestr('[Content_Types].xml', XLSX_CONTENT_TYPES)
+        arquivo.writestr('_rels/.rels', XLSX_RELS)
+        arquivo.writestr('xl/workbook.xml', XLSX_WORKBOOK)
+        arquivo.writestr('xl/_rels/workbook.xml.rels', XLSX_WORKBOOK_RELS)
+        yield saida.retirar()
+
+        with arquivo.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as planilha:
+            planilha.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+            )
+            planilha.write(linha_xlsx(cabecalho, formatar))
+            for bloco in agrupar(linha_xlsx(linha, formatar) for linha in linhas):
+                planilha.write(bloco)
+                yield saida.retirar()
+            planilha.write(b'</sheetData></worksheet>')
+
+    yield saida.retirar()
+
+
+def comprimir_gzip(blocos):
+    compressor = zlib.compressobj(wbits=31)
+    for bloco in blocos:
+        dados = compressor.compress(bloco)
+        if dados:
+            yield dados
+    yield compressor.flush()
+
+
+def exportar(cabecalho, linhas, formato='csv', gzip=False):
+    if formato == 'xlsx':
+        blocos = gerar_xlsx(cabecalho, linhas)
+    else:
+        blocos = agrupar(gerar_csv(cabecalho, linhas))
+
+    if gzip:
+        blocos = comprimir_gzip(blocos)
+    return blocos
+
+
+async def blocos_assincronos(blocos):
+    # Sob ASGI o StreamingHttpResponse consome um iterador síncrono com sync_to_async(list), montando o
+    # arquivo inteiro em memória antes do primeiro byte; aqui cada bloco é gerado numa ida à thread síncrona
+    # (a mesma de sempre, que mantém o cursor do iterator() aberto)
+    proximo = sync_to_async(next)
+    try:
+        while (bloco := await proximo(blocos, None)) is not None:
+            yield bloco
+    finally:
+        await sync_to_async(blocos.close)()
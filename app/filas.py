@@ -0,0 +1,37 @@
+import datetime
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+MAX_TENTATIVAS = 5
+ATRASO_BASE = datetime.timedelta(minutes=1)
+RESERVA_LOTE = datetime.timedelta(minutes=5)
+
+
+def reservar_lote(pendentes, tamanho):
+    agora = timezone.now()
+
+    with transaction.atomic():
+        pendentes = pendentes.filter(
+            tentativas__lt=MAX_TENTATIVAS,
+            proxima_tentativa__lte=agora,
+        ).order_by('proxima_tentativa', 'id')
+
+        if connection.features.has_select_for_update_skip_locked:
+            pendentes = pendentes.select_for_update(skip_locked=True)
+
+        lote = list(pendentes[:tamanho])
+
+        # Empurra a próxima tentativa para frente: outro worker não pega o mesmo lote
+        # e, se este processo morrer no meio do trabalho, o lote volta para a fila sozinho.
+        pendentes.model.objects.filter(pk__in=[item.pk for item in lote]).update(
+            proxima_tentativa=agora + RESERVA_LOTE
+        )
+
+    return lote
+
+
+def registrar_falha(item, erro):
+    item.tentativas += 1
+    item.erro = str(erro)
+    item.proxima_tentativa = timezone.now() + ATRASO_BASE * (2 ** (item.tentativas - 1))
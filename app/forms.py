@@ -77,4 +77,11 @@ class OrganizadorSignUpForm(UserCreationForm):
 
     class Meta:
         model = User
-        fields = ['username', 'email', 'password1', 'password2']
\ No newline at end of file
+        fields = ['username', 'email', 'password1', 'password2']
+
+class ImportarInscricoesForm(forms.Form):
+    arquivo = forms.FileField(
+        label='Arquivo CSV',
+        help_text='Cabeçalho obrigatório com as colunas nome e email; telefone, genero, cidade e cpf são opcionais.',
+        widget=forms.ClearableFileInput(attrs={'accept': '.csv,text/csv'}),
+    )
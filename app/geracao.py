@@ -0,0 +1,135 @@
+import datetime
+import random
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+from faker import Faker
+
+from app.models import GENERO, Evento, Inscricao, Organizador, Participante
+
+TAMANHO_AMOSTRA = 500
+BANNER_PADRAO = 'media/banners/evento_gerado'
+
+
+def amostras(semente=0):
+    # Faker é caro por chamada; sorteia um conjunto pequeno e reaproveita por índice
+    fake = Faker('pt_BR')
+    fake.seed_instance(semente)
+    return {
+        'nomes': [fake.name() for _ in range(TAMANHO_AMOSTRA)],
+        'telefones': [fake.phone_number() for _ in range(TAMANHO_AMOSTRA)],
+        'cidades': [fake.city() for _ in range(TAMANHO_AMOSTRA)],
+        'cpfs': [fake.cpf() for _ in range(TAMANHO_AMOSTRA)],
+        'cnpjs': [fake.cnpj() for _ in range(TAMANHO_AMOSTRA)],
+        'empresas': [fake.company() for _ in range(TAMANHO_AMOSTRA)],
+        'frases': [fake.catch_phrase() for _ in range(TAMANHO_AMOSTRA)],
+        'textos': [fake.text(max_nb_chars=300) for _ in range(TAMANHO_AMOSTRA)],
+    }
+
+
+def faixas(total, partes):
+    tamanho = max(1, -(-total // partes))
+    return [(inicio, min(inicio + tamanho, total)) for inicio in range(0, total, tamanho)]
+
+
+def criar_usuarios(prefixo, inicio, fim, senha_hash):
+    usuarios = [
+        User(username=f'{prefixo}{i}', email=f'{prefixo}{i}@exemplo.com', password=senha_hash)
+        for i in range(inicio, fim)
+    ]
+    return User.objects.bulk_create(usuarios)
+
+
+def criar_organizadores(prefixo, quantidade, senha_hash, lote):
+    dados = amostras()
+    organizadores = []
+    for inicio in range(0, quantidade, lote):
+        fim = min(inicio + lote, quantidade)
+        with transaction.atomic():
+            usuarios = criar_usuarios(f'{prefixo}_org', inicio, fim, senha_hash)
+            organizadores += Organizador.objects.bulk_create([
+                Organizador(
+                    user=usuario,
+                    nome_organizador=dados['empresas'][i % TAMANHO_AMOSTRA],
+                    telefone=dados['telefones'][i % TAMANHO_AMOSTRA],
+                    genero=GENERO[i % len(GENERO)][0],
+                    cidade=dados['cidades'][i % TAMANHO_AMOSTRA],
+                    cnpj=dados['cnpjs'][i % TAMANHO_AMOSTRA],
+                )
+                for i, usuario in zip(range(inicio, fim), usuarios)
+            ])
+    return [organizador.pk for organizador in organizadores]
+
+
+def inscritos_do_evento(indice, total_eventos, total_inscricoes):
+    # A inscrição k vai para o evento k % total_eventos
+    return total_inscricoes // total_eventos + (1 if indice < total_inscricoes % total_eventos else 0)
+
+
+def criar_eventos(organizadores_ids, quantidade, total_inscricoes, lote):
+    dados = amostras()
+    agora = timezone.now()
+    sorteio = random.Random(quantidade)
+    eventos = []
+    for inicio in range(0, quantidade, lote):
+        fim = min(inicio + lote, quantidade)
+        novos = []
+        for i in range(inicio, fim):
+            inscritos = inscritos_do_evento(i, quantidade, total_inscricoes)
+            novos.append(Evento(
+                organizador_id=organizadores_ids[i % len(organizadores_ids)],
+                titulo=dados['frases'][i % TAMANHO_AMOSTRA][:100],
+                descricao=dados['textos'][i % TAMANHO_AMOSTRA],
+                data=agora + datetime.timedelta(days=sorteio.randint(1, 365), minutes=sorteio.randint(0, 1439)),
+                local=dados['cidades'][i % TAMANHO_AMOSTRA],
+                capacidade_max=inscritos + sorteio.randint(0, 50),
+                inscritos=inscritos,
+                imagem_banner=BANNER_PADRAO,
+            ))
+        with transaction.atomic():
+            eventos += Evento.objects.bulk_create(novos)
+    return [evento.pk for evento in eventos]
+
+
+def criar_participantes(prefixo, inicio, fim, senha_hash, lote):
+    dados = amostras(inicio)
+    ids = []
+    for parte_inicio in range(inicio, fim, lote):
+        parte_fim = min(parte_inicio + lote, fim)
+        with transaction.atomic():
+            usuarios = criar_usuarios(f'{prefixo}_part', parte_inicio, parte_fim, senha_hash)
+            participantes = Participante.objects.bulk_create([
+                Participante(
+                    user=usuario,
+                    nome=dados['nomes'][i % TAMANHO_AMOSTRA],
+                    telefone=dados['telefones'][i % TAMANHO_AMOSTRA],
+                    genero=GENERO[i % len(GENERO)][0],
+                    cidade=dados['cidades'][i % TAMANHO_AMOSTRA],
+                    cpf=dados['cpfs'][i % TAMANHO_AMOSTRA],
+                )
+                for i, usuario in zip(range(parte_inicio, parte_fim), usuarios)
+            ])
+        ids += [participante.pk for participante in participantes]
+    return ids
+
+
+def criar_inscricoes(eventos_ids, participantes_ids, inicio, fim, lote):
+    # A inscrição k liga o evento k % E ao participante (k // E + deslocamento do evento) % P:
+    # para um mesmo evento os participantes nunca se repetem, respeitando a restrição única.
+    total_eventos = len(eventos_ids)
+    total_participantes = len(participantes_ids)
+    deslocamento = max(1, total_participantes // total_eventos)
+    for parte_inicio in range(inicio, fim, lote):
+        parte_fim = min(parte_inicio + lote, fim)
+        with transaction.atomic():
+            Inscricao.objects.bulk_create([
+                Inscricao(
+                    evento_id=eventos_ids[k % total_eventos],
+                    participante_id=participantes_ids[
+                        (k // total_eventos + (k % total_eventos) * deslocamento) % total_participantes
+                    ],
+                )
+                for k in range(parte_inicio, parte_fim)
+            ])
+    return fim - inicio
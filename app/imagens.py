@@ -0,0 +1,166 @@
+import hashlib
+import io
+import logging
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import storages
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from app.armazenamento import armazenamento_banners, armazenamento_local
+
+logger = logging.getLogger('app.imagens')
+
+# (largura, altura) em 16:9, a proporção do card
+RENDICOES = {
+    'miniatura': (320, 180),
+    'card': (640, 360),
+    'destaque': (1280, 720),
+}
+FORMATOS = {
+    'avif': ('AVIF', {'quality': 55}),
+    'webp': ('WEBP', {'quality': 78, 'method': 4}),
+    'jpg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+# Gerado por último: a existência dele indica que o conjunto está completo
+RENDICAO_FINAL = (list(RENDICOES)[-1], list(FORMATOS)[-1])
+# Entra no hash: mudar tamanhos ou qualidade gera arquivos novos em vez de servir os antigos do cache
+VERSAO_RENDICOES = 1
+# O card ocupa a largura toda até sm, metade até md e um terço acima disso
+TAMANHOS_CARD = '(min-width: 768px) 33vw, (min-width: 576px) 50vw, 100vw'
+
+
+def armazenamento():
+    if 'rendicoes' in settings.STORAGES:
+        return storages['rendicoes']
+    # Banners remotos sem um storage "rendicoes": o disco da instância é efêmero e não é compartilhado,
+    # então não há renditions e o Cloudinary redimensiona pela URL
+    if hasattr(armazenamento_banners, 'url_redimensionada'):
+        return None
+    return armazenamento_local
+
+
+def nome_rendicao(hash_conteudo, rendicao, formato):
+    return f'rendicoes/{hash_conteudo[:2]}/{hash_conteudo}/{rendicao}.{formato}'
+
+
+def nomes_rendicoes(hash_conteudo):
+    if not hash_conteudo:
+        return []
+    return [
+        nome_rendicao(hash_conteudo, rendicao, formato) for rendicao in RENDICOES for formato in FORMATOS
+    ]
+
+
+def e_rendicao(nome):
+    return nome.startswith('rendicoes/')
+
+
+def hash_da_rendicao(nome):
+    return nome.split('/')[2]
+
+
+def hash_do_conteudo(arquivo):
+    digest = hashlib.sha256(f'rendicoes-v{VERSAO_RENDICOES}'.encode())
+    for bloco in arquivo.chunks():
+        digest.update(bloco)
+    arquivo.seek(0)
+    return digest.hexdigest()[:32]
+
+
+def abrir_imagem(arquivo):
+    with Image.open(arquivo) as imagem:
+        # Fotos de celular vêm deitadas com a rotação só no EXIF
+        imagem = ImageOps.exif_transpose(imagem)
+        if imagem.mode in ('RGBA', 'LA', 'P'):
+            imagem = imagem.convert('RGBA')
+            fundo = Image.new('RGB', imagem.size, 'white')
+            fundo.paste(imagem, mask=imagem.getchannel('A'))
+            return fundo
+        return imagem.convert('RGB')
+
+
+def gerar_rendicoes(arquivo):
+    destino = armazenamento()
+    if destino is None:
+        return ''
+    hash_conteudo = hash_do_conteudo(arquivo)
+    # O último arquivo gerado existe: o mesmo conteúdo já foi processado (reenvio ou outro evento)
+    if destino.exists(nome_rendicao(hash_conteudo, *RENDICAO_FINAL)):
+        return hash_conteudo
+
+    try:
+        imagem = abrir_imagem(arquivo)
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError):
+        logger.warning('Banner não pôde ser lido como imagem; as renditions não foram geradas')
+        return ''
+    finally:
+        arquivo.seek(0)
+
+    for rendicao, tamanho in RENDICOES.items():
+        redimensionada = ImageOps.fit(imagem, tamanho, Image.Resampling.LANCZOS)
+        for formato, (codec, opcoes) in FORMATOS.items():
+            nome = nome_rendicao(hash_conteudo, rendicao, formato)
+            if destino.exists(nome):
+                continue
+            saida = io.BytesIO()
+            redimensionada.save(saida, codec, **opcoes)
+            destino.save(nome, ContentFile(saida.getvalue()))
+    return hash_conteudo
+
+
+def apagar_rendicoes(nomes, em_uso):
+    destino = armazenamento()
+    if destino is None:
+        return []
+    # A rendition final sai primeiro: sem ela, um upload do mesmo conteúdo regenera o conjunto todo
+    final = '/{}.{}'.format(*RENDICAO_FINAL)
+    apagados = []
+    for nome in sorted(set(nomes), key=lambda nome: not nome.endswith(final)):
+        if not em_uso([nome]):
+            destino.delete(nome)
+            apagados.append(nome)
+    return apagados
+
+
+class BannerResponsivo:
+    def __init__(self, evento):
+        # Hash de renditions sem storage no backend atual (ex.: banners migrados para o Cloudinary) é ignorado
+        self.destino = armazenamento() if evento.banner_hash else None
+        self.hash = evento.banner_hash if self.destino is not None else ''
+        self.original = evento.imagem_banner
+
+    def url(self, rendicao='card', formato='jpg'):
+        if self.hash:
+            return self.destino.url(nome_rendicao(self.hash, rendicao, formato))
+        # Banners anteriores às renditions: o Cloudinary redimensiona pela URL; no disco local vai o original
+        if hasattr(self.original.storage, 'url_redimensionada'):
+            return self.original.storage.url_redimensionada(self.original.name, *RENDICOES[rendicao])
+        return self.original.url
+
+    def srcset(self, formato='jpg'):
+        if not self.hash and not hasattr(self.original.storage, 'url_redimensionada'):
+            return ''
+        return ', '.join(
+            f'{self.url(rendicao, formato)} {largura}w' for rendicao, (largura, _) in RENDICOES.items()
+        )
+
+    @property
+    def src(self):
+        return self.url()
+
+    @property
+    def srcset_avif(self):
+        return self.srcset('avif')
+
+    @property
+    def srcset_webp(self):
+        return self.srcset('webp')
+
+    @property
+    def srcset_jpg(self):
+        return self.srcset()
+
+    @property
+    def tamanhos(self):
+        return TAMANHOS_CARD
@@ -0,0 +1,174 @@
+import csv
+import io
+import itertools
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+from django.db.models import F, Q
+from django.db.models.functions import Lower
+
+from app.catalogo import invalidar_catalogo
+from app.emails import enfileirar_emails, montar_emails_confirmacao
+from app.models import GENERO, Evento, Inscricao, ListaEspera, Participante
+from app.perfis import invalidar_perfis
+from app.transmissao import publicar_vagas
+
+CABECALHO_IMPORTACAO = ['nome', 'email', 'telefone', 'genero', 'cidade', 'cpf']
+LOTE_IMPORTACAO = 1000
+GENEROS = {codigo for codigo, _ in GENERO}
+# Usuários novos usam o e-mail como username
+MAX_EMAIL = User._meta.get_field('username').max_length
+
+
+class ImportacaoRecusada(Exception):
+    pass
+
+
+def ler_linhas(arquivo):
+    # Lê o upload aos poucos (o Django já o guarda em disco acima de 2,5 MB); utf-8-sig aceita o BOM do Excel
+    texto = io.TextIOWrapper(arquivo, encoding='utf-8-sig', newline='')
+    leitor = csv.DictReader(texto)
+    faltando = set(CABECALHO_IMPORTACAO[:2]) - set(leitor.fieldnames or [])
+    if faltando:
+        raise ImportacaoRecusada(f"Colunas obrigatórias ausentes: {', '.join(sorted(faltando))}.")
+    # A linha 1 é o cabeçalho
+    return enumerate(leitor, start=2)
+
+
+def validar_linha(linha):
+    email = (linha.get('email') or '').strip().lower()
+    nome = (linha.get('nome') or '').strip()
+    if not nome:
+        raise ValidationError('nome vazio')
+    validate_email(email)
+    if len(email) > MAX_EMAIL:
+        raise ValidationError(f'e-mail com mais de {MAX_EMAIL} caracteres')
+    genero = (linha.get('genero') or '').strip().upper()
+    return {
+        'email': email,
+        'nome': nome[:100],
+        'telefone': (linha.get('telefone') or '').strip()[:20],
+        'genero': genero if genero in GENEROS else 'P',
+        'cidade': (linha.get('cidade') or '').strip()[:100],
+        'cpf': (linha.get('cpf') or '').strip()[:14],
+    }
+
+
+def resolver_participantes(dados):
+    # Usuários são localizados pelo e-mail (ou username igual ao e-mail, como os criados aqui)
+    emails = list(dados)
+    encontrados = User.objects.annotate(email_normalizado=Lower('email')).filter(
+        Q(email_normalizado__in=emails) | Q(username__in=emails)
+    ).select_related('participante', 'organizador')
+    usuarios = {}
+    for usuario in encontrados:
+        for chave in (usuario.email_normalizado, usuario.username):
+            if chave in dados:
+                usuarios.setdefault(chave, usuario)
+
+    # Sem senha utilizável; o marcador aleatório pode ser o mesmo para todos
+    senha = make_password(None)
+    novos = [User(username=email, email=email, password=senha) for email in emails if email not in usuarios]
+    for usuario in User.objects.bulk_create(novos):
+        usuarios[usuario.email] = usuario
+    # Usuários recém-criados não têm perfil; evita o hasattr, que consultaria o banco para cada um
+    criados = {usuario.email for usuario in novos}
+
+    participantes, recusados, sem_perfil = {}, [], []
+    for email in emails:
+        usuario = usuarios[email]
+        existente = email not in criados
+        if existente and hasattr(usuario, 'participante'):
+            participantes[email] = usuario.participante
+        elif existente and hasattr(usuario, 'organizador'):
+            recusados.append(email)
+        else:
+            sem_perfil.append(Participante(user=usuario, **{
+                campo: valor for campo, valor in dados[email].items() if campo != 'email'
+            }))
+    for participante in Participante.objects.bulk_create(sem_perfil):
+        participantes[participante.user.email] = participante
+    # bulk_create não dispara sinais: usuários antigos podem ter o perfil "sem participante" em cache
+    invalidar_perfis([participante.user_id for participante in sem_perfil])
+    return participantes, recusados, len(novos)
+
+
+def importar_inscricoes(evento, arquivo, lote=LOTE_IMPORTACAO):
+    try:
+        return processar_importacao(evento, arquivo, lote)
+    except UnicodeDecodeError:
+        raise ImportacaoRecusada('O arquivo precisa estar em UTF-8.')
+    except csv.Error as erro:
+        raise ImportacaoRecusada(f'CSV inválido: {erro}.')
+
+
+def processar_importacao(evento, arquivo, lote):
+    resultado = {'inscritos': 0, 'ja_inscritos': 0, 'usuarios_criados': 0, 'erros': []}
+    vistos = set()
+    pendentes = []
+    pendentes_na_espera = 0
+
+    # Tudo numa transação: se não houver vagas para o lote inteiro, nada fica gravado
+    with transaction.atomic():
+        linhas = ler_linhas(arquivo)
+        while True:
+            bloco = list(itertools.islice(linhas, lote))
+            if not bloco:
+                break
+
+            dados = {}
+            for numero, linha in bloco:
+                try:
+                    valores = validar_linha(linha)
+                except ValidationError as erro:
+                    resultado['erros'].append((numero, erro.messages[0]))
+                    continue
+                if valores['email'] in vistos:
+                    resultado['erros'].append((numero, 'e-mail repetido no arquivo'))
+                    continue
+                vistos.add(valores['email'])
+                dados[valores['email']] = valores
+
+            participantes, recusados, criados = resolver_participantes(dados)
+            resultado['usuarios_criados'] += criados
+            resultado['erros'] += [(None, f'{email} é organizador') for email in recusados]
+
+            ja_inscritos = set(Inscricao.objects.filter(
+                evento=evento, participante__in=participantes.values()
+            ).values_list('participante_id', flat=True))
+            resultado['ja_inscritos'] += len(ja_inscritos)
+            novos = [p for p in participantes.values() if p.pk not in ja_inscritos]
+            pendentes += novos
+            pendentes_na_espera += ListaEspera.objects.filter(evento=evento, participante__in=novos).count()
+
+        if pendentes:
+            # Quem já aguarda na lista de espera tem prioridade: a importação só usa as vagas que sobram
+            # depois dela (os próprios importados que estavam na fila saem dela)
+            na_espera = ListaEspera.objects.filter(evento=evento).count() - pendentes_na_espera
+            # Uma única reserva para o lote inteiro, com a mesma condição do inscrever()
+            reservou = Evento.objects.filter(
+                pk=evento.pk,
+                inscritos__lte=F('capacidade_max') - len(pendentes) - na_espera
+            ).update(inscritos=F('inscritos') + len(pendentes))
+            if not reservou:
+                evento.refresh_from_db(fields=['inscritos', 'capacidade_max'])
+                espera = f' ({na_espera} reservadas à lista de espera)' if na_espera else ''
+                raise ImportacaoRecusada(
+                    f'O evento tem {max(evento.vagas_restantes - na_espera, 0)} vagas restantes{espera} e o '
+                    f'arquivo tem {len(pendentes)} novas inscrições.'
+                )
+
+            for inicio in range(0, len(pendentes), lote):
+                parte = pendentes[inicio:inicio + lote]
+                Inscricao.objects.bulk_create(Inscricao(evento=evento, participante=p) for p in parte)
+                ListaEspera.objects.filter(evento=evento, participante__in=parte).delete()
+
+            enfileirar_emails(montar_emails_confirmacao(pendentes, evento))
+            # bulk_create não dispara sinais
+            invalidar_catalogo(evento.pk)
+            transaction.on_commit(lambda: publicar_vagas(evento.pk))
+        resultado['inscritos'] = len(pendentes)
+    return resultado
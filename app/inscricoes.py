@@ -0,0 +1,145 @@
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from app.catalogo import invalidar_catalogo
+from app.emails import enfileirar_emails, montar_email_confirmacao
+from app.models import Evento, Inscricao, ListaEspera
+
+
+class InscricaoRecusada(Exception):
+    mensagem = 'Não foi possível realizar a inscrição.'
+
+
+class InscricaoDuplicada(InscricaoRecusada):
+    mensagem = 'Você já está inscrito(a) neste evento.'
+
+
+class CapacidadeEsgotada(InscricaoRecusada):
+    mensagem = 'Desculpe, a capacidade máxima para este evento já foi atingida.'
+
+
+def inscrever(evento, participante):
+    # A reserva da vaga é um UPDATE condicional: o banco serializa as escritas na linha do
+    # evento, então nunca há mais inscritos que capacidade_max mesmo com requisições simultâneas.
+    try:
+        with transaction.atomic():
+            reservou = Evento.objects.filter(
+                pk=evento.pk,
+                inscritos__lt=F('capacidade_max')
+            ).update(inscritos=F('inscritos') + 1)
+
+            if not reservou:
+                raise CapacidadeEsgotada()
+
+            inscricao = Inscricao.objects.create(evento=evento, participante=participante)
+            # Quem estava na espera e conseguiu a vaga direto (ex.: capacidade aumentada) sai da fila
+            ListaEspera.objects.filter(evento=evento, participante=participante).delete()
+            return inscricao
+    except IntegrityError:
+        raise InscricaoDuplicada()
+    except CapacidadeEsgotada:
+        if Inscricao.objects.filter(evento=evento, participante=participante).exists():
+            raise InscricaoDuplicada()
+        raise
+
+
+def cancelar_inscricao(inscricao):
+    # A vaga liberada vai para o primeiro da lista de espera na mesma transação: nunca fica
+    # disponível para quem não está na fila enquanto houver alguém esperando
+    with transaction.atomic():
+        removidas, _ = Inscricao.objects.filter(pk=inscricao.pk).delete()
+        if removidas:
+            Evento.objects.filter(pk=inscricao.evento_id, inscritos__gt=0).update(inscritos=F('inscritos') - 1)
+            promover_da_espera(inscricao.evento_id)
+    return bool(removidas)
+
+
+def entrar_na_espera(evento, participante):
+    with transaction.atomic():
+        if Inscricao.objects.filter(evento=evento, participante=participante).exists():
+            raise InscricaoDuplicada()
+        try:
+            with transaction.atomic():
+                espera = ListaEspera.objects.create(evento=evento, participante=participante)
+        except IntegrityError:
+            espera = ListaEspera.objects.get(evento=evento, participante=participante)
+
+        # Uma vaga pode ter sido liberada entre a inscrição recusada e a entrada na fila
+        if espera.pk in {promovido.pk for promovido in promover_da_espera(evento.pk)}:
+            return None
+    return posicao_na_espera(espera)
+
+
+def posicao_na_espera(espera):
+    return ListaEspera.objects.filter(evento_id=espera.evento_id, pk__lte=espera.pk).count()
+
+
+def sair_da_espera(espera):
+    removidas, _ = ListaEspera.objects.filter(pk=espera.pk).delete()
+    return bool(removidas)
+
+
+def promover_da_espera(evento_id, limite=1):
+    fila = ListaEspera.objects.filter(evento_id=evento_id).select_related('evento', 'participante__user').order_by('pk')
+    if connection.features.has_select_for_update_skip_locked:
+        # Cancelamentos simultâneos promovem pessoas diferentes em vez de disputar a mesma
+        fila = fila.select_for_update(skip_locked=True, of=('self',))
+
+    promovidos = []
+    with transaction.atomic():
+        while len(promovidos) < limite:
+            espera = fila.first()
+            if espera is None:
+                break
+            try:
+                with transaction.atomic():
+                    reservou = Evento.objects.filter(
+                        pk=evento_id,
+                        inscritos__lt=F('capacidade_max')
+                    ).update(inscritos=F('inscritos') + 1)
+                    if not reservou:
+                        break
+
+                    ListaEspera.objects.filter(pk=espera.pk).delete()
+                    Inscricao.objects.create(evento_id=evento_id, participante=espera.participante)
+            except IntegrityError:
+                # Já inscrito por outro caminho (ex.: importação CSV): a vaga volta e a entrada sai da fila
+                ListaEspera.objects.filter(pk=espera.pk).delete()
+                continue
+            promovidos.append(espera)
+
+        if promovidos:
+            enfileirar_emails([
+                montar_email_confirmacao(espera.participante, espera.evento, promovido=True)
+                for espera in promovidos
+            ])
+    return promovidos
+
+
+def descontar_inscricoes_do_participante(participante):
+    com_espera = list(
+        ListaEspera.objects.filter(evento__inscricao__participante=participante)
+        .values_list('evento', flat=True).distinct()
+    )
+    # Um participante tem no máximo uma inscrição por evento, então um único UPDATE basta
+    Evento.objects.filter(
+        inscricao__participante=participante,
+        inscritos__gt=0
+    ).update(inscritos=F('inscritos') - 1)
+    for evento_id in com_espera:
+        promover_da_espera(evento_id)
+
+
+def recontar_inscritos():
+    total = Inscricao.objects.filter(evento=OuterRef('pk')).order_by().values('evento').annotate(
+        total=Count('id')
+    ).values('total')
+    divergentes = Evento.objects.annotate(
+        contagem=Coalesce(Subquery(total), 0)
+    ).exclude(inscritos=F('contagem'))
+    ids = list(divergentes.values_list('pk', flat=True))
+    corrigidos = Evento.objects.filter(pk__in=ids).update(inscritos=Coalesce(Subquery(total), 0))
+    if corrigidos:
+        invalidar_catalogo(*ids)
+    return corrigidos
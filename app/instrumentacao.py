@@ -0,0 +1,99 @@
+import json
+import logging
+import threading
+import time
+
+logger = logging.getLogger('app.instrumentacao')
+
+_trava = threading.Lock()
+_agregados = {}
+
+
+class Medicao:
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.sql_consultas = 0
+        self.sql_tempo = 0.0
+        self.template_inicio = None
+        self.template_tempo = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        # Usado como connection.execute_wrapper: mede cada consulta sem alterar o resultado
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_consultas += 1
+            self.sql_tempo += time.perf_counter() - inicio
+
+    def iniciar_template(self):
+        self.template_inicio = time.perf_counter()
+
+    def finalizar_template(self, response):
+        if self.template_inicio is not None:
+            self.template_tempo += time.perf_counter() - self.template_inicio
+        return response
+
+    def registro(self, request, response):
+        match = request.resolver_match
+        return {
+            'view': match.view_name if match else 'sem-rota',
+            'metodo': request.method,
+            'status': response.status_code,
+            'tempo_ms': round((time.perf_counter() - self.inicio) * 1000, 2),
+            'sql': self.sql_consultas,
+            'sql_ms': round(self.sql_tempo * 1000, 2),
+            'template_ms': round(self.template_tempo * 1000, 2),
+            'bytes': None if response.streaming else len(response.content),
+        }
+
+
+def medir_template(request, response):
+    # Chamado logo antes da renderização preguiçosa do TemplateResponse, pelo middleware ou por quem
+    # renderiza antes dele (PaginaAnonimaEmCacheMixin); uma resposta já renderizada não é medida de novo
+    medicao = getattr(request, '_medicao', None)
+    if medicao is not None and not response.is_rendered:
+        medicao.iniciar_template()
+        response.add_post_render_callback(medicao.finalizar_template)
+    return response
+
+
+def registrar_medicao(registro):
+    logger.info(json.dumps(registro, separators=(',', ':')))
+
+    with _trava:
+        agregado = _agregados.setdefault(registro['view'], {
+            'requisicoes': 0, 'tempo_ms': 0.0, 'tempo_max_ms': 0.0, 'sql': 0,
+            'sql_ms': 0.0, 'template_ms': 0.0, 'bytes': 0,
+        })
+        agregado['requisicoes'] += 1
+        agregado['tempo_ms'] += registro['tempo_ms']
+        agregado['tempo_max_ms'] = max(agregado['tempo_max_ms'], registro['tempo_ms'])
+        agregado['sql'] += registro['sql']
+        agregado['sql_ms'] += registro['sql_ms']
+        agregado['template_ms'] += registro['template_ms']
+        agregado['bytes'] += registro['bytes'] or 0
+
+
+def estatisticas_instrumentacao():
+    with _trava:
+        agregados = {view: dict(valores) for view, valores in _agregados.items()}
+
+    estatisticas = {}
+    for view, agregado in agregados.items():
+        total = agregado['requisicoes']
+        estatisticas[view] = {
+            'requisicoes': total,
+            'tempo_medio_ms': round(agregado['tempo_ms'] / total, 2),
+            'tempo_max_ms': agregado['tempo_max_ms'],
+            'sql_medio': round(agregado['sql'] / total, 2),
+            'sql_medio_ms': round(agregado['sql_ms'] / total, 2),
+            'template_medio_ms': round(agregado['template_ms'] / total, 2),
+            'bytes_medio': round(agregado['bytes'] / total),
+        }
+    return estatisticas
+
+
+def limpar_estatisticas():
+    with _trava:
+        _agregados.clear()
@@ -0,0 +1,118 @@
+import io
+import os
+import shutil
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import storages
+from django.core.management import BaseCommand
+from django.test import Client, override_settings
+from django.test.utils import setup_test_environment, teardown_test_environment
+from PIL import Image
+
+from app.benchmarks import percentis_ms
+
+
+def banners_sinteticos(quantidade, largura, altura):
+    # Ruído não comprime: o JPEG fica com o tamanho de uma foto real, não de um quadro liso
+    for _ in range(quantidade):
+        saida = io.BytesIO()
+        Image.frombytes('RGB', (largura, altura), os.urandom(largura * altura * 3)).save(saida, 'JPEG', quality=85)
+        yield saida.getvalue()
+
+
+def cronometrar(funcao, *args):
+    inicio = time.perf_counter()
+    resultado = funcao(*args)
+    return resultado, time.perf_counter() - inicio
+
+
+class Command(BaseCommand):
+    help = 'Mede a latência de upload e remoção de banners em cada backend de STORAGES'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--backends', nargs='+', choices=list(settings.BACKENDS_BANNER),
+                            default=list(settings.BACKENDS_BANNER))
+        parser.add_argument('--uploads', type=int, default=20)
+        parser.add_argument('--largura', type=int, default=1600)
+        parser.add_argument('--altura', type=int, default=900)
+
+    def handle(self, *args, **options):
+        banners = list(banners_sinteticos(options['uploads'], options['largura'], options['altura']))
+        tamanho_medio = sum(map(len, banners)) / len(banners) / 1024
+        print(f"🖼️ {len(banners)} banners de {options['largura']}x{options['altura']} (~{tamanho_medio:.0f} KB cada)")
+        print(f"{'backend':<12} {'operação':<16} {'p50 ms':>9} {'p95 ms':>9}")
+
+        for backend in options['backends']:
+            if backend == 'cloudinary' and not settings.CLOUDINARY_URL:
+                print(f"{backend:<12} ⏭️ CLOUDINARY_URL não configurada")
+                continue
+
+            config = dict(settings.BACKENDS_BANNER[backend])
+            pasta = None
+            if backend == 'local':
+                # Nunca grava no MEDIA_ROOT real
+                pasta = tempfile.mkdtemp(prefix='benchmark_banners_')
+                config['OPTIONS'] = {'location': pasta}
+            armazenamento = storages.create_storage(config)
+            try:
+                if pasta:
+                    # A leitura passa pela MidiaView, que serve os arquivos do MEDIA_ROOT; o ambiente
+                    # de teste libera o host do Client em ALLOWED_HOSTS
+                    setup_test_environment(debug=False)
+                    try:
+                        with override_settings(MEDIA_ROOT=pasta):
+                            self.medir(backend, armazenamento, banners, self.ler_pela_rota)
+                    finally:
+                        teardown_test_environment()
+                else:
+                    self.medir(backend, armazenamento, banners, self.ler_do_storage)
+            except Exception as erro:
+                print(f"{backend:<12} ❌ {erro}")
+            finally:
+                if pasta:
+                    shutil.rmtree(pasta, ignore_errors=True)
+
+    def ler_pela_rota(self, armazenamento, nome):
+        response = Client().get(armazenamento.url(nome))
+        return b''.join(response.streaming_content)
+
+    def ler_do_storage(self, armazenamento, nome):
+        with armazenamento.open(nome) as arquivo:
+            return arquivo.read()
+
+    def medir(self, backend, armazenamento, banners, ler):
+        medidas = {'upload': [], 'reenvio': [], 'leitura': [], 'remoção': []}
+        nomes = []
+        for conteudo in banners:
+            nome, tempo = cronometrar(armazenamento.save, 'banners/banner.jpg', ContentFile(conteudo))
+            nomes.append(nome)
+            medidas['upload'].append(tempo)
+        # O mesmo conteúdo de novo: no disco local é deduplicado, no Cloudinary é outro upload
+        for conteudo in banners:
+            nome, tempo = cronometrar(armazenamento.save, 'banners/banner.jpg', ContentFile(conteudo))
+            if nome not in nomes:
+                nomes.append(nome)
+            medidas['reenvio'].append(tempo)
+
+        for nome in nomes:
+            medidas['leitura'].append(cronometrar(ler, armazenamento, nome)[1])
+
+        metade = len(nomes) // 2
+        for nome in nomes[:metade]:
+            medidas['remoção'].append(cronometrar(armazenamento.delete, nome)[1])
+        if hasattr(armazenamento, 'apagar_em_lote'):
+            restantes = nomes[metade:]
+            _, tempo = cronometrar(armazenamento.apagar_em_lote, restantes)
+            medidas['remoção em lote'] = [tempo / max(len(restantes), 1)]
+        else:
+            for nome in nomes[metade:]:
+                medidas['remoção'].append(cronometrar(armazenamento.delete, nome)[1])
+
+        for operacao, tempos in medidas.items():
+            if tempos:
+                p50, p95 = percentis_ms(tempos)
+                print(f"{backend:<12} {operacao:<16} {p50:>9} {p95:>9}")
+        print(f"{backend:<12} 📦 {len(nomes)} arquivos distintos para {len(banners) * 2} envios")
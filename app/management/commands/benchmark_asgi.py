@@ -0,0 +1,57 @@
+from django.core.management import BaseCommand
+from django.db import connection, connections
+from django.test import Client
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from app.benchmarks import configuracao_de_benchmark, medir_asgi, medir_conexoes, medir_transmissao, popular
+from app.models import Evento
+
+
+class Command(BaseCommand):
+    help = ('Compara vazão e latência das rotas de leitura via WSGI (threads) e via ASGI (event loop) '
+            'e mede o custo das conexões SSE de vagas')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concorrencia', type=int, default=8,
+                            help='Threads no WSGI / requisições simultâneas no ASGI')
+        parser.add_argument('--requisicoes', type=int, default=50, help='Requisições por cliente')
+        parser.add_argument('--assinantes', type=int, default=1000, help='Conexões SSE abertas simultaneamente')
+
+    def handle(self, *args, **options):
+        setup_test_environment(debug=False)
+        configuracao = configuracao_de_benchmark()
+        configuracao.enable()
+        banco_original = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            # Dados confirmados (sem rollback): as requisições usam conexões próprias
+            dados = popular('pequeno')
+            client = Client()
+            client.force_login(dados['usuarios']['participante'])
+            cookie = f"sessionid={client.cookies['sessionid'].value}"
+            ids = ','.join(str(pk) for pk in Evento.objects.values_list('pk', flat=True)[:20])
+
+            caminhos = ['/', '/eventos', f'/eventos/disponibilidade?ids={ids}']
+            concorrencia, requisicoes = options['concorrencia'], options['requisicoes']
+            print(f"🚦 {concorrencia} clientes × {requisicoes} requisições ({connection.vendor})")
+            for caminho in caminhos:
+                print(f"   {caminho.split('?')[0]}")
+                for nome, medir in (('WSGI', medir_conexoes), ('ASGI', medir_asgi)):
+                    connections.close_all()
+                    medida = medir(caminho, cookie, concorrencia, requisicoes)
+                    print(
+                        f"      {nome} {medida['por_segundo']:>8} req/s | p50 {medida['p50_ms']} ms | "
+                        f"p95 {medida['p95_ms']} ms | conexões abertas: {medida['conexoes_abertas']}"
+                    )
+
+            medida = medir_transmissao(options['assinantes'], dados['evento'])
+            print(
+                f"📡 {medida['assinantes']} conexões SSE: {medida['memoria_por_conexao_kb']} KB e "
+                f"{medida['threads_por_conexao']} threads por conexão | entrega p50 {medida['entrega_p50_ms']} ms, "
+                f"p95 {medida['entrega_p95_ms']} ms, todas em {medida['entrega_total_ms']} ms"
+            )
+        finally:
+            connections.close_all()
+            connection.creation.destroy_test_db(banco_original, verbosity=0)
+            configuracao.disable()
+            teardown_test_environment()
@@ -0,0 +1,62 @@
+from django.core.management import BaseCommand
+from django.db import connection, connections
+from django.test import Client
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from app.benchmarks import configuracao_de_benchmark, medir_conexoes, popular
+
+
+class Command(BaseCommand):
+    help = 'Compara a latência por requisição sob carga concorrente com e sem conexões persistentes/pool'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--requisicoes', type=int, default=100, help='Requisições por thread')
+        parser.add_argument('--idade', type=int, default=60, help='CONN_MAX_AGE do modo persistente')
+
+    def handle(self, *args, **options):
+        setup_test_environment(debug=False)
+        configuracao = configuracao_de_benchmark()
+        configuracao.enable()
+        configuracao = connections.settings['default']
+        original = {chave: configuracao[chave] for chave in ('NAME', 'CONN_MAX_AGE', 'CONN_HEALTH_CHECKS', 'OPTIONS')}
+        opcoes = {chave: valor for chave, valor in original['OPTIONS'].items() if chave != 'pool'}
+        pool = original['OPTIONS'].get('pool')
+
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            # Dados confirmados (sem rollback): as threads usam conexões próprias
+            dados = popular('pequeno')
+            client = Client()
+            client.force_login(dados['usuarios']['participante'])
+            cookie = f"sessionid={client.cookies['sessionid'].value}"
+
+            modos = {
+                'sem persistência': {'CONN_MAX_AGE': 0, 'CONN_HEALTH_CHECKS': False, 'OPTIONS': opcoes},
+                f"CONN_MAX_AGE={options['idade']}": {
+                    'CONN_MAX_AGE': options['idade'], 'CONN_HEALTH_CHECKS': True, 'OPTIONS': opcoes,
+                },
+            }
+            if pool:
+                modos['pool psycopg'] = {'CONN_MAX_AGE': 0, 'CONN_HEALTH_CHECKS': False,
+                                         'OPTIONS': {**opcoes, 'pool': pool}}
+
+            print(f"🔌 {options['threads']} threads × {options['requisicoes']} requisições em /eventos "
+                  f"({connection.vendor})")
+            for nome, ajustes in modos.items():
+                connections.close_all()
+                # O dicionário de configuração é compartilhado pelas conexões de todas as threads
+                configuracao.update(ajustes)
+                medida = medir_conexoes('/eventos', cookie, options['threads'], options['requisicoes'])
+                print(
+                    f"   {nome:<20} {medida['por_segundo']:>8} req/s | p50 {medida['p50_ms']} ms | "
+                    f"p95 {medida['p95_ms']} ms | conexões abertas: {medida['conexoes_abertas']}"
+                )
+            if pool:
+                connection.close_pool()
+        finally:
+            connections.close_all()
+            configuracao.update({chave: valor for chave, valor in original.items() if chave != 'NAME'})
+            connection.creation.destroy_test_db(original['NAME'], verbosity=0)
+            configuracao.disable()
+            teardown_test_environment()
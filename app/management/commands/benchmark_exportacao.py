@@ -0,0 +1,63 @@
+import datetime
+import time
+import tracemalloc
+
+from django.core.management import BaseCommand, CommandError
+from django.utils import timezone
+
+from app.exportacao import CABECALHO_INSCRICOES, exportar, linhas_inscricoes
+from app.models import Organizador
+
+
+def inscricoes_sinteticas(quantidade):
+    inicio = timezone.now()
+    for i in range(quantidade):
+        yield (
+            f'Participante {i}',
+            f'participante{i}@exemplo.com',
+            f'Evento {i % 500}',
+            '(11) 99999-0000',
+            'F' if i % 2 else 'M',
+            f'Cidade {i % 300}',
+            f'{i:011d}',
+            inicio - datetime.timedelta(seconds=i),
+        )
+
+
+class Command(BaseCommand):
+    help = 'Mede tempo e pico de memória da exportação em streaming de inscrições'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--linhas', type=int, default=1_000_000, help='Inscrições sintéticas a exportar')
+        parser.add_argument('--organizador', type=int, help='Exporta as inscrições reais deste organizador')
+        parser.add_argument('--formato', choices=['csv', 'xlsx'], default='csv')
+        parser.add_argument('--gzip', action='store_true')
+        parser.add_argument('--memoria', action='store_true',
+                            help='Mede o pico de memória com tracemalloc (deixa a exportação mais lenta)')
+
+    def handle(self, *args, **options):
+        if options['organizador']:
+            try:
+                organizador = Organizador.objects.get(pk=options['organizador'])
+            except Organizador.DoesNotExist:
+                raise CommandError('Organizador não encontrado.')
+            linhas = linhas_inscricoes(organizador)
+            origem = f'inscrições do organizador {organizador.pk}'
+        else:
+            linhas = inscricoes_sinteticas(options['linhas'])
+            origem = f"{options['linhas']} inscrições sintéticas"
+
+        if options['memoria']:
+            tracemalloc.start()
+        inicio = time.perf_counter()
+        total_bytes = 0
+        for bloco in exportar(CABECALHO_INSCRICOES, linhas, formato=options['formato'], gzip=options['gzip']):
+            total_bytes += len(bloco)
+        duracao = time.perf_counter() - inicio
+
+        print(f"📊 Exportação {options['formato']}{' gzip' if options['gzip'] else ''} de {origem}")
+        print(f"   Tempo: {duracao:.2f}s | Tamanho: {total_bytes / 1024 / 1024:.1f} MB")
+        if options['memoria']:
+            _, pico = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"   Pico de memória: {pico / 1024 / 1024:.1f} MB")
@@ -0,0 +1,67 @@
+import logging
+
+from django.core.management import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from app.benchmarks import TAMANHOS, carregar_baseline, comparar_com_baseline, configuracao_de_benchmark, medir_tamanho, \
+    rotas_que_escalam, rotas_sem_benchmark, salvar_baseline
+
+
+class Command(BaseCommand):
+    help = 'Mede consultas, latência p50/p95 e pico de memória de todas as rotas num banco de teste populado'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tamanhos', nargs='+', choices=list(TAMANHOS), default=list(TAMANHOS))
+        parser.add_argument('--repeticoes', type=int, default=20)
+        parser.add_argument('--salvar-baseline', action='store_true',
+                            help='Grava os resultados como a nova baseline em vez de comparar')
+
+    def handle(self, *args, **options):
+        faltando = rotas_sem_benchmark()
+        if faltando:
+            raise CommandError(f"Rotas sem benchmark definido em app/benchmarks.py: {', '.join(faltando)}")
+
+        # Nunca popula o banco real: cria um banco de teste descartável como o test runner
+        setup_test_environment(debug=False)
+        configuracao = configuracao_de_benchmark()
+        configuracao.enable()
+        # As rotas acessadas sem permissão geram 403/404 esperados; não poluem a saída
+        logging.getLogger('django.request').setLevel(logging.ERROR)
+        banco_original = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            resultados = {}
+            for tamanho in options['tamanhos']:
+                print(f"⏱️ Medindo rotas com a base '{tamanho}'...")
+                resultados[tamanho] = medir_tamanho(tamanho, options['repeticoes'])
+                self.imprimir(tamanho, resultados[tamanho])
+        finally:
+            connection.creation.destroy_test_db(banco_original, verbosity=0)
+            configuracao.disable()
+            teardown_test_environment()
+
+        problemas = []
+        if len(resultados) > 1:
+            for chave, consultas in rotas_que_escalam(resultados).items():
+                problemas.append(f"{chave}: consultas crescem com a base {consultas}")
+
+        if options['salvar_baseline']:
+            baseline = carregar_baseline()
+            baseline.update(resultados)
+            salvar_baseline(baseline)
+            print("✅ Baseline atualizada.")
+        else:
+            problemas += comparar_com_baseline(resultados, carregar_baseline())
+
+        if problemas:
+            raise CommandError('Regressões de desempenho:\n' + '\n'.join(problemas))
+        print("✅ Nenhuma regressão encontrada.")
+
+    def imprimir(self, tamanho, resultados):
+        print(f"{'rota:papel':<42} {'status':>6} {'consultas':>9} {'p50 ms':>8} {'p95 ms':>8} {'memória KB':>11}")
+        for chave, medida in resultados.items():
+            print(
+                f"{chave:<42} {medida['status']:>6} {medida['consultas']:>9} {medida['p50_ms']:>8} "
+                f"{medida['p95_ms']:>8} {medida['memoria_kb']:>11}"
+            )
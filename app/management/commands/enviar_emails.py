@@ -0,0 +1,24 @@
+import time
+
+from django.core.management import BaseCommand
+from app.emails import processar_fila
+
+
+class Command(BaseCommand):
+    help = 'Envia os e-mails pendentes da fila em lotes, reaproveitando uma conexão SMTP por lote'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=100, help='E-mails por lote')
+        parser.add_argument('--continuo', action='store_true', help='Fica em execução esvaziando a fila')
+        parser.add_argument('--intervalo', type=float, default=5, help='Segundos de espera quando a fila está vazia')
+
+    def handle(self, *args, **options):
+        while True:
+            enviados, falhas = processar_fila(options['lote'])
+            if enviados or falhas:
+                print(f"📧 {enviados} e-mails enviados, {falhas} falhas reagendadas.")
+
+            if enviados + falhas < options['lote']:
+                if not options['continuo']:
+                    break
+                time.sleep(options['intervalo'])
@@ -1,52 +1,79 @@
-from django.contrib.auth.models import User
-from django.core.management import BaseCommand
-from app.models import Evento, Participante, Inscricao
-from faker import Faker
+import secrets
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.core.management import BaseCommand, CommandError
+from django.db import connections
+
+from app.busca import reindexar_eventos
+from app.catalogo import invalidar_catalogo
+from app.geracao import criar_eventos, criar_inscricoes, criar_organizadores, criar_participantes, faixas
+
 
 class Command(BaseCommand):
-    help = 'Gera participantes e inscrições falsas para eventos'
-
-    def handle(self, *args, **kwargs):
-        fake = Faker('pt_BR')
-
-        NUM_EVENTOS = 9
-        PARTICIPANTES_POR_EVENTO = 5
-        TOTAL_PARTICIPANTES = NUM_EVENTOS * PARTICIPANTES_POR_EVENTO
-
-        generos = ['Masculino', 'Feminino', 'Outro']
-        eventos = Evento.objects.all()[:NUM_EVENTOS]
-
-        if len(eventos) < NUM_EVENTOS:
-            print("⚠️ Não há eventos suficientes no banco de dados.")
-        else:
-            participantes = []
-
-            for i in range(TOTAL_PARTICIPANTES):
-                user = User.objects.create_user(
-                    username=fake.unique.user_name(),
-                    email=fake.unique.email(),
-                    password='senha123'
-                )
-
-                participante = Participante.objects.create(
-                    user=user,
-                    nome=fake.name(),
-                    telefone=fake.phone_number(),
-                    genero=fake.random_element(generos),
-                    cidade=fake.city(),
-                    cpf=fake.cpf()
-                )
-
-                participantes.append(participante)
-
-            # Criar inscrições: 5 participantes por evento
-            inscricoes = []
-            for i, evento in enumerate(eventos):
-                grupo = participantes[i * PARTICIPANTES_POR_EVENTO: (i + 1) * PARTICIPANTES_POR_EVENTO]
-                for participante in grupo:
-                    inscricoes.append(Inscricao(evento=evento, participante=participante))
-
-            Inscricao.objects.bulk_create(inscricoes)
-
-            print(
-                f"✅ Criados {TOTAL_PARTICIPANTES} participantes e {len(inscricoes)} inscrições para {NUM_EVENTOS} eventos.")
\ No newline at end of file
+    help = 'Gera organizadores, eventos, participantes e inscrições falsas em massa para testes de carga'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--organizadores', type=int, default=3)
+        parser.add_argument('--eventos', type=int, default=9)
+        parser.add_argument('--participantes', type=int, default=45)
+        parser.add_argument('--inscricoes', type=int, default=45)
+        parser.add_argument('--lote', type=int, default=5000, help='Linhas por bulk_create/transação')
+        parser.add_argument('--processos', type=int, default=1,
+                            help='Processos para gerar participantes e inscrições em paralelo')
+        parser.add_argument('--senha', default='senha123', help='Senha de todos os usuários gerados')
+
+    def handle(self, *args, **options):
+        organizadores, eventos = options['organizadores'], options['eventos']
+        participantes, inscricoes = options['participantes'], options['inscricoes']
+        lote, processos = options['lote'], options['processos']
+
+        if min(organizadores, eventos, participantes, lote, processos) < 1 or inscricoes < 0:
+            raise CommandError('As quantidades devem ser positivas.')
+        if inscricoes > eventos * participantes:
+            raise CommandError(
+                f'{inscricoes} inscrições não cabem em {eventos} eventos × {participantes} participantes '
+                f'sem repetir participante no mesmo evento.'
+            )
+
+        inicio = time.perf_counter()
+        # O hash PBKDF2 é o passo mais caro de create_user; todos os usuários compartilham o mesmo
+        senha_hash = make_password(options['senha'])
+        prefixo = secrets.token_hex(3)
+
+        organizadores_ids = criar_organizadores(prefixo, organizadores, senha_hash, lote)
+        eventos_ids = criar_eventos(organizadores_ids, eventos, inscricoes, lote)
+        print(f"✅ {len(organizadores_ids)} organizadores e {len(eventos_ids)} eventos criados.")
+
+        participantes_ids = self.executar(
+            processos,
+            criar_participantes,
+            [(prefixo, a, b, senha_hash, lote) for a, b in faixas(participantes, processos)],
+        )
+        participantes_ids = [pk for parte in participantes_ids for pk in parte]
+        print(f"✅ {len(participantes_ids)} participantes criados.")
+
+        criadas = self.executar(
+            processos,
+            criar_inscricoes,
+            [(eventos_ids, participantes_ids, a, b, lote) for a, b in faixas(inscricoes, processos)],
+        )
+        reindexar_eventos()
+        # bulk_create não dispara sinais; os eventos são novos, então basta a listagem
+        invalidar_catalogo(listagem=True)
+
+        print(
+            f"✅ {sum(criadas)} inscrições criadas em {time.perf_counter() - inicio:.1f}s "
+            f"(usuários com prefixo '{prefixo}_', senha '{options['senha']}')."
+        )
+
+    def executar(self, processos, funcao, tarefas):
+        if processos == 1 or len(tarefas) < 2:
+            return [funcao(*tarefa) for tarefa in tarefas]
+
+        # Cada processo abre a própria conexão; a herdada do fork não pode ser compartilhada
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=processos, initializer=django.setup) as executor:
+            return list(executor.map(funcao, *zip(*tarefas)))
@@ -0,0 +1,38 @@
+import time
+
+from django.core.management import BaseCommand, CommandError
+
+from app.importacao import LOTE_IMPORTACAO, ImportacaoRecusada, importar_inscricoes
+from app.models import Evento
+
+
+class Command(BaseCommand):
+    help = 'Importa participantes de um CSV (nome,email[,telefone,genero,cidade,cpf]) e os inscreve num evento'
+
+    def add_arguments(self, parser):
+        parser.add_argument('evento_id', type=int)
+        parser.add_argument('arquivo', help='Caminho do CSV com cabeçalho')
+        parser.add_argument('--lote', type=int, default=LOTE_IMPORTACAO, help='Linhas por bulk_create')
+
+    def handle(self, *args, **options):
+        if options['lote'] < 1:
+            raise CommandError('O lote deve ser positivo.')
+        try:
+            evento = Evento.objects.get(pk=options['evento_id'])
+        except Evento.DoesNotExist:
+            raise CommandError(f"Evento {options['evento_id']} não existe.")
+
+        inicio = time.perf_counter()
+        try:
+            with open(options['arquivo'], 'rb') as arquivo:
+                resultado = importar_inscricoes(evento, arquivo, options['lote'])
+        except (OSError, ImportacaoRecusada) as erro:
+            raise CommandError(f'Importação cancelada: {erro}')
+
+        for linha, mensagem in resultado['erros']:
+            print(f"⚠️ {f'Linha {linha}' if linha else 'Ignorado'}: {mensagem}")
+        print(
+            f"✅ {resultado['inscritos']} inscrições criadas em '{evento.titulo}' em "
+            f"{time.perf_counter() - inicio:.1f}s ({resultado['usuarios_criados']} usuários novos, "
+            f"{resultado['ja_inscritos']} já inscritos, {len(resultado['erros'])} linhas ignoradas)."
+        )
@@ -0,0 +1,10 @@
+from django.core.management import BaseCommand
+from app.inscricoes import recontar_inscritos
+
+
+class Command(BaseCommand):
+    help = 'Corrige o contador de inscritos dos eventos a partir das inscrições existentes'
+
+    def handle(self, *args, **kwargs):
+        corrigidos = recontar_inscritos()
+        print(f"✅ {corrigidos} evento(s) com contador de inscritos corrigido.")
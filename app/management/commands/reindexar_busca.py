@@ -0,0 +1,10 @@
+from django.core.management import BaseCommand
+from app.busca import reindexar_eventos
+
+
+class Command(BaseCommand):
+    help = 'Reconstrói o índice de busca textual dos eventos'
+
+    def handle(self, *args, **kwargs):
+        reindexar_eventos()
+        print("✅ Índice de busca de eventos reconstruído.")
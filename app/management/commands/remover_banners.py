@@ -0,0 +1,25 @@
+import time
+
+from django.core.management import BaseCommand
+from app.banners import LOTE_REMOCAO, processar_remocoes
+
+
+class Command(BaseCommand):
+    help = 'Remove do storage, em lotes, os banners de eventos editados ou excluídos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=LOTE_REMOCAO, help='Banners por lote')
+        parser.add_argument('--continuo', action='store_true', help='Fica em execução esvaziando a fila')
+        parser.add_argument('--intervalo', type=float, default=30, help='Segundos de espera quando a fila está vazia')
+
+    def handle(self, *args, **options):
+        lote = options['lote']
+        while True:
+            removidos, falhas = processar_remocoes(lote)
+            if removidos or falhas:
+                print(f"🗑️ {removidos} banners removidos, {falhas} falhas reagendadas.")
+
+            if removidos + falhas < lote:
+                if not options['continuo']:
+                    break
+                time.sleep(options['intervalo'])
@@ -0,0 +1,64 @@
+import random
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connection
+from django.utils.functional import SimpleLazyObject
+from app.instrumentacao import Medicao, medir_template, registrar_medicao
+from app.perfis import acarregar_perfil, carregar_perfil
+
+
+class MiddlewareHibrido:
+    # Atende WSGI e ASGI sem trocar de thread: sob ASGI o Django recebe uma corrotina
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+
+async def aperfil(request):
+    if not hasattr(request, '_perfil_async'):
+        request._perfil_async = await acarregar_perfil(await request.auser())
+    return request._perfil_async
+
+
+class PerfilUsuarioMiddleware(MiddlewareHibrido):
+    def __call__(self, request):
+        # Resolvido só no primeiro acesso e reaproveitado por mixins, views e context processor.
+        # Views assíncronas usam request.aperfil(), que não toca o banco fora do ORM assíncrono.
+        request.perfil = SimpleLazyObject(lambda: carregar_perfil(request.user))
+        request.aperfil = lambda: aperfil(request)
+        return self.get_response(request)
+
+
+class InstrumentacaoMiddleware(MiddlewareHibrido):
+    def __call__(self, request):
+        # Com a amostragem desligada (padrão) o custo é só esta comparação
+        taxa = settings.INSTRUMENTACAO_AMOSTRAGEM
+        if not taxa or (taxa < 1 and random.random() >= taxa):
+            return self.get_response(request)
+
+        medicao = request._medicao = Medicao()
+        if iscoroutinefunction(self):
+            return self.medir_async(request, medicao)
+        with connection.execute_wrapper(medicao):
+            response = self.get_response(request)
+        registrar_medicao(medicao.registro(request, response))
+        return response
+
+    async def medir_async(self, request, medicao):
+        # As conexões são por thread e o ORM assíncrono consulta na thread da requisição
+        # (sync_to_async thread_sensitive), então o wrapper é instalado lá e não no event loop
+        await sync_to_async(lambda: connection.execute_wrappers.append(medicao))()
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(lambda: connection.execute_wrappers.remove(medicao))()
+        registrar_medicao(medicao.registro(request, response))
+        return response
+
+    def process_template_response(self, request, response):
+        return medir_template(request, response)
@@ -1,6 +1,5 @@
 # Generated by Django 5.2.4 on 2025-08-07 04:30
 
-import cloudinary_storage.storage
 from django.db import migrations, models
 
 
@@ -14,6 +13,6 @@ class Migration(migrations.Migration):
         migrations.AlterField(
             model_name='evento',
             name='imagem_banner',
-            field=models.ImageField(storage=cloudinary_storage.storage.MediaCloudinaryStorage(), upload_to='banners/'),
+            field=models.ImageField(upload_to='banners/'),
         ),
     ]
@@ -0,0 +1,62 @@
+from django.db import migrations
+from django.db.utils import OperationalError
+
+# Copiados de app/busca.py: a migration não pode mudar quando a busca mudar
+NOME_INDICE_GIN = 'evento_busca_gin'
+TABELA_FTS = 'app_evento_busca'
+
+
+def vetor_busca():
+    from django.contrib.postgres.search import SearchVector
+
+    return (
+        SearchVector('titulo', weight='A', config='portuguese') +
+        SearchVector('descricao', weight='B', config='portuguese') +
+        SearchVector('local', weight='C', config='portuguese')
+    )
+
+
+def criar_indice_busca(apps, schema_editor):
+    Evento = apps.get_model('app', 'Evento')
+    vendor = schema_editor.connection.vendor
+
+    if vendor == 'postgresql':
+        from django.contrib.postgres.indexes import GinIndex
+        schema_editor.add_index(Evento, GinIndex(vetor_busca(), name=NOME_INDICE_GIN))
+
+    elif vendor == 'sqlite':
+        try:
+            schema_editor.execute(
+                f"CREATE VIRTUAL TABLE {TABELA_FTS} USING fts5("
+                f"titulo, descricao, local, tokenize='unicode61 remove_diacritics 2')"
+            )
+        except OperationalError:
+            # SQLite compilado sem FTS5: a busca volta para icontains
+            return
+        schema_editor.execute(
+            f'INSERT INTO {TABELA_FTS} (rowid, titulo, descricao, local) '
+            f'SELECT id, titulo, descricao, local FROM app_evento'
+        )
+
+
+def remover_indice_busca(apps, schema_editor):
+    Evento = apps.get_model('app', 'Evento')
+    vendor = schema_editor.connection.vendor
+
+    if vendor == 'postgresql':
+        from django.contrib.postgres.indexes import GinIndex
+        schema_editor.remove_index(Evento, GinIndex(vetor_busca(), name=NOME_INDICE_GIN))
+
+    elif vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE IF EXISTS {TABELA_FTS}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0008_remove_inscricao_cpf_remove_inscricao_email_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(criar_indice_busca, remover_indice_busca),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.4 on 2026-10-18 07:26
+
+from django.db import migrations, models
+from django.db.models import Count, Min, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def remover_inscricoes_duplicadas(apps, schema_editor):
+    Inscricao = apps.get_model('app', 'Inscricao')
+    duplicadas = Inscricao.objects.values('evento', 'participante').annotate(
+        total=Count('id'), primeira=Min('id')
+    ).filter(total__gt=1)
+
+    for grupo in duplicadas:
+        Inscricao.objects.filter(
+            evento=grupo['evento'], participante=grupo['participante']
+        ).exclude(id=grupo['primeira']).delete()
+
+
+def contar_inscritos(apps, schema_editor):
+    Evento = apps.get_model('app', 'Evento')
+    Inscricao = apps.get_model('app', 'Inscricao')
+    total = Inscricao.objects.filter(evento=OuterRef('pk')).order_by().values('evento').annotate(
+        total=Count('id')
+    ).values('total')
+    Evento.objects.update(inscritos=Coalesce(Subquery(total), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0009_evento_busca'),
+    ]
+
+    operations = [
+        migrations.RunPython(remover_inscricoes_duplicadas, migrations.RunPython.noop),
+        migrations.AddField(
+            model_name='evento',
+            name='inscritos',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddConstraint(
+            model_name='inscricao',
+            constraint=models.UniqueConstraint(fields=('evento', 'participante'), name='inscricao_unica_por_evento'),
+        ),
+        migrations.RunPython(contar_inscritos, migrations.RunPython.noop),
+    ]
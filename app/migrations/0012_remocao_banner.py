@@ -0,0 +1,28 @@
+# Generated by Django 5.2.4 on 2026-10-18 07:33
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0011_email_pendente'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RemocaoBanner',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tentativas', models.PositiveIntegerField(default=0)),
+                ('proxima_tentativa', models.DateTimeField(default=django.utils.timezone.now)),
+                ('erro', models.TextField(blank=True)),
+                ('criado_em', models.DateTimeField(auto_now_add=True)),
+                ('public_id', models.CharField(max_length=255)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['proxima_tentativa'], name='remocao_banner_fila_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.4 on 2026-10-18 08:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0012_remocao_banner'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='evento',
+            index=models.Index(fields=['data', 'id'], name='evento_data_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='evento',
+            index=models.Index(fields=['organizador', '-data'], name='evento_organizador_data_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inscricao',
+            index=models.Index(fields=['participante', '-data_envio'], name='inscricao_participante_idx'),
+        ),
+    ]
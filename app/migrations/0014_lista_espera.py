@@ -0,0 +1,27 @@
+# Generated by Django 5.2.4 on 2026-10-18 08:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0013_indices_consultas'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ListaEspera',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('criado_em', models.DateTimeField(auto_now_add=True)),
+                ('evento', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='app.evento')),
+                ('participante', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='app.participante')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['evento', 'id'], name='espera_evento_ordem_idx')],
+                'constraints': [models.UniqueConstraint(fields=('evento', 'participante'), name='espera_unica_por_evento')],
+            },
+        ),
+    ]
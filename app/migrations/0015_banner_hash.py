@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 09:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0014_lista_espera'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='evento',
+            name='banner_hash',
+            field=models.CharField(blank=True, default='', editable=False, max_length=32),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.4 on 2026-10-18 09:37
+
+import app.armazenamento
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0015_banner_hash'),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name='remocaobanner',
+            old_name='public_id',
+            new_name='nome',
+        ),
+        migrations.AlterField(
+            model_name='evento',
+            name='imagem_banner',
+            field=models.FileField(max_length=255, storage=app.armazenamento.obter_armazenamento_banners, upload_to='banners'),
+        ),
+    ]
@@ -1,21 +1,28 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.contrib import messages
+from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
+from django.http import HttpResponse
 from django.shortcuts import redirect
-from app.models import Organizador, Evento, Participante
+from app.catalogo import alteracoes_catalogo, apagina_em_cache, chave_pagina, guardar_pagina, pagina_em_cache, \
+    registrar_acessos
+from app.instrumentacao import medir_template
+from app.models import Evento
+from app.perfis import TAMANHO_HISTORICO, carregar_historico, vincular_usuario
 
 
 class OrganizadorRequiredMixin:
     def dispatch(self, request, *args, **kwargs):
-        organizador = Organizador.objects.filter(user=self.request.user).first()
-        if not organizador:
+        if not request.perfil.is_organizador:
             messages.error(self.request, "Apenas usuários com perfil de organizador podem fazer isso.")
             return redirect('home')
-        request.organizador_logado = organizador
+        request.organizador_logado_id = request.perfil.organizador_id
         return super().dispatch(request, *args, **kwargs)
 
 
 class EventoOwnerRequiredMixin:
     def dispatch(self, request, *args, **kwargs):
-        evento = Evento.objects.filter(pk=kwargs.get('pk'), organizador=request.organizador_logado).first()
+        evento = Evento.objects.filter(pk=kwargs.get('pk'), organizador_id=request.organizador_logado_id).first()
         if not evento:
             messages.error(request, "Você não tem permissão para gerenciar este evento.")
             return redirect('evento-list')
@@ -24,7 +31,96 @@ class EventoOwnerRequiredMixin:
 
 class ParticipanteRequiredMixin:
     def dispatch(self, request, *args, **kwargs):
-        if not Participante.objects.filter(user=request.user).exists():
+        if not request.perfil.is_participante:
             messages.error(request, "Apenas usuários com perfil de participante podem fazer isso.")
             return redirect('evento-list')
-        return super().dispatch(request, *args, **kwargs)
\ No newline at end of file
+        request.participante_logado_id = request.perfil.participante_id
+        return super().dispatch(request, *args, **kwargs)
+
+
+class HistoricoPerfilMixin:
+    historico_por_pagina = TAMANHO_HISTORICO
+
+    def get_perfil(self):
+        return vincular_usuario(self.request.perfil, self.request.user)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context.update(carregar_historico(self.get_perfil(), self.request.GET.get('page'), self.historico_por_pagina))
+        return context
+
+
+class StaffRequiredMixin(LoginRequiredMixin, UserPassesTestMixin):
+    def test_func(self):
+        return self.request.user.is_staff
+
+
+class PerfilAssincronoMixin:
+    async def resolver_perfil(self):
+        # Em views assíncronas request.user e request.perfil não podem ser resolvidos sob demanda
+        # (o ORM síncrono é proibido no event loop); resolvidos aqui, templates e mixins os reaproveitam
+        request = self.request
+        request.user = await request.auser()
+        request.perfil = await request.aperfil()
+        return request.perfil
+
+
+class PaginaAnonimaEmCacheMixin:
+    cabecalhos_em_cache = ()
+    # Preenchido pela view com as versões dos eventos exibidos (renderizar_cards)
+    versoes_eventos = {}
+
+    def dispatch(self, request, *args, **kwargs):
+        if self.view_is_async:
+            return self.dispatch_async(request, *args, **kwargs)
+        if not settings.CACHE_CATALOGO or request.method != 'GET' or request.user.is_authenticated:
+            return super().dispatch(request, *args, **kwargs)
+
+        # A chave (e a versão do catálogo nela) é lida antes da consulta ao banco, então uma
+        # alteração concorrente nunca fica guardada sob a versão nova
+        chave = chave_pagina(request)
+        guardada = pagina_em_cache(chave)
+        if guardada is not None:
+            return self.resposta_em_cache(guardada)
+
+        registrar_acessos('paginas', falhas=1)
+        alteracoes = alteracoes_catalogo()
+        response = super().dispatch(request, *args, **kwargs)
+        if hasattr(response, 'render'):
+            # Renderizada aqui, antes do process_template_response do InstrumentacaoMiddleware
+            medir_template(request, response).render()
+        self.guardar_se_cacheavel(chave, response, alteracoes)
+        return response
+
+    async def dispatch_async(self, request, *args, **kwargs):
+        # Resolvido uma vez: o request.user preguiçoso repetiria as consultas ao renderizar
+        request.user = await request.auser()
+        if not settings.CACHE_CATALOGO or request.method != 'GET' or request.user.is_authenticated:
+            return await super().dispatch(request, *args, **kwargs)
+
+        chave = await sync_to_async(chave_pagina)(request)
+        guardada = await apagina_em_cache(chave)
+        if guardada is not None:
+            return await sync_to_async(self.resposta_em_cache)(guardada)
+
+        await sync_to_async(registrar_acessos)('paginas', falhas=1)
+        alteracoes = await sync_to_async(alteracoes_catalogo)()
+        response = await super().dispatch(request, *args, **kwargs)
+        if hasattr(response, 'render'):
+            await sync_to_async(medir_template(request, response).render)()
+        await sync_to_async(self.guardar_se_cacheavel)(chave, response, alteracoes)
+        return response
+
+    def resposta_em_cache(self, guardada):
+        registrar_acessos('paginas', acertos=1)
+        conteudo, cabecalhos, _ = guardada
+        response = HttpResponse(conteudo)
+        for nome, valor in cabecalhos.items():
+            response[nome] = valor
+        return response
+
+    def guardar_se_cacheavel(self, chave, response, alteracoes):
+        # Páginas que exibiram mensagens (ex.: filtro de datas inválido) são únicas da requisição
+        if response.status_code == 200 and not getattr(getattr(self.request, '_messages', None), 'used', False):
+            cabecalhos = {nome: response[nome] for nome in self.cabecalhos_em_cache if response.has_header(nome)}
+            guardar_pagina(chave, response.content, cabecalhos, self.versoes_eventos, alteracoes)
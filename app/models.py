@@ -1,6 +1,9 @@
-from cloudinary.models import CloudinaryField
 from django.contrib.auth.models import User
 from django.db import models
+from django.utils import timezone
+
+from app.armazenamento import obter_armazenamento_banners
+from app.imagens import BannerResponsivo
 
 GENERO = (
     ('M', 'Masculino'),
@@ -41,9 +44,37 @@ class Evento(models.Model):
     data = models.DateTimeField()
     local = models.CharField(max_length=100)
     capacidade_max = models.IntegerField()
-    imagem_banner = CloudinaryField(folder='media/banners')
+    inscritos = models.PositiveIntegerField(default=0, editable=False)
+    # Backend escolhido em STORAGES['banners'] (disco local ou Cloudinary)
+    imagem_banner = models.FileField(upload_to='banners', storage=obter_armazenamento_banners, max_length=255)
+    # Hash do conteúdo do banner enviado; nomeia as renditions geradas no upload (app.imagens)
+    banner_hash = models.CharField(max_length=32, blank=True, default='', editable=False)
     criado_em = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['data', 'id'], name='evento_data_idx'),
+            models.Index(fields=['organizador', '-data'], name='evento_organizador_data_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        # inscritos só muda por UPDATEs atômicos (app.inscricoes); um save comum com o valor
+        # carregado em memória sobrescreveria inscrições feitas nesse meio tempo.
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'inscritos'
+            ]
+        super().save(*args, **kwargs)
+
+    @property
+    def banner_responsivo(self):
+        return BannerResponsivo(self)
+
+    @property
+    def vagas_restantes(self):
+        return self.capacidade_max - self.inscritos
+
     def __str__(self):
         return f'{self.titulo} - {self.local}'
 
@@ -52,5 +83,67 @@ class Inscricao(models.Model):
     participante = models.ForeignKey(Participante, on_delete=models.CASCADE)
     data_envio = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['evento', 'participante'], name='inscricao_unica_por_evento'),
+        ]
+        indexes = [
+            models.Index(fields=['participante', '-data_envio'], name='inscricao_participante_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.participante.nome} - {self.evento}'
+
+class ListaEspera(models.Model):
+    evento = models.ForeignKey(Evento, on_delete=models.CASCADE)
+    participante = models.ForeignKey(Participante, on_delete=models.CASCADE)
+    criado_em = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['evento', 'participante'], name='espera_unica_por_evento'),
+        ]
+        indexes = [
+            # A ordem da fila é o id: a posição é uma contagem nesse intervalo do índice
+            models.Index(fields=['evento', 'id'], name='espera_evento_ordem_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.participante.nome} - {self.evento} (espera)'
+
+class ItemFila(models.Model):
+    tentativas = models.PositiveIntegerField(default=0)
+    proxima_tentativa = models.DateTimeField(default=timezone.now)
+    erro = models.TextField(blank=True)
+    criado_em = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        abstract = True
+
+
+class EmailPendente(ItemFila):
+    destinatario = models.EmailField()
+    assunto = models.CharField(max_length=200)
+    corpo_texto = models.TextField()
+    corpo_html = models.TextField(blank=True)
+    enviado_em = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['enviado_em', 'proxima_tentativa'], name='email_pendente_fila_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.assunto} - {self.destinatario}'
+
+
+class RemocaoBanner(ItemFila):
+    nome = models.CharField(max_length=255)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['proxima_tentativa'], name='remocao_banner_fila_idx'),
+        ]
+
     def __str__(self):
-        return f'{self.participante.nome} - {self.evento}'
\ No newline at end of file
+        return self.nome
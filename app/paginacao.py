@@ -0,0 +1,58 @@
+import base64
+import binascii
+
+from django.core.paginator import Page, Paginator
+from django.db.models import Count, Q, Window
+from django.http import Http404
+from django.utils.dateparse import parse_datetime
+
+
+def codificar_cursor(evento):
+    valor = f'{evento.data.isoformat()}|{evento.pk}'
+    return base64.urlsafe_b64encode(valor.encode()).decode()
+
+
+def decodificar_cursor(cursor):
+    try:
+        data, pk = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        data = parse_datetime(data)
+        pk = int(pk)
+    except (ValueError, UnicodeDecodeError, binascii.Error):
+        return None
+
+    if data is None:
+        return None
+    return data, pk
+
+
+def aplicar_cursor(queryset, cursor):
+    posicao = decodificar_cursor(cursor) if cursor else None
+    if posicao is None:
+        return queryset
+
+    data, pk = posicao
+    return queryset.filter(Q(data__gt=data) | Q(data=data, pk__gt=pk))
+
+
+def querystring_sem(params, *chaves):
+    params = params.copy()
+    for chave in chaves:
+        params.pop(chave, None)
+    return params.urlencode()
+
+
+def paginar_com_total(queryset, numero, por_pagina):
+    # O total vem na mesma consulta da página (COUNT(*) OVER ()), sem o .count() separado do Paginator
+    try:
+        numero = max(int(numero), 1)
+    except (TypeError, ValueError):
+        numero = 1
+
+    inicio = (numero - 1) * por_pagina
+    itens = list(queryset.annotate(total_paginacao=Window(Count('pk')))[inicio:inicio + por_pagina])
+    if not itens and numero > 1:
+        raise Http404('Página inválida.')
+
+    paginator = Paginator(queryset, por_pagina)
+    paginator.count = itens[0].total_paginacao if itens else 0
+    return Page(itens, numero, paginator)
@@ -0,0 +1,115 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.utils.functional import cached_property
+
+from app.models import Evento, Inscricao, Organizador, Participante
+from app.paginacao import paginar_com_total
+
+TEMPO_CACHE_PERFIL = 60 * 60
+TAMANHO_HISTORICO = 20
+
+
+class PerfilUsuario:
+    # Só os ids vão para o cache compartilhado: nada do User (como o hash da senha) sai do banco.
+    # As instâncias são carregadas na primeira vez que a requisição precisa delas.
+    def __init__(self, organizador_id=None, participante_id=None):
+        self.organizador_id = organizador_id
+        self.participante_id = participante_id
+
+    @property
+    def is_organizador(self):
+        return self.organizador_id is not None
+
+    @property
+    def is_participante(self):
+        return self.participante_id is not None
+
+    @cached_property
+    def organizador(self):
+        if self.organizador_id is None:
+            return None
+        return Organizador.objects.filter(pk=self.organizador_id).first()
+
+    @cached_property
+    def participante(self):
+        if self.participante_id is None:
+            return None
+        return Participante.objects.filter(pk=self.participante_id).first()
+
+
+def chave_perfil(user_id):
+    return f'perfil_usuario:{user_id}'
+
+
+def consulta_perfil(user):
+    # Organizador e participante num único SELECT, só as chaves
+    return User.objects.filter(pk=user.pk).values_list('organizador__id', 'participante__id')
+
+
+def carregar_perfil(user):
+    if not user.is_authenticated:
+        return PerfilUsuario()
+
+    chave = chave_perfil(user.pk)
+    ids = cache.get(chave)
+    if ids is None:
+        ids = consulta_perfil(user).first() or (None, None)
+        cache.set(chave, ids, TEMPO_CACHE_PERFIL)
+    return PerfilUsuario(*ids)
+
+
+async def acarregar_perfil(user):
+    if not user.is_authenticated:
+        return PerfilUsuario()
+
+    chave = chave_perfil(user.pk)
+    ids = await cache.aget(chave)
+    if ids is None:
+        ids = await consulta_perfil(user).afirst() or (None, None)
+        await cache.aset(chave, ids, TEMPO_CACHE_PERFIL)
+    return PerfilUsuario(*ids)
+
+
+def invalidar_perfil(user_id):
+    cache.delete(chave_perfil(user_id))
+
+
+def invalidar_perfis(user_ids):
+    cache.delete_many([chave_perfil(user_id) for user_id in user_ids])
+
+
+def vincular_usuario(perfil, user):
+    # O usuário já foi carregado na requisição; evita a consulta de participante.user nos templates
+    for dono in (perfil.participante, perfil.organizador):
+        if dono is not None:
+            dono.user = user
+    return perfil
+
+
+def carregar_historico(perfil, pagina, por_pagina=TAMANHO_HISTORICO):
+    # Os ids do perfil vêm do cache; a página e o total saem numa única consulta
+    if perfil.participante:
+        inscricoes = paginar_com_total(
+            Inscricao.objects.filter(participante=perfil.participante).select_related('evento').order_by(
+                '-data_envio', '-id'
+            ),
+            pagina, por_pagina,
+        )
+        return {
+            'participante': perfil.participante,
+            'inscricoes': inscricoes,
+            'total_inscricoes': inscricoes.paginator.count,
+            'historico': inscricoes,
+        }
+
+    if perfil.organizador:
+        eventos = paginar_com_total(
+            Evento.objects.filter(organizador=perfil.organizador).order_by('-data', '-id'), pagina, por_pagina
+        )
+        return {
+            'organizador': perfil.organizador,
+            'eventos': eventos,
+            'total_eventos': eventos.paginator.count,
+            'historico': eventos,
+        }
+    return {}
@@ -1,24 +1,102 @@
-from django.db.models.signals import pre_delete, pre_save
+from django.contrib.auth.models import User
+from django.core.signals import setting_changed
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save, pre_delete, pre_save
 from django.dispatch import receiver
-from .models import Evento
-import cloudinary.uploader
+from django.utils.functional import empty
+from .armazenamento import armazenamento_banners
+from .banners import agendar_remocao_banners, nome_do_banner
+from .busca import indexar_evento, remover_evento
+from .catalogo import CAMPOS_LISTAGEM, invalidar_catalogo
+from .imagens import gerar_rendicoes, nomes_rendicoes
+from .inscricoes import descontar_inscricoes_do_participante
+from .models import Evento, Inscricao, Organizador, Participante
+from .perfis import invalidar_perfil
+from .transmissao import publicar_vagas
 
 
+@receiver(post_init, sender=Evento)
+def guardar_banner_carregado(sender, instance, **kwargs):
+    # __dict__ evita disparar uma consulta quando o campo foi adiado com .only()/.defer()
+    instance._banner_carregado = nome_do_banner(instance.__dict__.get('imagem_banner'))
+    instance._hash_carregado = instance.__dict__.get('banner_hash')
+    instance._listagem_carregada = listagem_do_evento(instance)
+
+def listagem_do_evento(evento):
+    return tuple(evento.__dict__.get(campo) for campo in CAMPOS_LISTAGEM)
+
 @receiver(pre_delete, sender=Evento)
-def deletar_banner_cloudinary(sender, instance, **kwargs):
-    if instance.imagem_banner:
-        cloudinary.uploader.destroy(instance.imagem_banner.public_id)
+def deletar_banner_do_storage(sender, instance, **kwargs):
+    agendar_remocao_banners([nome_do_banner(instance.imagem_banner), *nomes_rendicoes(instance.banner_hash)])
+
+@receiver(pre_save, sender=Evento)
+def gerar_rendicoes_do_banner(sender, instance, **kwargs):
+    # Roda antes do FileField.pre_save, enquanto o banner ainda é o arquivo enviado
+    banner = instance.imagem_banner
+    if banner and not banner._committed:
+        instance.banner_hash = gerar_rendicoes(banner.file)
+    elif nome_do_banner(banner) != getattr(instance, '_banner_carregado', None):
+        instance.banner_hash = ''
 
 @receiver(pre_save, sender=Evento)
 def deletar_banner_antigo_ao_atualizar(sender, instance, **kwargs):
-    if instance.pk:
-        try:
-            antigo_evento = sender.objects.get(pk=instance.pk)
-        except sender.DoesNotExist:
-            return
-
-        if antigo_evento.imagem_banner and antigo_evento.imagem_banner != instance.imagem_banner:
-            try:
-                cloudinary.uploader.destroy(antigo_evento.imagem_banner.public_id)
-            except Exception as e:
-                print(f"Erro ao deletar banner antigo do Cloudinary: {e}")
\ No newline at end of file
+    banner_antigo = getattr(instance, '_banner_carregado', None)
+    if not instance._state.adding and banner_antigo and banner_antigo != nome_do_banner(instance.imagem_banner):
+        hash_antigo = getattr(instance, '_hash_carregado', None)
+        rendicoes = nomes_rendicoes(hash_antigo) if hash_antigo != instance.__dict__.get('banner_hash') else []
+        agendar_remocao_banners([banner_antigo, *rendicoes])
+
+@receiver(setting_changed)
+def recarregar_armazenamento_banners(setting, **kwargs):
+    if setting == 'STORAGES':
+        armazenamento_banners._wrapped = empty
+
+@receiver(post_save, sender=Evento)
+def indexar_evento_na_busca(sender, instance, **kwargs):
+    instance._banner_carregado = nome_do_banner(instance.imagem_banner)
+    instance._hash_carregado = instance.__dict__.get('banner_hash')
+    indexar_evento(instance)
+
+@receiver(post_delete, sender=Evento)
+def remover_evento_da_busca(sender, instance, **kwargs):
+    remover_evento(instance.pk)
+
+@receiver(post_save, sender=Evento)
+def invalidar_evento_no_catalogo(sender, instance, created, **kwargs):
+    # A listagem só muda com um evento novo ou quando ele muda de posição ou de resultado na busca
+    listagem = listagem_do_evento(instance)
+    invalidar_catalogo(instance.pk, listagem=created or listagem != instance._listagem_carregada)
+    instance._listagem_carregada = listagem
+
+@receiver(post_delete, sender=Evento)
+def remover_evento_do_catalogo(sender, instance, **kwargs):
+    invalidar_catalogo(instance.pk, listagem=True)
+
+@receiver(post_save, sender=Inscricao)
+@receiver(post_delete, sender=Inscricao)
+def invalidar_vagas_no_catalogo(sender, instance, **kwargs):
+    invalidar_catalogo(instance.evento_id)
+
+@receiver(post_save, sender=Evento)
+@receiver(post_save, sender=Inscricao)
+@receiver(post_delete, sender=Inscricao)
+def transmitir_vagas(sender, instance, **kwargs):
+    evento_id = instance.pk if sender is Evento else instance.evento_id
+    transaction.on_commit(lambda: publicar_vagas(evento_id))
+
+@receiver(pre_delete, sender=Participante)
+def descontar_vagas_do_participante_excluido(sender, instance, **kwargs):
+    # Roda na mesma transação do delete, antes do CASCADE remover as inscrições
+    descontar_inscricoes_do_participante(instance)
+
+@receiver(post_save, sender=Organizador)
+@receiver(post_delete, sender=Organizador)
+@receiver(post_save, sender=Participante)
+@receiver(post_delete, sender=Participante)
+def invalidar_perfil_em_cache(sender, instance, **kwargs):
+    invalidar_perfil(instance.user_id)
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidar_perfil_do_usuario(sender, instance, **kwargs):
+    invalidar_perfil(instance.pk)
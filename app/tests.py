@@ -1,14 +1,90 @@
 # (imports permanecem os mesmos)
 
-from unittest.mock import patch
+import asyncio
+import csv
+import json
+import gzip
+import io
+import shutil
+import socketserver
+import tempfile
+import time
+import zipfile
+import threading
+from pathlib import Path
+from unittest.mock import Mock, call, patch
+from asgiref.sync import sync_to_async
+import cloudinary
+from cloudinary.exceptions import NotFound
+from django.core.files.base import ContentFile
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import TestCase, Client
+from django.template.response import SimpleTemplateResponse
+from django.test import TestCase, TransactionTestCase, Client
 from django.contrib.auth.models import User
-from django.db import IntegrityError
+from concurrent.futures import ThreadPoolExecutor
+from django.db import IntegrityError, connection, connections
 from django.urls import reverse
 from app.models import Participante, Organizador, Evento, Inscricao
 from django.utils import timezone
+from PIL import Image
 from django.contrib.messages import get_messages
+from django.core import mail
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db.models import Count, F
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from app.armazenamento import LOTE_CLOUDINARY, ArmazenamentoCloudinary, apagar_banners, armazenamento_banners, \
+    armazenamento_local
+from app.banners import processar_remocoes
+from app.benchmarks import carregar_baseline, comparar_com_baseline, medir_asgi, medir_conexoes, medir_tamanho, \
+    rotas_que_escalam, rotas_sem_benchmark
+from app.catalogo import CHAVE_ALTERACOES, CHAVE_VERSAO_CATALOGO, estatisticas_cache, incrementar, \
+    renderizar_cards
+from app.checks import verificar_cache_do_catalogo, verificar_cache_dos_perfis
+from app.emails import enviar_email_confirmacao, processar_fila
+from app.exportacao import blocos_assincronos
+from app.exclusoes import excluir_organizador
+from app.filas import MAX_TENTATIVAS
+from app.imagens import FORMATOS, RENDICOES, armazenamento, nome_rendicao, nomes_rendicoes
+from app.importacao import ImportacaoRecusada, importar_inscricoes
+from app.perfis import chave_perfil
+from app.inscricoes import InscricaoDuplicada, cancelar_inscricao, entrar_na_espera, inscrever, posicao_na_espera, \
+    recontar_inscritos, sair_da_espera
+from app.instrumentacao import estatisticas_instrumentacao, limpar_estatisticas
+from app.models import EmailPendente, ListaEspera, RemocaoBanner
+from app.transmissao import aplicacao_sse, publicar_vagas, transmissor
+
+# Banners e renditions gerados nos testes ficam num diretório temporário, no disco local (nunca no
+# Cloudinary); os estáticos não dependem do manifest gerado pelo collectstatic
+configuracao_de_teste = override_settings(
+    MEDIA_ROOT=tempfile.mkdtemp(prefix='midia_teste_'),
+    STORAGES={
+        **settings.STORAGES,
+        'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+        'banners': settings.BACKENDS_BANNER['local'],
+    },
+)
+
+
+def banners_no(backend):
+    # Avaliado dentro do teste, sobre os STORAGES já trocados por configuracao_de_teste
+    return override_settings(STORAGES={**settings.STORAGES, 'banners': settings.BACKENDS_BANNER[backend]})
+
+
+def conta_cloudinary_de_teste():
+    # As URLs do Cloudinary exigem um cloud_name, mesmo sem CLOUDINARY_URL no ambiente
+    return patch.object(cloudinary.config(), 'cloud_name', 'teste', create=True)
+
+
+def setUpModule():
+    configuracao_de_teste.enable()
+
+
+def tearDownModule():
+    configuracao_de_teste.disable()
+    shutil.rmtree(configuracao_de_teste.options['MEDIA_ROOT'], ignore_errors=True)
 
 
 class ParticipanteModelTest(TestCase):
@@ -133,6 +209,7 @@ class InscricaoModelTest(TestCase):
 
 class BaseViewTest(TestCase):
     def setUp(self):
+        cache.clear()
         self.client = Client()
         self.user_participante = User.objects.create_user(username='participante', password='password')
         self.participante = Participante.objects.create(
@@ -224,9 +301,10 @@ class InscricaoCreateViewTest(BaseViewTest):
 
         self.assertEqual(response.status_code, 302)
         self.assertEqual(Inscricao.objects.count(), 0)
+        self.assertEqual(ListaEspera.objects.get().participante, self.participante)
         messages = list(get_messages(response.wsgi_request))
         self.assertEqual(len(messages), 1)
-        self.assertEqual(str(messages[0]), 'Desculpe, a capacidade máxima para este evento já foi atingida.')
+        self.assertIn('Você está na posição 1 da lista de espera', str(messages[0]))
 
 
 class EventoListViewTest(BaseViewTest):
@@ -308,7 +386,7 @@ class EventoListViewTest(BaseViewTest):
         self.assertIsNotNone(response.context['eventos'][0].inscricao_id)
 
     def test_evento_list_calcula_vagas_restantes(self):
-        Inscricao.objects.create(participante=self.participante, evento=self.evento)
+        inscrever(self.evento, self.participante)
         response = self.client.get(reverse('evento-list'))
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.context['eventos'][0].vagas_restantes, self.evento.capacidade_max - 1)
@@ -403,3 +481,1819 @@ class InscricaoDeleteViewTest(BaseViewTest):
         self.assertEqual(response.status_code, 302)
         self.assertFalse(Inscricao.objects.filter(id=inscricao.id).exists())
 
+
+
+class EventoListViewQueryCountTest(BaseViewTest):
+    def criar_eventos(self, quantidade):
+        for i in range(quantidade):
+            evento = Evento.objects.create(
+                organizador=self.organizador,
+                titulo=f'Evento Extra {i}',
+                descricao='Desc',
+                data=timezone.now() + timezone.timedelta(days=i + 2),
+                local='Local',
+                capacidade_max=10,
+                imagem_banner='media/banners/extra'
+            )
+            inscrever(evento, self.participante)
+
+    def test_evento_list_numero_fixo_de_consultas_participante(self):
+        self.client.login(username='participante', password='password')
+        self.criar_eventos(5)
+        self.client.get(reverse('evento-list'))
+
+        # sessão, usuário, eventos da página e contagem do paginador; o perfil vem do cache
+        with self.assertNumQueries(4):
+            response = self.client.get(reverse('evento-list'))
+        self.assertEqual(len(response.context['eventos']), 6)
+
+        self.criar_eventos(10)
+        with self.assertNumQueries(4):
+            response = self.client.get(reverse('evento-list'))
+        self.assertEqual(len(response.context['eventos']), 12)
+        self.assertTrue(all(evento.is_inscrito for evento in response.context['eventos'][1:]))
+        self.assertTrue(all(evento.vagas_restantes == 9 for evento in response.context['eventos'][1:]))
+
+    def test_evento_list_numero_fixo_de_consultas_anonimo(self):
+        self.criar_eventos(10)
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('evento-list'))
+        self.assertEqual(len(response.context['eventos']), 11)
+
+    def test_evento_list_organizador_ve_eventos_proprios(self):
+        self.client.login(username='organizador', password='password')
+        response = self.client.get(reverse('evento-list'))
+        self.assertTrue(response.context['eventos'][0].is_owner)
+
+
+class EventoListPaginacaoTest(BaseViewTest):
+    def setUp(self):
+        super().setUp()
+        for i in range(20):
+            Evento.objects.create(
+                organizador=self.organizador,
+                titulo=f'Evento Paginado {i}',
+                descricao='Desc',
+                data=timezone.now() + timezone.timedelta(days=i + 2),
+                local='Local',
+                capacidade_max=10,
+                imagem_banner='media/banners/paginado'
+            )
+
+    def test_evento_list_paginado(self):
+        response = self.client.get(reverse('evento-list'))
+        self.assertEqual(len(response.context['eventos']), 12)
+        self.assertTrue(response.context['is_paginated'])
+
+        response = self.client.get(reverse('evento-list'), {'page': 2})
+        self.assertEqual(len(response.context['eventos']), 9)
+        self.assertIsNone(response.context['proximo_cursor'])
+
+    def test_evento_list_paginacao_preserva_filtros(self):
+        response = self.client.get(reverse('evento-list'), {'q': 'Paginado', 'page': 1})
+        self.assertEqual(response.context['querystring'], 'q=Paginado')
+        self.assertContains(response, '?q=Paginado&page=2')
+
+    def test_evento_list_modo_cursor_percorre_todos_os_eventos(self):
+        vistos = []
+        cursor = ''
+        while True:
+            response = self.client.get(reverse('evento-list'), {'cursor': cursor})
+            vistos.extend(evento.pk for evento in response.context['eventos'])
+            cursor = response.context['proximo_cursor']
+            if not cursor:
+                break
+
+        esperados = list(Evento.objects.order_by('data', 'id').values_list('pk', flat=True))
+        self.assertEqual(vistos, esperados)
+
+    def test_evento_fragmento_retorna_apenas_cards(self):
+        primeira_pagina = self.client.get(reverse('evento-list'))
+        cursor = primeira_pagina.context['proximo_cursor']
+
+        response = self.client.get(reverse('evento-fragmento'), {'cursor': cursor})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotContains(response, '<html')
+        self.assertContains(response, 'Evento Paginado 11')
+        self.assertNotIn('X-Proximo-Lote', response)
+
+
+class EventoBuscaTest(BaseViewTest):
+    def criar_evento(self, titulo, descricao='Desc', local='Local'):
+        return Evento.objects.create(
+            organizador=self.organizador,
+            titulo=titulo,
+            descricao=descricao,
+            data=timezone.now() + timezone.timedelta(days=3),
+            local=local,
+            capacidade_max=10,
+            imagem_banner='media/banners/busca'
+        )
+
+    def test_busca_ordena_por_relevancia(self):
+        na_descricao = self.criar_evento('Encontro', descricao='Oficina sobre python para iniciantes')
+        no_titulo = self.criar_evento('Python Avançado')
+
+        response = self.client.get(reverse('evento-list'), {'q': 'python'})
+        self.assertEqual([evento.pk for evento in response.context['eventos']], [no_titulo.pk, na_descricao.pk])
+
+    def test_busca_por_prefixo_e_sem_acento(self):
+        evento = self.criar_evento('Semana de Programação', local='São Paulo')
+
+        response = self.client.get(reverse('evento-list'), {'q': 'programacao sao'})
+        self.assertEqual(list(response.context['eventos']), [evento])
+
+        response = self.client.get(reverse('evento-list'), {'q': 'progr'})
+        self.assertEqual(list(response.context['eventos']), [evento])
+
+    def test_busca_acompanha_edicao_e_exclusao(self):
+        evento = self.criar_evento('Hackathon')
+        evento.titulo = 'Maratona'
+        evento.save()
+
+        response = self.client.get(reverse('evento-list'), {'q': 'hackathon'})
+        self.assertEqual(list(response.context['eventos']), [])
+        response = self.client.get(reverse('evento-list'), {'q': 'maratona'})
+        self.assertEqual(list(response.context['eventos']), [evento])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Evento.objects.get(pk=evento.pk).delete()
+        response = self.client.get(reverse('evento-list'), {'q': 'maratona'})
+        self.assertEqual(list(response.context['eventos']), [])
+
+
+class InscricaoAtomicaTest(BaseViewTest):
+    @patch('app.views.enviar_email_confirmacao')
+    def test_inscricao_incrementa_e_cancelamento_decrementa_contador(self, mock_email):
+        self.client.login(username='participante', password='password')
+        self.client.post(reverse('inscrever', args=[self.evento.id]))
+        self.evento.refresh_from_db()
+        self.assertEqual(self.evento.inscritos, 1)
+
+        inscricao = Inscricao.objects.get(participante=self.participante, evento=self.evento)
+        self.client.post(reverse('desinscrever', args=[inscricao.id]))
+        self.evento.refresh_from_db()
+        self.assertEqual(self.evento.inscritos, 0)
+
+    def test_inscricao_duplicada_bloqueada_pelo_banco(self):
+        Inscricao.objects.create(participante=self.participante, evento=self.evento)
+        with self.assertRaises(IntegrityError):
+            Inscricao.objects.create(participante=self.participante, evento=self.evento)
+
+    def test_save_do_evento_nao_sobrescreve_contador(self):
+        evento_em_memoria = Evento.objects.get(pk=self.evento.pk)
+        Evento.objects.filter(pk=self.evento.pk).update(inscritos=3)
+        evento_em_memoria.titulo = 'Outro título'
+        evento_em_memoria.save()
+        self.evento.refresh_from_db()
+        self.assertEqual(self.evento.inscritos, 3)
+
+    def test_participante_nao_cancela_inscricao_de_outro(self):
+        user_outro = User.objects.create_user(username='outro', password='password')
+        outro = Participante.objects.create(user=user_outro, nome='Outro', telefone='1', genero='P', cidade='C', cpf='1')
+        inscricao = Inscricao.objects.create(participante=outro, evento=self.evento)
+
+        self.client.login(username='participante', password='password')
+        response = self.client.post(reverse('desinscrever', args=[inscricao.id]))
+        self.assertEqual(response.status_code, 404)
+        self.assertTrue(Inscricao.objects.filter(pk=inscricao.pk).exists())
+
+    @patch('app.views.enviar_email_confirmacao')
+    def test_exclusao_do_participante_desconta_vagas(self, mock_email):
+        outro_evento = Evento.objects.create(
+            organizador=self.organizador, titulo='Outro', descricao='Desc',
+            data=timezone.now() + timezone.timedelta(days=3), local='Local', capacidade_max=5,
+            imagem_banner='media/banners/outro',
+        )
+        self.client.login(username='participante', password='password')
+        self.client.post(reverse('inscrever', args=[self.evento.id]))
+        self.client.post(reverse('inscrever', args=[outro_evento.id]))
+
+        self.client.post(reverse('perfil-participante-delete', args=[self.participante.pk]))
+
+        self.assertEqual(
+            list(Evento.objects.order_by('pk').values_list('inscritos', flat=True)),
+            [0, 0],
+        )
+
+    def test_recontar_inscritos_corrige_divergencias(self):
+        Inscricao.objects.create(participante=self.participante, evento=self.evento)
+        Evento.objects.filter(pk=self.evento.pk).update(inscritos=7)
+
+        call_command('recontar_inscritos')
+
+        self.evento.refresh_from_db()
+        self.assertEqual(self.evento.inscritos, 1)
+        self.assertEqual(self.evento.vagas_restantes, 9)
+
+
+class InscricaoConcorrenteTest(TransactionTestCase):
+    CAPACIDADE = 50
+    REQUISICOES = 200
+
+    def setUp(self):
+        user_organizador = User.objects.create(username='organizador')
+        organizador = Organizador.objects.create(
+            user=user_organizador, nome_organizador='Org', telefone='1', genero='P', cidade='C', cnpj='1')
+        self.evento = Evento.objects.create(
+            organizador=organizador,
+            titulo='Lote de ingressos',
+            descricao='Desc',
+            data=timezone.now() + timezone.timedelta(days=1),
+            local='Local',
+            capacidade_max=self.CAPACIDADE,
+            imagem_banner='media/banners/concorrente'
+        )
+        User.objects.bulk_create(User(username=f'p{i}') for i in range(self.REQUISICOES))
+        self.usuarios = list(User.objects.filter(username__startswith='p').order_by('id'))
+        Participante.objects.bulk_create(
+            Participante(user=user, nome=user.username, telefone='1', genero='P', cidade='C', cpf='1')
+            for user in self.usuarios
+        )
+
+    def postar_inscricao(self, user):
+        client = Client()
+        client.force_login(user)
+        try:
+            for _ in range(2):
+                client.post(reverse('inscrever', args=[self.evento.id]))
+        finally:
+            connection.close()
+
+    @patch('app.views.enviar_email_confirmacao')
+    def test_rajada_de_inscricoes_nao_excede_capacidade(self, mock_email):
+        with ThreadPoolExecutor(max_workers=32) as executor:
+            list(executor.map(self.postar_inscricao, self.usuarios))
+
+        self.evento.refresh_from_db()
+        total = Inscricao.objects.filter(evento=self.evento).count()
+        duplicadas = Inscricao.objects.filter(evento=self.evento).values('participante').distinct().count()
+
+        self.assertEqual(total, self.CAPACIDADE)
+        self.assertEqual(duplicadas, total)
+        self.assertEqual(self.evento.inscritos, total)
+        self.assertEqual(mock_email.call_count, self.CAPACIDADE)
+
+
+class ListaEsperaTest(BaseViewTest):
+    def setUp(self):
+        super().setUp()
+        Evento.objects.filter(pk=self.evento.pk).update(capacidade_max=1)
+        self.outros = []
+        for i in range(3):
+            user = User.objects.create_user(username=f'espera{i}', password='password', email=f'espera{i}@x.com')
+            self.outros.append(Participante.objects.create(
+                user=user, nome=f'Espera {i}', telefone='1', genero='P', cidade='C', cpf='1'))
+        self.inscricao = inscrever(self.evento, self.participante)
+
+    def test_fila_ordenada_com_posicao(self):
+        posicoes = [entrar_na_espera(self.evento, participante) for participante in self.outros]
+        self.assertEqual(posicoes, [1, 2, 3])
+
+        sair_da_espera(ListaEspera.objects.get(participante=self.outros[0]))
+        self.assertEqual(posicao_na_espera(ListaEspera.objects.get(participante=self.outros[2])), 2)
+
+    def test_inscrito_nao_entra_na_espera(self):
+        with self.assertRaises(InscricaoDuplicada):
+            entrar_na_espera(self.evento, self.participante)
+
+    def test_cancelamento_promove_o_primeiro_da_fila(self):
+        for participante in self.outros:
+            entrar_na_espera(self.evento, participante)
+
+        self.client.login(username='participante', password='password')
+        self.client.post(reverse('desinscrever', args=[self.inscricao.pk]))
+
+        self.evento.refresh_from_db()
+        self.assertEqual(self.evento.inscritos, 1)
+        self.assertEqual(Inscricao.objects.get(evento=self.evento).participante, self.outros[0])
+        self.assertEqual(
+            list(ListaEspera.objects.order_by('pk').values_list('participante', flat=True)),
+            [self.outros[1].pk, self.outros[2].pk],
+        )
+        email = EmailPendente.objects.get()
+        self.assertEqual((email.destinatario, email.assunto), ('espera0@x.com', 'Vaga Liberada: Inscrição Confirmada'))
+
+    def test_promocao_pula_quem_ja_foi_inscrito_por_outro_caminho(self):
+        for participante in self.outros[:2]:
+            entrar_na_espera(self.evento, participante)
+        # Inscrição feita por fora da fila (ex.: importação CSV), sem sair da espera
+        Inscricao.objects.create(evento=self.evento, participante=self.outros[0])
+
+        self.client.login(username='participante', password='password')
+        response = self.client.post(reverse('desinscrever', args=[self.inscricao.pk]))
+
+        self.assertEqual(response.status_code, 302)
+        self.evento.refresh_from_db()
+        self.assertEqual(self.evento.inscritos, 1)
+        self.assertTrue(Inscricao.objects.filter(evento=self.evento, participante=self.outros[1]).exists())
+        self.assertFalse(ListaEspera.objects.exists())
+
+    def test_exclusao_do_participante_promove_a_fila(self):
+        entrar_na_espera(self.evento, self.outros[0])
+
+        self.client.login(username='participante', password='password')
+        self.client.post(reverse('perfil-participante-delete', args=[self.participante.pk]))
+
+        self.evento.refresh_from_db()
+        self.assertEqual(self.evento.inscritos, 1)
+        self.assertEqual(Inscricao.objects.get(evento=self.evento).participante, self.outros[0])
+
+    def test_aumento_de_capacidade_promove_a_fila(self):
+        for participante in self.outros:
+            entrar_na_espera(self.evento, participante)
+
+        self.client.login(username='organizador', password='password')
+        self.client.post(reverse('evento-update', args=[self.evento.pk]), {
+            'titulo': self.evento.titulo, 'descricao': 'Desc', 'data': '2030-01-01T10:00', 'local': 'Local',
+            'capacidade_max': 3,
+        })
+
+        self.assertEqual(Inscricao.objects.filter(evento=self.evento).count(), 3)
+        self.assertEqual(list(ListaEspera.objects.values_list('participante', flat=True)), [self.outros[2].pk])
+
+    def test_participante_sai_da_espera(self):
+        entrar_na_espera(self.evento, self.outros[0])
+        espera = ListaEspera.objects.get()
+
+        self.client.login(username='participante', password='password')
+        self.assertEqual(self.client.post(reverse('sair-espera', args=[espera.pk])).status_code, 404)
+
+        self.client.login(username='espera0', password='password')
+        self.client.post(reverse('sair-espera', args=[espera.pk]))
+        self.assertFalse(ListaEspera.objects.exists())
+
+
+class ListaEsperaConcorrenteTest(TransactionTestCase):
+    CAPACIDADE = 20
+    ESPERANDO = 30
+
+    def setUp(self):
+        organizador = Organizador.objects.create(
+            user=User.objects.create(username='organizador'), nome_organizador='Org', telefone='1', genero='P',
+            cidade='C', cnpj='1')
+        self.evento = Evento.objects.create(
+            organizador=organizador, titulo='Lotado', descricao='Desc', data=timezone.now() + timezone.timedelta(days=1),
+            local='Local', capacidade_max=self.CAPACIDADE, imagem_banner='media/banners/lotado')
+        User.objects.bulk_create(User(username=f'p{i}') for i in range(self.CAPACIDADE + self.ESPERANDO))
+        Participante.objects.bulk_create(
+            Participante(user=user, nome=user.username, telefone='1', genero='P', cidade='C', cpf='1')
+            for user in User.objects.filter(username__startswith='p').order_by('id')
+        )
+        participantes = list(Participante.objects.order_by('id'))
+        self.inscricoes = [inscrever(self.evento, participante) for participante in participantes[:self.CAPACIDADE]]
+        self.esperando = participantes[self.CAPACIDADE:]
+        for participante in self.esperando:
+            entrar_na_espera(self.evento, participante)
+
+    def executar(self, acao):
+        try:
+            acao()
+        finally:
+            connection.close()
+
+    def test_cancelamentos_e_desistencias_simultaneos(self):
+        # Metade dos inscritos cancela enquanto os 5 últimos da fila desistem
+        desistentes = list(ListaEspera.objects.order_by('-pk')[:5])
+        acoes = [lambda inscricao=inscricao: cancelar_inscricao(inscricao)
+                 for inscricao in self.inscricoes[:self.CAPACIDADE // 2]]
+        acoes += [lambda espera=espera: sair_da_espera(espera) for espera in desistentes]
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            list(executor.map(self.executar, acoes))
+
+        self.evento.refresh_from_db()
+        inscritos = set(Inscricao.objects.filter(evento=self.evento).values_list('participante', flat=True))
+        promovidos = {participante.pk for participante in self.esperando[:self.CAPACIDADE // 2]}
+
+        self.assertEqual(self.evento.inscritos, self.CAPACIDADE)
+        self.assertEqual(len(inscritos), self.CAPACIDADE)
+        self.assertTrue(promovidos <= inscritos)
+        self.assertEqual(
+            list(ListaEspera.objects.order_by('pk').values_list('participante', flat=True)),
+            [participante.pk for participante in self.esperando[self.CAPACIDADE // 2:-5]],
+        )
+        self.assertEqual(EmailPendente.objects.count(), self.CAPACIDADE // 2)
+
+
+class ManipuladorSMTPLocal(socketserver.StreamRequestHandler):
+    def responder(self, linha):
+        self.wfile.write(f'{linha}\r\n'.encode())
+
+    def handle(self):
+        self.server.conexoes += 1
+        self.responder('220 localhost')
+        destinatarios = []
+
+        while True:
+            linha = self.rfile.readline()
+            if not linha:
+                break
+            comando = linha.decode().strip()
+            verbo = comando.split(' ', 1)[0].upper()
+
+            if verbo == 'MAIL':
+                destinatarios = []
+                self.responder('250 OK')
+            elif verbo == 'RCPT':
+                email = comando.split(':', 1)[1].strip('<> ')
+                if email in self.server.recusar:
+                    self.responder('550 Caixa inexistente')
+                else:
+                    destinatarios.append(email)
+                    self.responder('250 OK')
+            elif verbo == 'DATA':
+                self.responder('354 Envie a mensagem')
+                while self.rfile.readline() not in (b'.\r\n', b''):
+                    pass
+                self.server.mensagens.extend(destinatarios)
+                self.responder('250 OK')
+            elif verbo == 'QUIT':
+                self.responder('221 Tchau')
+                break
+            else:
+                self.responder('250 localhost')
+
+
+class ServidorSMTPLocal(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+
+    def __init__(self, recusar=()):
+        super().__init__(('127.0.0.1', 0), ManipuladorSMTPLocal)
+        self.recusar = set(recusar)
+        self.mensagens = []
+        self.conexoes = 0
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *args):
+        self.shutdown()
+        self.server_close()
+
+
+class ImportacaoInscricoesTest(BaseViewTest):
+    def arquivo_csv(self, linhas, cabecalho='nome,email,genero,cidade'):
+        conteudo = '\ufeff' + '\n'.join([cabecalho, *linhas]) + '\n'
+        return SimpleUploadedFile('inscricoes.csv', conteudo.encode(), content_type='text/csv')
+
+    def test_importa_cria_usuarios_e_enfileira_confirmacoes(self):
+        self.user_participante.email = 'Participante@X.com'
+        self.user_participante.save()
+        existente = User.objects.create_user(username='sem_perfil', email='sem_perfil@x.com')
+        arquivo = self.arquivo_csv([
+            'Ana <b>,ana@x.com,F,Recife',
+            'Participante Teste,participante@x.com,P,Cidade',
+            'Sem Perfil,sem_perfil@x.com,X,',
+            'Ana de novo,ANA@x.com,F,Recife',
+            ',vazio@x.com,M,',
+            'Invalido,nao-e-email,M,',
+        ])
+
+        resultado = importar_inscricoes(self.evento, arquivo, lote=2)
+
+        self.assertEqual(resultado['inscritos'], 3)
+        self.assertEqual(resultado['usuarios_criados'], 1)
+        self.assertEqual([linha for linha, _ in resultado['erros']], [5, 6, 7])
+        self.evento.refresh_from_db()
+        self.assertEqual(self.evento.inscritos, 3)
+        self.assertEqual(Inscricao.objects.filter(evento=self.evento).count(), 3)
+
+        ana = Participante.objects.select_related('user').get(user__email='ana@x.com')
+        self.assertEqual((ana.nome, ana.genero, ana.cidade), ('Ana <b>', 'F', 'Recife'))
+        self.assertFalse(ana.user.has_usable_password())
+        self.assertEqual(Participante.objects.get(user=existente).genero, 'P')
+
+        emails = {email.destinatario: email for email in EmailPendente.objects.all()}
+        self.assertEqual(set(emails), {'ana@x.com', 'Participante@X.com', 'sem_perfil@x.com'})
+        self.assertIn('Olá Ana &lt;b&gt;,', emails['ana@x.com'].corpo_html)
+        self.assertIn('Olá Sem Perfil,', emails['sem_perfil@x.com'].corpo_texto)
+
+    def test_reimportacao_conta_ja_inscritos(self):
+        importar_inscricoes(self.evento, self.arquivo_csv(['Ana,ana@x.com,F,Recife']))
+        resultado = importar_inscricoes(self.evento, self.arquivo_csv(['Ana,ana@x.com,F,Recife', 'Bia,bia@x.com,F,']))
+
+        self.assertEqual((resultado['inscritos'], resultado['ja_inscritos']), (1, 1))
+        self.evento.refresh_from_db()
+        self.assertEqual(self.evento.inscritos, 2)
+
+    def test_sem_vagas_para_o_lote_nada_e_gravado(self):
+        Evento.objects.filter(pk=self.evento.pk).update(capacidade_max=2)
+        arquivo = self.arquivo_csv([f'P{i},p{i}@x.com,M,' for i in range(3)])
+
+        with self.assertRaisesMessage(ImportacaoRecusada, '2 vagas restantes e o arquivo tem 3'):
+            importar_inscricoes(self.evento, arquivo)
+
+        self.assertFalse(User.objects.filter(email__startswith='p').exclude(pk=self.user_participante.pk).exists())
+        self.assertFalse(Inscricao.objects.exists())
+        self.assertFalse(EmailPendente.objects.exists())
+
+    def test_email_maior_que_o_username_vira_erro_da_linha(self):
+        longo = f"{'a' * 64}@{'b' * 63}.{'c' * 63}.com"
+        resultado = importar_inscricoes(self.evento, self.arquivo_csv([f'Longo,{longo},M,', 'Ana,ana@x.com,F,']))
+
+        self.assertEqual(resultado['inscritos'], 1)
+        self.assertEqual(resultado['erros'], [(2, 'e-mail com mais de 150 caracteres')])
+
+    def test_lista_de_espera_tem_prioridade_sobre_a_importacao(self):
+        Evento.objects.filter(pk=self.evento.pk).update(capacidade_max=2)
+        self.user_participante.email = 'participante@x.com'
+        self.user_participante.save()
+        outro = Participante.objects.create(
+            user=User.objects.create_user(username='outro'), nome='Outro', telefone='1', genero='P', cidade='C',
+            cpf='1')
+        ListaEspera.objects.bulk_create([
+            ListaEspera(evento=self.evento, participante=outro),
+            ListaEspera(evento=self.evento, participante=self.participante),
+        ])
+
+        with self.assertRaisesMessage(ImportacaoRecusada, '0 vagas restantes (2 reservadas à lista de espera)'):
+            importar_inscricoes(self.evento, self.arquivo_csv(['Ana,ana@x.com,F,']))
+
+        # Quem está na fila pode ser importado: sai dela e ocupa a própria vaga reservada
+        resultado = importar_inscricoes(self.evento, self.arquivo_csv(['Participante,participante@x.com,P,']))
+        self.assertEqual(resultado['inscritos'], 1)
+        self.assertEqual(list(ListaEspera.objects.values_list('participante', flat=True)), [outro.pk])
+
+    def test_organizador_nao_e_inscrito(self):
+        self.user_organizador.email = 'org@x.com'
+        self.user_organizador.save()
+
+        resultado = importar_inscricoes(self.evento, self.arquivo_csv(['Org,org@x.com,M,']))
+
+        self.assertEqual(resultado['inscritos'], 0)
+        self.assertEqual(resultado['erros'], [(None, 'org@x.com é organizador')])
+
+    def test_recusa_arquivo_sem_colunas_obrigatorias(self):
+        with self.assertRaises(ImportacaoRecusada):
+            importar_inscricoes(self.evento, self.arquivo_csv(['Ana'], cabecalho='nome'))
+        with self.assertRaises(ImportacaoRecusada):
+            importar_inscricoes(self.evento, SimpleUploadedFile('x.csv', 'nome,email\nJoão,j@x.com'.encode('latin-1')))
+
+    def test_view_restrita_ao_dono_do_evento(self):
+        self.client.login(username='participante', password='password')
+        response = self.client.post(reverse('evento-importar', args=[self.evento.pk]), {
+            'arquivo': self.arquivo_csv(['Ana,ana@x.com,F,']),
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(Inscricao.objects.exists())
+
+        self.client.login(username='organizador', password='password')
+        self.assertEqual(self.client.get(reverse('evento-importar', args=[self.evento.pk])).status_code, 200)
+        response = self.client.post(reverse('evento-importar', args=[self.evento.pk]), {
+            'arquivo': self.arquivo_csv(['Ana,ana@x.com,F,', 'Erro,erro,M,']),
+        }, follow=True)
+        mensagens = [str(m) for m in get_messages(response.wsgi_request)]
+        self.assertIn('1 inscrições importadas', mensagens[-2])
+        self.assertIn('linha 3', mensagens[-1])
+        self.assertEqual(Inscricao.objects.get().participante.user.email, 'ana@x.com')
+
+    def test_view_mostra_recusa_no_formulario(self):
+        Evento.objects.filter(pk=self.evento.pk).update(capacidade_max=0)
+        self.client.login(username='organizador', password='password')
+        response = self.client.post(reverse('evento-importar', args=[self.evento.pk]), {
+            'arquivo': self.arquivo_csv(['Ana,ana@x.com,F,']),
+        })
+        self.assertContains(response, 'Importação cancelada')
+        self.assertFalse(User.objects.filter(email='ana@x.com').exists())
+
+    def test_comando_importa_arquivo(self):
+        caminho = Path(self.enterContext(tempfile.TemporaryDirectory())) / 'inscricoes.csv'
+        caminho.write_text('nome,email\n' + ''.join(f'P{i},p{i}@x.com\n' for i in range(5)), encoding='utf-8')
+
+        with patch('sys.stdout', new_callable=io.StringIO) as saida:
+            call_command('importar_inscricoes', self.evento.pk, str(caminho), lote=2)
+
+        self.assertIn('5 inscrições criadas', saida.getvalue())
+        self.assertEqual(Inscricao.objects.filter(evento=self.evento).count(), 5)
+        with self.assertRaises(CommandError):
+            call_command('importar_inscricoes', self.evento.pk + 1, str(caminho))
+
+
+class FilaEmailTest(BaseViewTest):
+    def setUp(self):
+        super().setUp()
+        self.user_participante.email = 'participante@teste.com'
+        self.user_participante.save()
+
+    def test_inscricao_apenas_enfileira_email(self):
+        self.client.login(username='participante', password='password')
+        self.client.post(reverse('inscrever', args=[self.evento.id]))
+
+        self.assertEqual(len(mail.outbox), 0)
+        pendente = EmailPendente.objects.get()
+        self.assertEqual(pendente.destinatario, 'participante@teste.com')
+        self.assertIn(self.evento.titulo, pendente.corpo_html)
+
+        self.assertEqual(processar_fila(), (1, 0))
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['participante@teste.com'])
+        pendente.refresh_from_db()
+        self.assertIsNotNone(pendente.enviado_em)
+        self.assertEqual(processar_fila(), (0, 0))
+
+    @override_settings(SITE_URL='https://eventos.exemplo.com')
+    def test_banner_local_no_email_usa_url_absoluta(self):
+        enviar_email_confirmacao(self.participante, self.evento)
+
+        src = self.evento.banner_responsivo.url('destaque')
+        self.assertTrue(src.startswith('/'))
+        self.assertIn(f'src="https://eventos.exemplo.com{src}"', EmailPendente.objects.get().corpo_html)
+
+    def test_banner_do_cloudinary_no_email_mantem_a_url(self):
+        Evento.objects.filter(pk=self.evento.pk).update(
+            banner_hash='', imagem_banner='image/upload/v1/media/banners/x.jpg'
+        )
+        with banners_no('cloudinary'), conta_cloudinary_de_teste():
+            evento = Evento.objects.get(pk=self.evento.pk)
+            enviar_email_confirmacao(self.participante, evento)
+            src = evento.banner_responsivo.url('destaque')
+        self.assertTrue(src.startswith('http'))
+        self.assertIn(f'src="{src}"', EmailPendente.objects.get().corpo_html)
+
+    def test_lote_usa_uma_unica_conexao_smtp(self):
+        EmailPendente.objects.bulk_create(
+            EmailPendente(destinatario=f'p{i}@teste.com', assunto='Assunto', corpo_texto='Corpo')
+            for i in range(5)
+        )
+
+        with ServidorSMTPLocal() as servidor:
+            with override_settings(EMAIL_BACKEND='django.core.mail.backends.smtp.EmailBackend',
+                                   EMAIL_HOST='127.0.0.1', EMAIL_PORT=servidor.server_address[1],
+                                   EMAIL_USE_TLS=False, EMAIL_HOST_USER='', EMAIL_HOST_PASSWORD=''):
+                self.assertEqual(processar_fila(), (5, 0))
+
+        self.assertEqual(servidor.conexoes, 1)
+        self.assertEqual(len(servidor.mensagens), 5)
+
+    def test_falha_reagenda_com_backoff(self):
+        EmailPendente.objects.create(destinatario='invalido@teste.com', assunto='Assunto', corpo_texto='Corpo')
+        EmailPendente.objects.create(destinatario='valido@teste.com', assunto='Assunto', corpo_texto='Corpo')
+
+        with ServidorSMTPLocal(recusar=['invalido@teste.com']) as servidor:
+            with override_settings(EMAIL_BACKEND='django.core.mail.backends.smtp.EmailBackend',
+                                   EMAIL_HOST='127.0.0.1', EMAIL_PORT=servidor.server_address[1],
+                                   EMAIL_USE_TLS=False, EMAIL_HOST_USER='', EMAIL_HOST_PASSWORD=''):
+                self.assertEqual(processar_fila(), (1, 1))
+
+        self.assertEqual(servidor.mensagens, ['valido@teste.com'])
+        falhou = EmailPendente.objects.get(destinatario='invalido@teste.com')
+        self.assertEqual(falhou.tentativas, 1)
+        self.assertIsNone(falhou.enviado_em)
+        self.assertGreater(falhou.proxima_tentativa, timezone.now())
+        self.assertIn('550', falhou.erro)
+
+        # Ainda não chegou a hora da nova tentativa
+        self.assertEqual(processar_fila(), (0, 0))
+
+    def test_email_desiste_apos_maximo_de_tentativas(self):
+        EmailPendente.objects.create(
+            destinatario='desistido@teste.com', assunto='Assunto', corpo_texto='Corpo',
+            tentativas=MAX_TENTATIVAS
+        )
+        self.assertEqual(processar_fila(), (0, 0))
+        self.assertEqual(len(mail.outbox), 0)
+
+
+class RemocaoBannerTest(BaseViewTest):
+    def test_salvar_evento_sem_trocar_banner_nao_agenda_remocao(self):
+        evento = Evento.objects.get(pk=self.evento.pk)
+        evento.titulo = 'Outro título'
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertNumQueries(3):
+                evento.save()
+        self.assertFalse(RemocaoBanner.objects.exists())
+
+    def test_trocar_banner_agenda_remocao_do_antigo_apos_commit(self):
+        evento = Evento.objects.get(pk=self.evento.pk)
+        banner_antigo, hash_antigo = evento.imagem_banner.name, evento.banner_hash
+        evento.imagem_banner = 'banners/novo.jpg'
+
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            evento.save()
+        self.assertFalse(RemocaoBanner.objects.exists())
+
+        for callback in callbacks:
+            callback()
+        self.assertEqual(
+            list(RemocaoBanner.objects.order_by('pk').values_list('nome', flat=True)),
+            [banner_antigo, *nomes_rendicoes(hash_antigo)],
+        )
+
+    def test_excluir_evento_agenda_remocao_do_banner(self):
+        self.client.login(username='organizador', password='password')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('evento-delete', args=[self.evento.id]))
+        self.assertTrue(RemocaoBanner.objects.exists())
+
+    def test_processar_remocoes_em_lote_no_cloudinary(self):
+        RemocaoBanner.objects.bulk_create(RemocaoBanner(nome=f'media/banners/{i}') for i in range(3))
+
+        with banners_no('cloudinary'), patch('app.armazenamento.api.delete_resources') as mock_delete:
+            self.assertEqual(processar_remocoes(), (3, 0))
+        mock_delete.assert_called_once_with(['media/banners/0', 'media/banners/1', 'media/banners/2'])
+        self.assertFalse(RemocaoBanner.objects.exists())
+
+    def test_falha_no_cloudinary_reagenda_remocoes(self):
+        RemocaoBanner.objects.create(nome='media/banners/x')
+
+        with banners_no('cloudinary'), \
+                patch('app.armazenamento.api.delete_resources', side_effect=Exception('Cloudinary fora do ar')):
+            self.assertEqual(processar_remocoes(), (0, 1))
+        remocao = RemocaoBanner.objects.get()
+        self.assertEqual(remocao.tentativas, 1)
+        self.assertGreater(remocao.proxima_tentativa, timezone.now())
+
+    def test_processar_remocoes_apaga_arquivos_locais(self):
+        nome = armazenamento_banners.save('banners/x.jpg', ContentFile(b'sem uso'))
+        RemocaoBanner.objects.create(nome=nome)
+
+        self.assertEqual(processar_remocoes(), (1, 0))
+        self.assertFalse(armazenamento_banners.exists(nome))
+        self.assertFalse(RemocaoBanner.objects.exists())
+
+    def test_banner_ainda_usado_por_outro_evento_nao_e_apagado(self):
+        em_uso = self.evento.imagem_banner.name
+        RemocaoBanner.objects.create(nome=em_uso)
+
+        with banners_no('cloudinary'), patch('app.armazenamento.api.delete_resources') as mock_delete:
+            self.assertEqual(processar_remocoes(), (1, 0))
+        mock_delete.assert_not_called()
+        self.assertFalse(RemocaoBanner.objects.exists())
+
+    def test_upload_identico_durante_a_remocao_preserva_o_arquivo(self):
+        primeiro, segundo = sorted(
+            armazenamento_banners.save('banners/x.jpg', ContentFile(conteudo)) for conteudo in (b'um', b'dois')
+        )
+        RemocaoBanner.objects.bulk_create([RemocaoBanner(nome=primeiro), RemocaoBanner(nome=segundo)])
+        apagar = armazenamento_banners.delete
+
+        def apagar_enquanto_evento_recebe_o_segundo(nome):
+            apagar(nome)
+            # Entre a reserva do lote e a remoção, um upload idêntico volta a apontar para o segundo arquivo
+            Evento.objects.filter(pk=self.evento.pk).update(imagem_banner=segundo)
+
+        with patch.object(armazenamento_banners, 'delete', side_effect=apagar_enquanto_evento_recebe_o_segundo):
+            self.assertEqual(processar_remocoes(), (2, 0))
+        self.assertFalse(armazenamento_banners.exists(primeiro))
+        self.assertTrue(armazenamento_banners.exists(segundo))
+
+
+class ArmazenamentoBannersTest(BaseViewTest):
+    def test_local_enderecado_por_conteudo_e_deduplicado(self):
+        nome = armazenamento_banners.save('banners/Foto.JPG', ContentFile(b'mesmo conteudo'))
+        repetido = armazenamento_banners.save('banners/outro_nome.jpg', ContentFile(b'mesmo conteudo'))
+        diferente = armazenamento_banners.save('banners/Foto.JPG', ContentFile(b'outro conteudo'))
+
+        self.assertRegex(nome, r'^banners/([0-9a-f]{2})/\1[0-9a-f]{30}\.jpg$')
+        self.assertEqual(repetido, nome)
+        self.assertNotEqual(diferente, nome)
+        self.assertEqual(len(list(Path(armazenamento_banners.path(nome)).parent.iterdir())), 1)
+
+    def test_eventos_com_o_mesmo_banner_compartilham_o_arquivo(self):
+        banner = self.evento.imagem_banner
+        with banner.open('rb'):
+            conteudo = banner.read()
+        outro = Evento.objects.create(
+            organizador=self.organizador, titulo='Outro', descricao='Desc', data=timezone.now(), local='Local',
+            capacidade_max=5, imagem_banner=SimpleUploadedFile('copia.png', conteudo, content_type='image/png'),
+        )
+        self.assertEqual(outro.imagem_banner.name, self.evento.imagem_banner.name)
+
+    def test_apagar_banners_confere_o_uso_de_cada_nome_antes_de_apagar(self):
+        nomes = sorted(armazenamento_banners.save('banners/x.jpg', ContentFile(c)) for c in (b'a', b'b'))
+        em_uso = Mock(side_effect=lambda consultados: set(consultados) & {nomes[1]})
+
+        self.assertEqual(apagar_banners(nomes, em_uso), [nomes[0]])
+        self.assertEqual(em_uso.call_args_list, [call([nomes[0]]), call([nomes[1]])])
+        self.assertFalse(armazenamento_banners.exists(nomes[0]))
+        self.assertTrue(armazenamento_banners.exists(nomes[1]))
+
+    def test_apagar_banners_no_cloudinary_divide_em_lotes(self):
+        nomes = [f'image/upload/v1/media/banners/{i:03}.jpg' for i in range(LOTE_CLOUDINARY * 2 + 1)]
+
+        with banners_no('cloudinary'), patch('app.armazenamento.api.delete_resources') as mock_delete:
+            apagados = apagar_banners(nomes, lambda consultados: {nomes[0]})
+        self.assertEqual(apagados, nomes[1:])
+        self.assertEqual([len(chamada.args[0]) for chamada in mock_delete.call_args_list], [100, 100])
+        self.assertEqual(mock_delete.call_args_list[0].args[0][0], 'media/banners/001')
+
+    def test_cloudinary_exists_e_open(self):
+        self.enterContext(conta_cloudinary_de_teste())
+        armazenamento = ArmazenamentoCloudinary()
+        with patch('app.armazenamento.api.resource', side_effect=NotFound('ausente')):
+            self.assertFalse(armazenamento.exists('media/banners/x'))
+        with patch('app.armazenamento.api.resource', return_value={'public_id': 'media/banners/x'}) as recurso:
+            self.assertTrue(armazenamento.exists('image/upload/v3/media/banners/x.png'))
+        recurso.assert_called_once_with('media/banners/x', type='upload', resource_type='image')
+
+        with patch('app.armazenamento.urlopen', return_value=io.BytesIO(b'bytes do banner')) as baixar:
+            with armazenamento.open('image/upload/v3/media/banners/x.png') as arquivo:
+                self.assertEqual(arquivo.read(), b'bytes do banner')
+        self.assertIn('/image/upload/v3/media/banners/x.png', baixar.call_args.args[0])
+
+    def test_midia_serve_arquivo_com_cache_imutavel(self):
+        nome = self.evento.imagem_banner.name
+        response = self.client.get(self.evento.imagem_banner.url)
+
+        self.assertEqual(response.status_code, 200)
+        with self.evento.imagem_banner.open('rb') as arquivo:
+            self.assertEqual(b''.join(response.streaming_content), arquivo.read())
+        self.assertEqual(response['Content-Type'], 'image/png')
+        self.assertIn('max-age=31536000', response['Cache-Control'])
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertEqual(self.evento.imagem_banner.url, reverse('midia', args=[nome]))
+
+    def test_midia_inexistente_ou_fora_do_media_root(self):
+        self.assertEqual(self.client.get(reverse('midia', args=['banners/nao/existe.jpg'])).status_code, 404)
+        self.assertEqual(self.client.get('/media/../config/settings.py').status_code, 404)
+        self.assertEqual(self.client.get('/media/banners').status_code, 404)
+
+    def test_midia_delegada_ao_nginx_com_x_accel_redirect(self):
+        nome = self.evento.imagem_banner.name
+        with override_settings(MIDIA_X_ACCEL_REDIRECT='/midia-interna/'):
+            response = self.client.get(reverse('midia', args=[nome]))
+
+        self.assertEqual(response['X-Accel-Redirect'], f'/midia-interna/{nome}')
+        self.assertEqual(response.content, b'')
+        self.assertIn('immutable', response['Cache-Control'])
+
+
+class ExclusaoEmCascataTest(BaseViewTest):
+    def setUp(self):
+        super().setUp()
+        self.participantes = [self.participante]
+        for i in range(11):
+            user = User.objects.create_user(username=f'cascata{i}', password='password')
+            self.participantes.append(Participante.objects.create(
+                user=user, nome=f'Cascata {i}', telefone='1', genero='P', cidade='C', cpf='1'))
+
+    def criar_organizador(self, nome, eventos, inscricoes_por_evento):
+        user = User.objects.create_user(username=nome, password='password')
+        organizador = Organizador.objects.create(
+            user=user, nome_organizador=nome, telefone='1', genero='P', cidade='C', cnpj='1')
+        for i in range(eventos):
+            evento = Evento.objects.create(
+                organizador=organizador, titulo=f'{nome} {i}', descricao='Desc',
+                data=timezone.now() + timezone.timedelta(days=i + 2), local='Local',
+                capacidade_max=inscricoes_por_evento, inscritos=inscricoes_por_evento,
+                imagem_banner=f'media/banners/{nome}{i}',
+            )
+            Inscricao.objects.bulk_create(
+                Inscricao(evento=evento, participante=participante)
+                for participante in self.participantes[:inscricoes_por_evento]
+            )
+            ListaEspera.objects.create(evento=evento, participante=self.participantes[-1])
+        return organizador
+
+    def excluir_organizador(self, organizador):
+        self.client.force_login(organizador.user)
+        with CaptureQueriesContext(connection) as consultas:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.post(reverse('perfil-organizador-delete', args=[organizador.pk]))
+        return len(consultas)
+
+    def test_exclusao_do_organizador_nao_cresce_com_as_inscricoes(self):
+        pequeno = self.criar_organizador('pequeno', eventos=3, inscricoes_por_evento=2)
+        grande = self.criar_organizador('grande', eventos=3, inscricoes_por_evento=10)
+
+        self.assertEqual(self.excluir_organizador(pequeno), self.excluir_organizador(grande))
+        self.assertFalse(Evento.objects.exclude(pk=self.evento.pk).exists())
+        self.assertFalse(Inscricao.objects.exists())
+        self.assertFalse(ListaEspera.objects.exists())
+        self.assertFalse(User.objects.filter(username__in=['pequeno', 'grande']).exists())
+        self.assertEqual(RemocaoBanner.objects.count(), 6)
+
+    def test_exclusao_do_organizador_em_lotes(self):
+        organizador = self.criar_organizador('lotes', eventos=5, inscricoes_por_evento=3)
+
+        with patch('app.views.excluir_organizador', wraps=lambda o: excluir_organizador(o, lote=2)):
+            self.excluir_organizador(organizador)
+
+        self.assertFalse(Evento.objects.filter(organizador__user__username='lotes').exists())
+        self.assertFalse(Inscricao.objects.exists())
+        self.assertEqual(RemocaoBanner.objects.count(), 5)
+
+    def test_exclusao_do_evento_apaga_dependentes(self):
+        organizador = self.criar_organizador('evento', eventos=2, inscricoes_por_evento=4)
+        evento, outro = Evento.objects.filter(organizador=organizador).order_by('pk')
+
+        self.client.force_login(organizador.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('evento-delete', args=[evento.pk]))
+
+        self.assertFalse(Evento.objects.filter(pk=evento.pk).exists())
+        self.assertEqual(Inscricao.objects.filter(evento=outro).count(), 4)
+        self.assertFalse(Inscricao.objects.filter(evento_id=evento.pk).exists())
+        self.assertEqual(ListaEspera.objects.get().evento, outro)
+        self.assertEqual(list(RemocaoBanner.objects.values_list('nome', flat=True)), ['media/banners/evento0'])
+
+    def test_exclusao_do_participante_nao_cresce_com_as_inscricoes(self):
+        organizador = self.criar_organizador('part', eventos=6, inscricoes_por_evento=3)
+        poucas, muitas = self.participantes[1], self.participantes[2]
+        titulos = ['part 1', 'part 2', 'part 3']
+        Inscricao.objects.filter(participante=poucas, evento__titulo__in=titulos).delete()
+        Evento.objects.filter(titulo__in=titulos).update(inscritos=F('inscritos') - 1)
+
+        def excluir(participante):
+            self.client.force_login(participante.user)
+            with CaptureQueriesContext(connection) as consultas:
+                self.client.post(reverse('perfil-participante-delete', args=[participante.pk]))
+            return len(consultas)
+
+        self.assertEqual(excluir(poucas), excluir(muitas))
+        self.assertFalse(User.objects.filter(pk__in=[poucas.user_id, muitas.user_id]).exists())
+        # A vaga liberada promove quem estava na lista de espera
+        for evento in Evento.objects.filter(organizador=organizador):
+            self.assertEqual(evento.inscritos, Inscricao.objects.filter(evento=evento).count())
+        self.assertEqual(Inscricao.objects.filter(participante=self.participantes[-1]).count(), 6)
+
+
+class BannerResponsivoTest(BaseViewTest):
+    def imagem(self, largura=2000, altura=1500, cor='navy', formato='JPEG'):
+        saida = io.BytesIO()
+        Image.new('RGB', (largura, altura), cor).save(saida, formato)
+        return SimpleUploadedFile('banner.jpg', saida.getvalue(), content_type='image/jpeg')
+
+    def criar_evento(self, banner):
+        self.client.login(username='organizador', password='password')
+        self.client.post(reverse('evento-create'), {
+            'titulo': 'Com Banner', 'descricao': 'Desc', 'data': '2030-01-01T10:00', 'local': 'Local',
+            'capacidade_max': 10, 'imagem_banner': banner,
+        })
+        return Evento.objects.get(titulo='Com Banner')
+
+    def test_upload_gera_renditions_em_todos_os_formatos(self):
+        evento = self.criar_evento(self.imagem())
+
+        self.assertEqual(len(evento.banner_hash), 32)
+        for rendicao, tamanho in RENDICOES.items():
+            for formato, (codec, _) in FORMATOS.items():
+                with armazenamento().open(nome_rendicao(evento.banner_hash, rendicao, formato)) as arquivo:
+                    with Image.open(arquivo) as imagem:
+                        self.assertEqual((imagem.format, imagem.size), (codec, tamanho))
+
+    def test_card_usa_srcset_e_carregamento_preguicoso(self):
+        evento = self.criar_evento(self.imagem())
+        banner = evento.banner_responsivo
+
+        response = self.client.get(reverse('evento-list'))
+        self.assertContains(response, f'<source type="image/avif" srcset="{banner.srcset_avif}"')
+        self.assertContains(response, f'<source type="image/webp" srcset="{banner.srcset_webp}"')
+        self.assertContains(response, f'src="{banner.src}"')
+        self.assertContains(response, 'loading="lazy"')
+        self.assertIn('/card.jpg', banner.src)
+        self.assertIn('/destaque.webp 1280w', banner.srcset_webp)
+
+    def test_mesmo_conteudo_reaproveita_renditions(self):
+        evento = self.criar_evento(self.imagem(cor='teal'))
+
+        with patch.object(armazenamento(), 'save') as salvar:
+            outro = Evento.objects.create(
+                organizador=self.organizador, titulo='Outro', descricao='Desc', data=timezone.now(),
+                local='Local', capacidade_max=5, imagem_banner=self.imagem(cor='teal'),
+            )
+        salvar.assert_not_called()
+        self.assertEqual(outro.banner_hash, evento.banner_hash)
+
+    def test_banner_sem_renditions_usa_transformacoes_do_cloudinary(self):
+        Evento.objects.filter(pk=self.evento.pk).update(
+            banner_hash='', imagem_banner='image/upload/v1/media/banners/x.jpg'
+        )
+        with banners_no('cloudinary'), conta_cloudinary_de_teste():
+            evento = Evento.objects.get(pk=self.evento.pk)
+            src = evento.banner_responsivo.src
+            self.assertIn('c_fill,f_auto,h_360,q_auto,w_640', src)
+            self.assertContains(self.client.get(reverse('evento-list')), f'src="{src}"')
+
+    def test_banner_no_cloudinary_nao_grava_renditions_no_disco_local(self):
+        enviado = Mock(**{'get_prep_value.return_value': 'image/upload/v1/media/banners/novo.jpg'})
+        with banners_no('cloudinary'), conta_cloudinary_de_teste(), \
+                patch('app.armazenamento.uploader.upload_resource', return_value=enviado), \
+                patch.object(armazenamento_local, 'save') as salvar:
+            evento = self.criar_evento(self.imagem())
+            self.assertEqual(evento.banner_hash, '')
+            self.assertIn('c_fill,f_auto,h_360,q_auto,w_640', evento.banner_responsivo.src)
+        salvar.assert_not_called()
+
+    def test_hash_sem_storage_de_renditions_e_ignorado(self):
+        Evento.objects.filter(pk=self.evento.pk).update(
+            banner_hash='a' * 32, imagem_banner='image/upload/v1/media/banners/x.jpg'
+        )
+        with banners_no('cloudinary'), conta_cloudinary_de_teste():
+            src = Evento.objects.get(pk=self.evento.pk).banner_responsivo.src
+        self.assertNotIn('rendicoes/', src)
+        self.assertIn('c_fill', src)
+
+    def test_trocar_banner_remove_renditions_sem_uso(self):
+        evento = self.criar_evento(self.imagem(cor='maroon'))
+        compartilhado = Evento.objects.create(
+            organizador=self.organizador, titulo='Outro', descricao='Desc', data=timezone.now(),
+            local='Local', capacidade_max=5, imagem_banner=self.imagem(cor='gray'),
+        )
+        hash_antigo, hash_compartilhado = evento.banner_hash, compartilhado.banner_hash
+        Evento.objects.filter(pk=self.evento.pk).update(banner_hash=hash_compartilhado)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            evento.imagem_banner = 'banners/outro.jpg'
+            evento.save()
+            compartilhado.delete()
+        self.assertEqual(RemocaoBanner.objects.filter(nome__startswith='rendicoes/').count(), 2 * len(RENDICOES) * len(FORMATOS))
+
+        processar_remocoes()
+        self.assertFalse(armazenamento().exists(nome_rendicao(hash_antigo, 'card', 'jpg')))
+        self.assertTrue(armazenamento().exists(nome_rendicao(hash_compartilhado, 'card', 'jpg')))
+
+    def test_banner_local_sem_renditions_usa_o_original(self):
+        Evento.objects.filter(pk=self.evento.pk).update(banner_hash='')
+        evento = Evento.objects.get(pk=self.evento.pk)
+
+        self.assertEqual(evento.banner_responsivo.src, evento.imagem_banner.url)
+        self.assertEqual(evento.banner_responsivo.srcset_jpg, '')
+
+    def test_trocar_banner_sem_upload_descarta_renditions(self):
+        evento = self.criar_evento(self.imagem())
+        evento.imagem_banner = 'banners/outro.jpg'
+        evento.save()
+        evento.refresh_from_db()
+        self.assertEqual(evento.banner_hash, '')
+
+    def test_arquivo_que_nao_e_imagem_fica_sem_renditions(self):
+        with self.assertLogs('app.imagens', 'WARNING'):
+            evento = Evento.objects.create(
+                organizador=self.organizador, titulo='Quebrado', descricao='Desc', data=timezone.now(),
+                local='Local', capacidade_max=5,
+                imagem_banner=SimpleUploadedFile('banner.jpg', b'nao e imagem', content_type='image/jpeg'),
+            )
+        self.assertEqual(evento.banner_hash, '')
+
+    def test_storage_de_renditions_configuravel(self):
+        pasta = self.enterContext(tempfile.TemporaryDirectory())
+        storages_config = {**settings.STORAGES, 'rendicoes': {
+            'BACKEND': 'django.core.files.storage.FileSystemStorage',
+            'OPTIONS': {'location': pasta, 'base_url': 'https://cdn.exemplo.com/'},
+        }}
+        with override_settings(STORAGES=storages_config):
+            evento = self.criar_evento(self.imagem(cor='olive'))
+            self.assertTrue(evento.banner_responsivo.src.startswith('https://cdn.exemplo.com/rendicoes/'))
+        self.assertTrue((Path(pasta) / nome_rendicao(evento.banner_hash, 'card', 'avif')).exists())
+
+
+class RemocaoBannerForaDeTransacaoTest(TransactionTestCase):
+    def test_storage_e_chamado_sem_transacao_aberta(self):
+        nome = armazenamento_banners.save('banners/x.jpg', ContentFile(b'sem uso'))
+        RemocaoBanner.objects.create(nome=nome)
+        apagar = armazenamento_banners.delete
+        em_transacao = []
+
+        def registrar_e_apagar(nome):
+            em_transacao.append(connection.in_atomic_block)
+            apagar(nome)
+
+        with patch.object(armazenamento_banners, 'delete', side_effect=registrar_e_apagar):
+            self.assertEqual(processar_remocoes(), (1, 0))
+        self.assertEqual(em_transacao, [False])
+        self.assertFalse(RemocaoBanner.objects.exists())
+
+
+class PerfilUsuarioCacheTest(BaseViewTest):
+    def test_perfil_resolvido_uma_vez_e_reaproveitado(self):
+        self.client.login(username='organizador', password='password')
+        with self.assertNumQueries(3):
+            # sessão, usuário e perfil (organizador + participante num único SELECT)
+            response = self.client.get(reverse('home'))
+        self.assertTrue(response.context['is_organizador'])
+        self.assertFalse(response.context['is_participante'])
+
+        with self.assertNumQueries(2):
+            self.client.get(reverse('home'))
+
+    def test_cache_guarda_so_os_ids_do_perfil(self):
+        self.client.login(username='participante', password='password')
+        self.client.get(reverse('home'))
+
+        self.assertEqual(cache.get(chave_perfil(self.user_participante.pk)), (None, self.participante.pk))
+
+    def test_check_de_deploy_exige_cache_compartilhado(self):
+        self.assertEqual([aviso.id for aviso in verificar_cache_dos_perfis(None)], ['app.W001'])
+        redis = {'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://x'}}
+        with override_settings(CACHES=redis):
+            self.assertEqual(verificar_cache_dos_perfis(None), [])
+
+    def test_perfil_invalidado_ao_criar_e_excluir_perfil(self):
+        user = User.objects.create_user(username='novo', password='password')
+        self.client.login(username='novo', password='password')
+        response = self.client.get(reverse('home'))
+        self.assertFalse(response.context['is_participante'])
+
+        participante = Participante.objects.create(
+            user=user, nome='Novo', telefone='1', genero='P', cidade='C', cpf='1')
+        response = self.client.get(reverse('home'))
+        self.assertTrue(response.context['is_participante'])
+
+        participante.delete()
+        response = self.client.get(reverse('home'))
+        self.assertFalse(response.context['is_participante'])
+
+
+class PerfilHistoricoTest(BaseViewTest):
+    def setUp(self):
+        super().setUp()
+        self.user_participante.email = 'participante@x.com'
+        self.user_participante.save()
+        for i in range(24):
+            evento = Evento.objects.create(
+                organizador=self.organizador,
+                titulo=f'Evento Histórico {i}',
+                descricao='Desc',
+                data=timezone.now() + timezone.timedelta(days=i + 2),
+                local='Local',
+                capacidade_max=10,
+                imagem_banner='media/banners/historico'
+            )
+            inscrever(evento, self.participante)
+        inscrever(self.evento, self.participante)
+
+    def test_paginas_do_participante_numa_consulta(self):
+        self.client.login(username='participante', password='password')
+        for rota in ['perfil-participante', 'perfil-participante-update', 'perfil-usuario-update']:
+            args = [] if rota == 'perfil-participante' else [self.user_participante.pk]
+            self.client.get(reverse(rota, args=args))
+            with self.assertNumQueries(4):
+                # sessão, usuário, o participante (só os ids vêm do cache) e a página do histórico com o total
+                response = self.client.get(reverse(rota, args=args))
+            self.assertEqual(response.context['total_inscricoes'], 25)
+            self.assertEqual(len(response.context['inscricoes']), 20)
+            self.assertContains(response, 'participante@x.com')
+
+        response = self.client.get(reverse('perfil-participante'), {'page': 2})
+        self.assertEqual([i.evento for i in response.context['inscricoes']][-1], Evento.objects.get(
+            titulo='Evento Histórico 0'))
+        self.assertEqual(len(response.context['inscricoes']), 5)
+        self.assertEqual(self.client.get(reverse('perfil-participante'), {'page': 3}).status_code, 404)
+
+    def test_paginas_do_organizador_numa_consulta(self):
+        self.client.login(username='organizador', password='password')
+        for rota in ['perfil-organizador', 'perfil-organizador-update', 'perfil-usuario-update']:
+            args = [] if rota == 'perfil-organizador' else [self.user_organizador.pk]
+            self.client.get(reverse(rota, args=args))
+            with self.assertNumQueries(4):
+                response = self.client.get(reverse(rota, args=args))
+            self.assertEqual(response.context['total_eventos'], 25)
+            self.assertContains(response, '1 de 2')
+
+    def test_historico_vazio(self):
+        Inscricao.objects.all().delete()
+        self.client.login(username='participante', password='password')
+        response = self.client.get(reverse('perfil-participante'))
+        self.assertEqual(response.context['total_inscricoes'], 0)
+        self.assertNotContains(response, 'Paginação do histórico')
+
+    def test_atualizacao_do_participante(self):
+        self.client.login(username='participante', password='password')
+        response = self.client.post(reverse('perfil-participante-update', args=[self.participante.pk]), {
+            'nome': 'Nome Novo', 'telefone': '9', 'genero': 'F', 'cidade': 'Recife', 'cpf': '1',
+        })
+        self.assertRedirects(response, reverse('perfil-participante'))
+        self.participante.refresh_from_db()
+        self.assertEqual((self.participante.nome, self.participante.user_id), ('Nome Novo', self.user_participante.pk))
+        self.assertContains(self.client.get(reverse('perfil-participante')), 'Nome Novo')
+
+
+class DashboardViewTest(BaseViewTest):
+    def criar_participantes(self, quantidade, cidade='Cidade', genero='F'):
+        User.objects.bulk_create(User(username=f'{cidade}-{i}') for i in range(quantidade))
+        usuarios = User.objects.filter(username__startswith=f'{cidade}-')
+        Participante.objects.bulk_create(
+            Participante(user=user, nome=user.username, telefone='1', genero=genero, cidade=cidade, cpf='1')
+            for user in usuarios
+        )
+        return list(Participante.objects.filter(cidade=cidade))
+
+    def test_dashboard_estatisticas_por_evento(self):
+        participantes = self.criar_participantes(4, cidade='Santos')
+        Inscricao.objects.bulk_create(Inscricao(evento=self.evento, participante=p) for p in participantes)
+        recontar_inscritos()
+
+        self.client.login(username='organizador', password='password')
+        response = self.client.get(reverse('dashboard'))
+
+        evento = response.context['eventos'][0]
+        self.assertEqual(evento.total_inscritos, 4)
+        self.assertAlmostEqual(evento.taxa_ocupacao, 40.0)
+        self.assertEqual(response.context['total_inscricoes'], 4)
+        self.assertEqual(response.context['inscricoes_por_genero'], [{'genero': 'Feminino', 'total': 4}])
+        self.assertEqual(response.context['inscricoes_por_cidade'], [{'cidade': 'Santos', 'total': 4}])
+        self.assertEqual(sum(linha['total'] for linha in response.context['inscricoes_por_dia']), 4)
+
+    def test_dashboard_numero_fixo_de_consultas(self):
+        Inscricao.objects.create(evento=self.evento, participante=self.participante)
+        self.client.login(username='organizador', password='password')
+        self.client.get(reverse('dashboard'))
+
+        def consultas_do_dashboard():
+            with CaptureQueriesContext(connection) as consultas:
+                self.client.get(reverse('dashboard'))
+            return len(consultas)
+
+        poucas = consultas_do_dashboard()
+
+        for i in range(5):
+            evento = Evento.objects.create(
+                organizador=self.organizador, titulo=f'Evento {i}', descricao='Desc',
+                data=timezone.now(), local='Local', capacidade_max=100, imagem_banner='media/banners/dash')
+            participantes = self.criar_participantes(20, cidade=f'Cidade {i}')
+            Inscricao.objects.bulk_create(Inscricao(evento=evento, participante=p) for p in participantes)
+
+        self.assertEqual(consultas_do_dashboard(), poucas)
+
+    def test_dashboard_pagina_inscricoes(self):
+        participantes = self.criar_participantes(60, cidade='Campinas')
+        evento = Evento.objects.create(
+            organizador=self.organizador, titulo='Grande', descricao='Desc',
+            data=timezone.now(), local='Local', capacidade_max=100, imagem_banner='media/banners/dash')
+        Inscricao.objects.bulk_create(Inscricao(evento=evento, participante=p) for p in participantes)
+
+        self.client.login(username='organizador', password='password')
+        response = self.client.get(reverse('dashboard'))
+        self.assertEqual(len(response.context['inscricoes']), 50)
+        response = self.client.get(reverse('dashboard'), {'page': 2})
+        self.assertEqual(len(response.context['inscricoes']), 10)
+
+
+class DashboardExportarViewTest(BaseViewTest):
+    def setUp(self):
+        super().setUp()
+        Inscricao.objects.create(evento=self.evento, participante=self.participante)
+
+        user_outro = User.objects.create(username='outro_organizador')
+        outro = Organizador.objects.create(
+            user=user_outro, nome_organizador='Outro', telefone='1', genero='P', cidade='C', cnpj='1')
+        Evento.objects.create(
+            organizador=outro, titulo='Evento Alheio', descricao='Desc', data=timezone.now(),
+            local='Local', capacidade_max=5, imagem_banner='media/banners/alheio')
+
+    def exportar(self, tabela, **params):
+        self.client.login(username='organizador', password='password')
+        response = self.client.get(reverse('dashboard-exportar', args=[tabela]), params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return response, b''.join(response.streaming_content)
+
+    def test_exporta_inscricoes_csv(self):
+        response, conteudo = self.exportar('inscricoes')
+        self.assertIn('attachment; filename="inscricoes.csv"', response['Content-Disposition'])
+        linhas = list(csv.reader(io.StringIO(conteudo.decode('utf-8-sig'))))
+        self.assertEqual(linhas[0][0], 'Nome')
+        self.assertEqual(len(linhas), 2)
+        self.assertEqual(linhas[1][0], 'Participante Teste')
+        self.assertEqual(linhas[1][2], 'Evento de Teste')
+
+    def test_exporta_eventos_apenas_do_organizador(self):
+        response, conteudo = self.exportar('eventos')
+        texto = conteudo.decode('utf-8-sig')
+        self.assertIn('Evento de Teste', texto)
+        self.assertNotIn('Evento Alheio', texto)
+
+    def test_exporta_csv_com_gzip(self):
+        response, conteudo = self.exportar('inscricoes', gzip='1')
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        self.assertIn('Participante Teste', gzip.decompress(conteudo).decode('utf-8-sig'))
+
+    def test_exporta_xlsx(self):
+        response, conteudo = self.exportar('eventos', formato='xlsx')
+        with zipfile.ZipFile(io.BytesIO(conteudo)) as arquivo:
+            self.assertIn('xl/workbook.xml', arquivo.namelist())
+            planilha = arquivo.read('xl/worksheets/sheet1.xml').decode()
+        self.assertIn('Evento de Teste', planilha)
+        self.assertIn('<v>10</v>', planilha)
+
+    def test_formulas_de_usuarios_sao_neutralizadas(self):
+        Participante.objects.filter(pk=self.participante.pk).update(nome='=HYPERLINK("http://x")', cidade='@SUM(1)')
+        Evento.objects.filter(pk=self.evento.pk).update(titulo='+1-1', local='-2')
+
+        _, conteudo = self.exportar('inscricoes')
+        linha = list(csv.reader(io.StringIO(conteudo.decode('utf-8-sig'))))[1]
+        self.assertEqual((linha[0], linha[2], linha[5]), ('\'=HYPERLINK("http://x")', "'+1-1", "'@SUM(1)"))
+
+        _, conteudo = self.exportar('eventos', formato='xlsx')
+        with zipfile.ZipFile(io.BytesIO(conteudo)) as arquivo:
+            planilha = arquivo.read('xl/worksheets/sheet1.xml').decode()
+        self.assertIn('<c t="inlineStr"><is><t xml:space="preserve">+1-1</t></is></c>', planilha)
+        self.assertIn('<c t="inlineStr"><is><t xml:space="preserve">-2</t></is></c>', planilha)
+        self.assertNotIn('<f>', planilha)
+
+    def test_exportacao_exige_organizador(self):
+        self.client.login(username='participante', password='password')
+        response = self.client.get(reverse('dashboard-exportar', args=['inscricoes']))
+        self.assertEqual(response.status_code, 302)
+
+    def test_tabela_inexistente(self):
+        self.client.login(username='organizador', password='password')
+        response = self.client.get(reverse('dashboard-exportar', args=['usuarios']))
+        self.assertEqual(response.status_code, 404)
+
+
+class GerarInscricoesCommandTest(TestCase):
+    def test_gera_dados_consistentes_em_lotes(self):
+        call_command(
+            'gerar_inscricoes', organizadores=2, eventos=5, participantes=20, inscricoes=90, lote=7
+        )
+
+        self.assertEqual(Organizador.objects.count(), 2)
+        self.assertEqual(Evento.objects.count(), 5)
+        self.assertEqual(Participante.objects.count(), 20)
+        self.assertEqual(Inscricao.objects.count(), 90)
+        for evento in Evento.objects.annotate(total=Count('inscricao')):
+            self.assertEqual(evento.inscritos, evento.total)
+            self.assertLessEqual(evento.inscritos, evento.capacidade_max)
+
+        participante = Participante.objects.select_related('user').first()
+        self.assertTrue(participante.user.check_password('senha123'))
+
+    def test_recusa_mais_inscricoes_que_pares_possiveis(self):
+        with self.assertRaises(CommandError):
+            call_command('gerar_inscricoes', eventos=2, participantes=3, inscricoes=7)
+        self.assertFalse(User.objects.exists())
+
+
+class CatalogoCacheTest(BaseViewTest):
+    def test_pagina_anonima_vem_do_cache_sem_consultas(self):
+        self.client.get(reverse('evento-list'))
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('evento-list'))
+        self.assertContains(response, 'Evento de Teste')
+        self.assertNotContains(response, 'csrfmiddlewaretoken')
+        self.assertEqual(estatisticas_cache()['paginas']['acertos'], 1)
+
+    @patch('app.views.enviar_email_confirmacao')
+    def test_inscricao_invalida_vagas_da_pagina_anonima(self, mock_email):
+        anonimo = Client()
+        self.assertContains(anonimo.get(reverse('evento-list')), f'data-vagas-evento="{self.evento.pk}">10<')
+
+        self.client.login(username='participante', password='password')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('inscrever', args=[self.evento.id]))
+
+        self.assertContains(anonimo.get(reverse('evento-list')), f'data-vagas-evento="{self.evento.pk}">9<')
+
+    def test_edicao_do_evento_invalida_apenas_o_seu_card(self):
+        outro = Evento.objects.create(
+            organizador=self.organizador, titulo='Outro Evento', descricao='Desc',
+            data=timezone.now() + timezone.timedelta(days=2), local='Local', capacidade_max=5,
+            imagem_banner='media/banners/outro',
+        )
+        self.client.login(username='participante', password='password')
+        self.client.get(reverse('evento-list'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            outro.titulo = 'Evento Renomeado'
+            outro.save()
+        response = self.client.get(reverse('evento-list'))
+
+        self.assertContains(response, 'Evento Renomeado')
+        self.assertEqual(estatisticas_cache()['cards'], {'acertos': 1, 'falhas': 3, 'taxa_acerto': 0.25})
+
+    @override_settings(CACHE_CATALOGO=False)
+    @patch('app.views.enviar_email_confirmacao')
+    def test_catalogo_sem_cache_compartilhado_consulta_sempre(self, mock_email):
+        anonimo = Client()
+        anonimo.get(reverse('evento-list'))
+        self.client.login(username='participante', password='password')
+        self.client.post(reverse('inscrever', args=[self.evento.id]))
+
+        self.assertContains(anonimo.get(reverse('evento-list')), f'data-vagas-evento="{self.evento.pk}">9<')
+        self.assertEqual(estatisticas_cache()['paginas']['acertos'], 0)
+        self.assertEqual(estatisticas_cache()['cards']['acertos'], 0)
+
+    def criar_outro_evento(self):
+        return Evento.objects.create(
+            organizador=self.organizador, titulo='Outro Evento', descricao='Desc',
+            data=timezone.now() + timezone.timedelta(days=2), local='Local', capacidade_max=5,
+            imagem_banner='media/banners/outro',
+        )
+
+    def test_inscricao_invalida_so_o_evento_afetado(self):
+        outro = self.criar_outro_evento()
+        anonimo = Client()
+        anonimo.get(reverse('evento-list'))
+        listagem = cache.get(CHAVE_VERSAO_CATALOGO)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            inscrever(self.evento, self.participante)
+        response = anonimo.get(reverse('evento-list'))
+
+        self.assertContains(response, f'data-vagas-evento="{self.evento.pk}">9<')
+        self.assertContains(response, f'data-vagas-evento="{outro.pk}">5<')
+        self.assertEqual(cache.get(CHAVE_VERSAO_CATALOGO), listagem)
+        self.assertEqual(estatisticas_cache()['cards'], {'acertos': 1, 'falhas': 3, 'taxa_acerto': 0.25})
+
+    def test_pagina_sem_o_evento_alterado_continua_em_cache(self):
+        outro = self.criar_outro_evento()
+        url = f"{reverse('evento-list')}?q=Outro"
+        anonimo = Client()
+        anonimo.get(url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            inscrever(self.evento, self.participante)
+        with self.assertNumQueries(0):
+            self.assertContains(anonimo.get(url), f'data-vagas-evento="{outro.pk}">5<')
+
+    def test_so_campos_da_listagem_mudam_a_versao_da_listagem(self):
+        Client().get(reverse('evento-list'))
+        listagem = cache.get(CHAVE_VERSAO_CATALOGO)
+        evento = Evento.objects.get(pk=self.evento.pk)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            evento.capacidade_max = 20
+            evento.save()
+        self.assertEqual(cache.get(CHAVE_VERSAO_CATALOGO), listagem)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            evento.data = evento.data + timezone.timedelta(days=1)
+            evento.save()
+        self.assertEqual(cache.get(CHAVE_VERSAO_CATALOGO), listagem + 1)
+
+    def test_pagina_renderizada_durante_uma_alteracao_nao_e_guardada(self):
+        def renderizar_durante_inscricao(*args):
+            versoes = renderizar_cards(*args)
+            incrementar(CHAVE_ALTERACOES)
+            return versoes
+
+        with patch('app.views.renderizar_cards', side_effect=renderizar_durante_inscricao):
+            Client().get(reverse('evento-list'))
+        Client().get(reverse('evento-list'))
+        self.assertEqual(estatisticas_cache()['paginas']['acertos'], 0)
+
+    def test_check_de_deploy_exige_cache_compartilhado(self):
+        self.assertEqual([aviso.id for aviso in verificar_cache_do_catalogo(None)], ['app.W002'])
+        with override_settings(CACHE_CATALOGO=False):
+            self.assertEqual(verificar_cache_do_catalogo(None), [])
+
+    def test_pagina_com_mensagem_nao_vai_para_o_cache(self):
+        params = {'data_inicio': '2030-01-02', 'data_fim': '2030-01-01'}
+        self.client.get(reverse('evento-list'), params)
+        response = self.client.get(reverse('evento-list'), params)
+        self.assertContains(response, 'A data de início não pode ser maior que a data de fim.')
+        self.assertEqual(estatisticas_cache()['paginas']['acertos'], 0)
+
+    def test_estatisticas_apenas_para_staff(self):
+        self.client.login(username='participante', password='password')
+        self.assertEqual(self.client.get(reverse('cache-estatisticas')).status_code, 403)
+
+        self.user_participante.is_staff = True
+        self.user_participante.save()
+        response = self.client.get(reverse('cache-estatisticas'))
+        self.assertEqual(set(response.json()), {'cards', 'paginas'})
+
+
+class PlanoConsultaTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        call_command('gerar_inscricoes', organizadores=5, eventos=50, participantes=200, inscricoes=2000)
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        cls.evento = Evento.objects.order_by('pk').first()
+        cls.organizador = cls.evento.organizador
+        cls.participante = Participante.objects.order_by('pk').first()
+
+    def plano(self, queryset):
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                # Com poucas linhas o Postgres prefere varrer a tabela mesmo havendo índice
+                cursor.execute('SET LOCAL enable_seqscan = off')
+            return queryset.explain()
+
+    def assertSemVarreduraCompleta(self, queryset, ordenado=True):
+        plano = self.plano(queryset)
+        varreduras = [
+            linha for linha in plano.splitlines()
+            if 'Seq Scan' in linha or ('SCAN ' in linha and ' USING ' not in linha)
+        ]
+        self.assertFalse(varreduras, f'Consulta degradou para varredura completa:\n{plano}')
+        if ordenado:
+            self.assertNotIn('TEMP B-TREE FOR ORDER BY', plano, f'Ordenação sem índice:\n{plano}')
+            self.assertNotRegex(plano, r'(?m)^\s*(->\s*)?Sort\b', f'Ordenação sem índice:\n{plano}')
+
+    def test_inscricao_por_evento_e_participante(self):
+        self.assertSemVarreduraCompleta(
+            Inscricao.objects.filter(evento=self.evento, participante=self.participante), ordenado=False)
+
+    def test_inscricoes_do_participante_mais_recentes(self):
+        self.assertSemVarreduraCompleta(
+            Inscricao.objects.filter(participante=self.participante).order_by('-data_envio'))
+
+    def test_eventos_do_organizador_por_data(self):
+        self.assertSemVarreduraCompleta(Evento.objects.filter(organizador=self.organizador).order_by('-data'))
+
+    def test_eventos_por_intervalo_de_datas(self):
+        agora = timezone.now()
+        self.assertSemVarreduraCompleta(
+            Evento.objects.filter(data__gte=agora, data__lte=agora + timezone.timedelta(days=30)).order_by('data', 'id'))
+
+
+class BenchmarkRotasTest(TestCase):
+    def test_todas_as_rotas_tem_benchmark(self):
+        self.assertEqual(rotas_sem_benchmark(), [])
+
+    def test_consultas_nao_crescem_com_a_base_nem_passam_da_baseline(self):
+        resultados = {tamanho: medir_tamanho(tamanho, repeticoes=1) for tamanho in ('pequeno', 'medio')}
+
+        self.assertEqual(rotas_que_escalam(resultados), {})
+        regressoes = comparar_com_baseline(
+            resultados, carregar_baseline(), tolerancia_latencia=float('inf'), tolerancia_memoria=float('inf'))
+        self.assertEqual(regressoes, [])
+
+
+class InstrumentacaoMiddlewareTest(BaseViewTest):
+    def setUp(self):
+        super().setUp()
+        limpar_estatisticas()
+        self.client.login(username='participante', password='password')
+
+    @override_settings(INSTRUMENTACAO_AMOSTRAGEM=1.0)
+    def test_registra_sql_template_e_tamanho_por_view(self):
+        with self.assertLogs('app.instrumentacao', 'INFO') as logs:
+            response = self.client.get(reverse('evento-list'))
+
+        registro = json.loads(logs.records[0].getMessage())
+        self.assertEqual(registro['view'], 'evento-list')
+        self.assertGreater(registro['sql'], 0)
+        self.assertGreater(registro['template_ms'], 0)
+        self.assertEqual(registro['bytes'], len(response.content))
+
+        self.user_participante.is_staff = True
+        self.user_participante.save()
+        with self.assertLogs('app.instrumentacao', 'INFO'):
+            estatisticas = self.client.get(reverse('instrumentacao-estatisticas')).json()
+        self.assertEqual(estatisticas['evento-list']['requisicoes'], 1)
+        self.assertEqual(estatisticas['evento-list']['sql_medio'], registro['sql'])
+
+    @override_settings(INSTRUMENTACAO_AMOSTRAGEM=1.0)
+    def test_mede_template_de_pagina_anonima_renderizada_pelo_cache(self):
+        renderizar = SimpleTemplateResponse.rendered_content.fget
+
+        def renderizar_devagar(response):
+            time.sleep(0.02)
+            return renderizar(response)
+
+        with patch.object(SimpleTemplateResponse, 'rendered_content', property(renderizar_devagar)), \
+                self.assertLogs('app.instrumentacao', 'INFO') as logs:
+            Client().get(reverse('evento-list'))
+
+        self.assertGreaterEqual(json.loads(logs.records[0].getMessage())['template_ms'], 20)
+
+    @override_settings(INSTRUMENTACAO_AMOSTRAGEM=1.0)
+    async def test_mede_sql_de_view_assincrona(self):
+        await self.async_client.aforce_login(self.user_participante)
+        with self.assertLogs('app.instrumentacao', 'INFO') as logs:
+            await self.async_client.get(reverse('evento-list'))
+
+        registro = json.loads(logs.records[0].getMessage())
+        self.assertEqual(registro['view'], 'evento-list')
+        self.assertGreater(registro['sql'], 0)
+
+    def test_sem_amostragem_nao_mede(self):
+        with self.assertNoLogs('app.instrumentacao', 'INFO'):
+            self.client.get(reverse('evento-list'))
+        self.assertEqual(estatisticas_instrumentacao(), {})
+
+
+class ViewsAssincronasTest(BaseViewTest):
+    async def test_lista_paginada_com_orm_assincrono(self):
+        await self.async_client.aforce_login(self.user_participante)
+        response = await self.async_client.get(reverse('evento-list'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([evento.pk for evento in response.context['eventos']], [self.evento.pk])
+        self.assertEqual(response.context['paginator'].count, 1)
+        self.assertTrue(response.context['is_participante'])
+
+    async def test_pagina_inexistente_retorna_404(self):
+        response = await self.async_client.get(reverse('evento-list'), {'page': 5})
+        self.assertEqual(response.status_code, 404)
+
+    async def test_home_anonima_em_cache(self):
+        await self.async_client.get(reverse('home'))
+        response = await self.async_client.get(reverse('home'))
+
+        self.assertEqual(response.status_code, 200)
+        paginas = (await sync_to_async(estatisticas_cache)())['paginas']
+        self.assertEqual((paginas['acertos'], paginas['falhas']), (1, 1))
+
+    async def test_disponibilidade(self):
+        await sync_to_async(inscrever)(self.evento, self.participante)
+        response = await self.async_client.get(
+            reverse('evento-disponibilidade'), {'ids': f'{self.evento.pk},999,abc'}
+        )
+
+        self.assertEqual(response.json(), {str(self.evento.pk): 9})
+
+    async def test_exportacao_em_streaming_assincrono(self):
+        await self.async_client.aforce_login(self.user_organizador)
+        response = await self.async_client.get(reverse('dashboard-exportar', args=['eventos']), {'formato': 'xlsx'})
+
+        self.assertTrue(response.is_async)
+        conteudo = b''.join([bloco async for bloco in response.streaming_content])
+        with zipfile.ZipFile(io.BytesIO(conteudo)) as arquivo:
+            self.assertIn('Evento de Teste', arquivo.read('xl/worksheets/sheet1.xml').decode())
+
+    async def test_blocos_assincronos_gerados_sob_demanda(self):
+        gerados = []
+
+        def blocos():
+            for i in range(3):
+                gerados.append(i)
+                yield str(i).encode()
+
+        iterador = blocos_assincronos(blocos())
+        self.assertEqual(await anext(iterador), b'0')
+        self.assertEqual(gerados, [0])
+        self.assertEqual([bloco async for bloco in iterador], [b'1', b'2'])
+
+    async def test_dados_do_dashboard(self):
+        await sync_to_async(inscrever)(self.evento, self.participante)
+
+        response = await self.async_client.get(reverse('dashboard-dados'))
+        self.assertEqual(response.status_code, 302)
+
+        await self.async_client.aforce_login(self.user_participante)
+        response = await self.async_client.get(reverse('dashboard-dados'))
+        self.assertEqual(response.status_code, 403)
+
+        await self.async_client.aforce_login(self.user_organizador)
+        dados = (await self.async_client.get(reverse('dashboard-dados'))).json()
+        self.assertEqual(dados['total_eventos'], 1)
+        self.assertEqual(dados['total_inscricoes'], 1)
+        self.assertEqual(dados['eventos'][0]['taxa_ocupacao'], 10.0)
+        self.assertEqual(dados['inscricoes_por_cidade'], [{'cidade': 'Cidade', 'total': 1}])
+
+
+class DisponibilidadeViewTest(BaseViewTest):
+    def setUp(self):
+        super().setUp()
+        self.url = f"{reverse('evento-disponibilidade')}?ids={self.evento.pk}"
+
+    def test_etag_e_cache_curto(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.json(), {str(self.evento.pk): 10})
+        self.assertIn('max-age=5', response['Cache-Control'])
+
+        with self.assertNumQueries(0):
+            nao_modificada = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(nao_modificada.status_code, 304)
+        self.assertEqual(nao_modificada['ETag'], response['ETag'])
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(self.url).json(), {str(self.evento.pk): 10})
+
+    def test_inscricao_muda_etag_e_vagas(self):
+        etag = self.client.get(self.url)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            inscrever(self.evento, self.participante)
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.json(), {str(self.evento.pk): 9})
+
+    def test_inscricao_em_outro_evento_mantem_etag(self):
+        outro = Evento.objects.create(
+            organizador=self.organizador, titulo='Outro', descricao='Desc', data=timezone.now(),
+            local='Local', capacidade_max=5, imagem_banner='media/banners/outro',
+        )
+        etag = self.client.get(self.url)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            inscrever(outro, self.participante)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    @override_settings(CACHE_CATALOGO=False)
+    def test_sem_cache_compartilhado_consulta_sem_etag(self):
+        self.client.get(self.url)
+        inscrever(self.evento, self.participante)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertEqual(response.json(), {str(self.evento.pk): 9})
+        self.assertNotIn('ETag', response)
+
+
+class TransmissaoVagasTest(BaseViewTest):
+    def tearDown(self):
+        transmissor.assinaturas.clear()
+
+    async def test_rajadas_coalescidas_e_filtradas(self):
+        assinatura = transmissor.assinar({'1', '2'})
+        transmissor.publicar({'1': 5})
+        transmissor.publicar({'1': 4, '3': 0})
+
+        mensagens = transmissor.mensagens(assinatura)
+        self.assertEqual(await anext(mensagens), 'retry: 3000\n\n')
+        self.assertEqual(await anext(mensagens), 'event: vagas\ndata: {"1":4}\n\n')
+
+    @patch('app.transmissao.MAX_PENDENTES', 2)
+    async def test_cliente_lento_recebe_ressincronizar(self):
+        assinatura = transmissor.assinar()
+        transmissor.publicar({'1': 1, '2': 2, '3': 3})
+
+        mensagens = transmissor.mensagens(assinatura)
+        await anext(mensagens)
+        self.assertEqual(await anext(mensagens), 'event: ressincronizar\ndata: {}\n\n')
+
+    async def test_heartbeat_em_conexao_ociosa(self):
+        mensagens = transmissor.mensagens(transmissor.assinar(), intervalo_heartbeat=0.01)
+        await anext(mensagens)
+        self.assertEqual(await anext(mensagens), ': ping\n\n')
+
+    def test_inscricao_publica_vagas_apos_commit(self):
+        with patch('app.signals.publicar_vagas') as publicar:
+            with self.captureOnCommitCallbacks(execute=True):
+                inscrever(self.evento, self.participante)
+        publicar.assert_called_with(self.evento.pk)
+
+    async def test_stream_sse(self):
+        response = await self.async_client.get(reverse('evento-vagas-stream'))
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+
+        conteudo = aiter(response.streaming_content)
+        self.assertEqual(await anext(conteudo), b'retry: 3000\n\n')
+        self.assertEqual(transmissor.total_assinantes, 1)
+
+        await sync_to_async(inscrever)(self.evento, self.participante)
+        await sync_to_async(publicar_vagas)(self.evento.pk)
+        self.assertEqual(await anext(conteudo), f'event: vagas\ndata: {{"{self.evento.pk}":9}}\n\n'.encode())
+
+        # Na desconexão do cliente o Django cancela a tarefa que aguarda a próxima mensagem
+        proxima = asyncio.ensure_future(anext(conteudo))
+        await asyncio.sleep(0)
+        proxima.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await proxima
+        self.assertEqual(transmissor.total_assinantes, 0)
+
+    async def test_aplicacao_asgi_do_stream(self):
+        recebidas, desconectar = asyncio.Queue(), asyncio.Event()
+        pedido = [{'type': 'http.request', 'body': b''}]
+
+        async def receive():
+            if pedido:
+                return pedido.pop()
+            await desconectar.wait()
+            return {'type': 'http.disconnect'}
+
+        escopo = {'type': 'http', 'path': '/eventos/vagas/stream', 'query_string': f'ids={self.evento.pk}'.encode()}
+        conexao = asyncio.ensure_future(aplicacao_sse(escopo, receive, recebidas.put))
+        self.assertEqual((await recebidas.get())['status'], 200)
+        self.assertEqual((await recebidas.get())['body'], b'retry: 3000\n\n')
+
+        transmissor.publicar({str(self.evento.pk): 3, '999': 1})
+        self.assertEqual((await recebidas.get())['body'], f'event: vagas\ndata: {{"{self.evento.pk}":3}}\n\n'.encode())
+
+        desconectar.set()
+        await conexao
+        self.assertEqual(transmissor.total_assinantes, 0)
+
+    def test_stream_indisponivel_sob_wsgi(self):
+        self.assertEqual(self.client.get(reverse('evento-vagas-stream')).status_code, 204)
+
+
+class ConexoesPersistentesTest(TransactionTestCase):
+    def setUp(self):
+        user = User.objects.create_user(username='conexoes', password='password')
+        client = Client()
+        client.force_login(user)
+        self.cookie = f"sessionid={client.cookies['sessionid'].value}"
+        self.configuracao = connections.settings['default']
+        self.idade_original = self.configuracao['CONN_MAX_AGE']
+
+    def tearDown(self):
+        connections.close_all()
+        self.configuracao['CONN_MAX_AGE'] = self.idade_original
+
+    def test_conexao_reaproveitada_entre_requisicoes(self):
+        self.configuracao['CONN_MAX_AGE'] = 0
+        sem_persistencia = medir_conexoes('/', self.cookie, threads=2, requisicoes=5)
+        self.assertEqual(sem_persistencia['conexoes_abertas'], 10)
+
+        self.configuracao['CONN_MAX_AGE'] = 60
+        persistente = medir_conexoes('/', self.cookie, threads=2, requisicoes=5)
+        self.assertEqual(persistente['conexoes_abertas'], 2)
+
+
+class ServidorAsgiTest(TransactionTestCase):
+    def setUp(self):
+        user = User.objects.create_user(username='asgi', password='password')
+        client = Client()
+        client.force_login(user)
+        self.cookie = f"sessionid={client.cookies['sessionid'].value}"
+
+    def tearDown(self):
+        connections.close_all()
+
+    def test_rotas_de_leitura_atendidas_via_asgi(self):
+        # medir_asgi falha se alguma resposta não for 200 (ex.: ORM síncrono no event loop)
+        for caminho in ('/', '/eventos', '/eventos/disponibilidade?ids=1,2'):
+            medida = medir_asgi(caminho, self.cookie, concorrencia=2, requisicoes=2)
+            self.assertEqual(medida['requisicoes'], 4)
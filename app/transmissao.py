@@ -0,0 +1,145 @@
+import asyncio
+import json
+import threading
+from urllib.parse import parse_qs
+
+from app.catalogo import ids_de_eventos
+from app.models import Evento
+
+INTERVALO_HEARTBEAT = 15
+MAX_PENDENTES = 1000
+MAX_ASSINANTES = 10000
+
+
+class Assinatura:
+    def __init__(self, loop, ids=None):
+        self.loop = loop
+        self.ids = ids
+        self.pendentes = {}
+        self.ressincronizar = False
+        self.sinal = asyncio.Event()
+
+    def entregar(self, vagas):
+        if self.ids is not None:
+            vagas = {evento_id: restantes for evento_id, restantes in vagas.items() if evento_id in self.ids}
+        if not vagas:
+            return
+        # Rajadas para o mesmo evento se fundem: só o valor mais recente importa
+        self.pendentes.update(vagas)
+        if len(self.pendentes) > MAX_PENDENTES:
+            # Cliente lento demais: descarta o acumulado e pede que recarregue pelo JSON de disponibilidade
+            self.pendentes.clear()
+            self.ressincronizar = True
+        # asyncio.Event não é thread-safe; a publicação pode vir de uma thread do ORM
+        self.loop.call_soon_threadsafe(self.sinal.set)
+
+
+class Transmissor:
+    def __init__(self):
+        self.trava = threading.Lock()
+        self.assinaturas = set()
+
+    @property
+    def total_assinantes(self):
+        return len(self.assinaturas)
+
+    def assinar(self, ids=None):
+        assinatura = Assinatura(asyncio.get_running_loop(), ids)
+        with self.trava:
+            self.assinaturas.add(assinatura)
+        return assinatura
+
+    def cancelar(self, assinatura):
+        with self.trava:
+            self.assinaturas.discard(assinatura)
+
+    def publicar(self, vagas):
+        with self.trava:
+            encerradas = []
+            for assinatura in self.assinaturas:
+                try:
+                    assinatura.entregar(vagas)
+                except RuntimeError:
+                    # Event loop já encerrado (ex.: worker reiniciando)
+                    encerradas.append(assinatura)
+            self.assinaturas.difference_update(encerradas)
+
+    def retirar(self, assinatura):
+        with self.trava:
+            vagas, ressincronizar = assinatura.pendentes, assinatura.ressincronizar
+            assinatura.pendentes, assinatura.ressincronizar = {}, False
+            assinatura.sinal.clear()
+        return vagas, ressincronizar
+
+    async def mensagens(self, assinatura, intervalo_heartbeat=INTERVALO_HEARTBEAT):
+        # Uma conexão ociosa custa só a assinatura e este gerador suspenso; o próximo
+        # envio só é montado depois que o anterior foi entregue ao servidor ASGI
+        yield 'retry: 3000\n\n'
+        while True:
+            try:
+                await asyncio.wait_for(assinatura.sinal.wait(), intervalo_heartbeat)
+            except asyncio.TimeoutError:
+                yield ': ping\n\n'
+                continue
+
+            vagas, ressincronizar = self.retirar(assinatura)
+            if ressincronizar:
+                yield 'event: ressincronizar\ndata: {}\n\n'
+            if vagas:
+                yield f"event: vagas\ndata: {json.dumps(vagas, separators=(',', ':'))}\n\n"
+
+
+transmissor = Transmissor()
+
+
+async def aplicacao_sse(scope, receive, send):
+    # App ASGI pura para o stream: o ASGIHandler do Django mantém uma thread por requisição
+    # aberta (sinais e middlewares síncronos), o que custaria uma thread por conexão ociosa
+    await receive()
+    if transmissor.total_assinantes >= MAX_ASSINANTES:
+        await send({'type': 'http.response.start', 'status': 503, 'headers': [(b'retry-after', b'30')]})
+        await send({'type': 'http.response.body', 'body': 'Muitas conexões abertas.'.encode()})
+        return
+
+    valor = parse_qs(scope.get('query_string', b'').decode()).get('ids', [''])[0]
+    assinatura = transmissor.assinar({str(pk) for pk in ids_de_eventos(valor)} or None)
+    mensagens = transmissor.mensagens(assinatura)
+
+    async def transmitir():
+        await send({'type': 'http.response.start', 'status': 200, 'headers': [
+            (b'content-type', b'text/event-stream'), (b'cache-control', b'no-cache'), (b'x-accel-buffering', b'no'),
+        ]})
+        async for mensagem in mensagens:
+            await send({'type': 'http.response.body', 'body': mensagem.encode(), 'more_body': True})
+
+    async def aguardar_desconexao():
+        while (await receive())['type'] != 'http.disconnect':
+            pass
+
+    tarefas = [asyncio.ensure_future(transmitir()), asyncio.ensure_future(aguardar_desconexao())]
+    try:
+        await asyncio.wait(tarefas, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for tarefa in tarefas:
+            tarefa.cancel()
+        await asyncio.gather(*tarefas, return_exceptions=True)
+        await mensagens.aclose()
+        transmissor.cancelar(assinatura)
+
+
+def publicar_vagas(evento_id):
+    publicar_vagas_dos_eventos([evento_id])
+
+
+def publicar_vagas_dos_eventos(evento_ids):
+    # Sem assinantes no processo, nem consulta o banco
+    if not transmissor.total_assinantes or not evento_ids:
+        return
+    vagas = {
+        str(pk): capacidade - inscritos
+        for pk, capacidade, inscritos in Evento.objects.filter(pk__in=evento_ids).values_list(
+            'pk', 'capacidade_max', 'inscritos'
+        )
+    }
+    if vagas:
+        transmissor.publicar(vagas)
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 from django.contrib.auth import views as auth_views
@@ -5,11 +6,16 @@ from django.contrib.auth import views as auth_views
 urlpatterns=[
     path('', views.HomeView.as_view(), name='home'),
     path('eventos', views.EventoListView.as_view(), name='evento-list'),
+    path('eventos/disponibilidade', views.DisponibilidadeView.as_view(), name='evento-disponibilidade'),
+    path('eventos/vagas/stream', views.VagasStreamView.as_view(), name='evento-vagas-stream'),
+    path('eventos/fragmento', views.EventoFragmentoView.as_view(), name='evento-fragmento'),
     path('eventos/nova/', views.EventoCreateView.as_view(), name='evento-create'),
     path('eventos/<int:pk>/editar/', views.EventoUpdateView.as_view(), name='evento-update'),
     path('eventos/<int:pk>/excluir/', views.EventoDeleteView.as_view(), name='evento-delete'),
+    path('eventos/<int:pk>/importar/', views.InscricaoImportarView.as_view(), name='evento-importar'),
     path('inscrever/<int:evento_id>/', views.InscricaoCreateView.as_view(), name='inscrever'),
     path('desinscrever/<int:pk>/', views.InscricaoDeleteView.as_view(), name='desinscrever'),
+    path('espera/<int:pk>/sair/', views.ListaEsperaDeleteView.as_view(), name='sair-espera'),
     path('perfil/participante', views.ParticipanteListView.as_view(), name='perfil-participante'),
     path('perfil/participante/<int:pk>/editar/', views.ParticipanteUpdateView.as_view(), name='perfil-participante-update'),
     path('perfil/participante/<int:pk>/excluir/', views.ParticipanteDeleteView.as_view(), name='perfil-participante-delete'),
@@ -19,7 +25,12 @@ urlpatterns=[
     path('perfil/usuario/<int:pk>/editar', views.UserUpdateView.as_view(), name='perfil-usuario-update'),
     path('password_change/', auth_views.PasswordChangeView.as_view(template_name='registro/password_change_form.html'), name='password_change'),
     path('password_change/done/', auth_views.PasswordChangeDoneView.as_view(template_name='registro/password_change_done_form.html'), name='password_change_done'),
-    path('dashboard', views.DashboardView.as_view(), name='dashboard')
+    path('dashboard', views.DashboardView.as_view(), name='dashboard'),
+    path('dashboard/dados', views.DashboardDadosView.as_view(), name='dashboard-dados'),
+    path('dashboard/exportar/<str:tabela>', views.DashboardExportarView.as_view(), name='dashboard-exportar'),
+    path('cache/estatisticas', views.EstatisticasCacheView.as_view(), name='cache-estatisticas'),
+    path('instrumentacao/estatisticas', views.EstatisticasInstrumentacaoView.as_view(), name='instrumentacao-estatisticas'),
+    path(f"{settings.MEDIA_URL.lstrip('/')}<path:nome>", views.MidiaView.as_view(), name='midia'),
 ]
 
 from .views import ParticipanteSignUpView, OrganizadorSignUpView
@@ -1,38 +1,107 @@
 import datetime
+import hashlib
+import mimetypes
+import os
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth import login
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.contrib.auth.views import redirect_to_login
 from django.contrib.auth.models import User
-from django.core.mail import EmailMultiAlternatives
-from django.db.models import Q
+from django.core.cache import cache
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import OuterRef, Subquery
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect
-from django.template.loader import render_to_string
 from django.urls import reverse_lazy
-from django.utils.html import strip_tags
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
 from django.views import View
-from django.views.generic import ListView, CreateView, UpdateView, DeleteView, TemplateView
+from django.views.generic import ListView, CreateView, UpdateView, DeleteView, TemplateView, FormView
+from app.armazenamento import armazenamento_local
+from app.busca import buscar_eventos
+from app.catalogo import TEMPO_CACHE_DISPONIBILIDADE, aversoes_eventos, chave_disponibilidade, estatisticas_cache, \
+    ids_de_eventos, renderizar_cards
+from app.emails import enviar_email_confirmacao
+from app.estatisticas import aresumo_dashboard, resumo_dashboard
+from app.exclusoes import excluir_eventos, excluir_organizador, excluir_participante
+from app.exportacao import CABECALHO_EVENTOS, CABECALHO_INSCRICOES, blocos_assincronos, exportar, linhas_eventos, \
+    linhas_inscricoes
 from app.forms import EventoForm, ParticipanteSignUpForm, OrganizadorSignUpForm, ParticipanteForm, OrganizadorForm, \
-    UserForm
-from app.mixins import OrganizadorRequiredMixin, EventoOwnerRequiredMixin, ParticipanteRequiredMixin
-from app.models import Evento, Organizador, Participante, Inscricao
-
-
-class EventoListView(ListView):
+    UserForm, ImportarInscricoesForm
+from app.importacao import ImportacaoRecusada, importar_inscricoes
+from app.inscricoes import CapacidadeEsgotada, InscricaoRecusada, cancelar_inscricao, entrar_na_espera, inscrever, \
+    promover_da_espera, sair_da_espera
+from app.instrumentacao import estatisticas_instrumentacao
+from app.mixins import OrganizadorRequiredMixin, EventoOwnerRequiredMixin, ParticipanteRequiredMixin, \
+    HistoricoPerfilMixin, PaginaAnonimaEmCacheMixin, PerfilAssincronoMixin, StaffRequiredMixin
+from app.models import Evento, Organizador, Participante, Inscricao, ListaEspera
+from app.paginacao import aplicar_cursor, codificar_cursor, querystring_sem
+from app.perfis import vincular_usuario
+from app.transmissao import MAX_ASSINANTES, transmissor
+
+
+class EventoListView(PaginaAnonimaEmCacheMixin, PerfilAssincronoMixin, ListView):
     model = Evento
     template_name = 'eventos/evento_list.html'
     context_object_name = 'eventos'
+    paginate_by = 12
+    fragmento = False
+    total = None
+    paginacao = None
+
+    async def get(self, request, *args, **kwargs):
+        await self.resolver_perfil()
+        # Montar o queryset é barato, mas a busca textual pode consultar o banco (fts_disponivel)
+        queryset = await sync_to_async(self.get_queryset)()
+        page_size = self.get_paginate_by(queryset)
+        if page_size:
+            self.paginacao = await self.apaginar(queryset, page_size)
+            self.object_list = queryset
+        else:
+            self.object_list = [evento async for evento in queryset]
+        # Cards vêm do cache ou são renderizados: trabalho síncrono, fora do event loop
+        context = await sync_to_async(self.get_context_data)()
+        return self.render_to_response(context)
+
+    async def apaginar(self, queryset, page_size):
+        # Com o total já contado, o paginate_queryset síncrono não consulta o banco
+        self.total = await queryset.acount()
+        paginator, page, _, is_paginated = super().paginate_queryset(queryset, page_size)
+        page.object_list = [evento async for evento in page.object_list]
+        return paginator, page, page.object_list, is_paginated
+
+    def get_paginator(self, queryset, per_page, **kwargs):
+        paginator = super().get_paginator(queryset, per_page, **kwargs)
+        if self.total is not None:
+            paginator.count = self.total
+        return paginator
+
+    def paginate_queryset(self, queryset, page_size):
+        if self.paginacao is not None:
+            return self.paginacao
+        return super().paginate_queryset(queryset, page_size)
+
+    def usa_cursor(self):
+        # A busca textual ordena por relevância, então só pagina por número de página
+        if self.request.GET.get('q'):
+            return False
+        return self.fragmento or 'cursor' in self.request.GET
+
+    def get_paginate_by(self, queryset):
+        if self.usa_cursor():
+            return None
+        return self.paginate_by
+
+    def get_perfis(self):
+        perfil = self.request.perfil
+        return perfil.organizador_id, perfil.is_participante
 
     def get_queryset(self):
         queryset = super().get_queryset()
 
-        query = self.request.GET.get('q')
-        if query:
-            queryset = queryset.filter(
-                Q(titulo__icontains=query) |
-                Q(descricao__icontains=query) |
-                Q(local__icontains=query)
-            )
-
         data_inicio = self.request.GET.get('data_inicio')
         data_fim = self.request.GET.get('data_fim')
 
@@ -42,50 +111,82 @@ class EventoListView(ListView):
         if data_fim:
             queryset = queryset.filter(data__lte=data_fim)
 
-        queryset = queryset.order_by('id')
+        query = self.request.GET.get('q')
+        if query:
+            queryset = buscar_eventos(queryset, query)
+        else:
+            queryset = queryset.order_by('data', 'id')
+
+        _, is_participante = self.get_perfis()
+        if is_participante:
+            minha_inscricao = Inscricao.objects.filter(
+                evento=OuterRef('pk'),
+                participante__user=self.request.user
+            ).values('id')[:1]
+            minha_espera = ListaEspera.objects.filter(
+                evento=OuterRef('pk'),
+                participante__user=self.request.user
+            ).values('id')[:1]
+            queryset = queryset.annotate(inscricao_id=Subquery(minha_inscricao), espera_id=Subquery(minha_espera))
+
+        if self.usa_cursor():
+            queryset = aplicar_cursor(queryset, self.request.GET.get('cursor'))[:self.paginate_by + 1]
 
         return queryset
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        user = self.request.user
+        organizador_id, is_participante = self.get_perfis()
 
-        is_authenticated = self.request.user.is_authenticated
-        organizador_usuario = None
-        if is_authenticated:
-            organizador_usuario = Organizador.objects.filter(user=user).first()
-
-        context['is_organizador'] = bool(organizador_usuario)
-        context['is_participante'] = Participante.objects.filter(user=self.request.user).exists() if is_authenticated else False
+        context['is_organizador'] = organizador_id is not None
+        context['is_participante'] = is_participante
         context['query'] = self.request.GET.get('q', '')
+        context['data_inicio'] = self.request.GET.get('data_inicio', '')
+        context['data_fim'] = self.request.GET.get('data_fim', '')
+        context['querystring'] = querystring_sem(self.request.GET, 'page', 'cursor')
 
         data_inicio_param = self.request.GET.get('data_inicio')
         data_fim_param = self.request.GET.get('data_fim')
 
-        if data_inicio_param and data_fim_param:
+        if data_inicio_param and data_fim_param and not self.fragmento:
             if data_inicio_param > data_fim_param:
                 messages.error(self.request, 'A data de início não pode ser maior que a data de fim.')
 
-        eventos_filtrados = self.get_queryset()
+        eventos = list(context['eventos'])
+        context['proximo_cursor'] = None
+        context['proximo_lote'] = None
+        if self.usa_cursor():
+            if len(eventos) > self.paginate_by:
+                eventos = eventos[:self.paginate_by]
+                context['proximo_cursor'] = codificar_cursor(eventos[-1])
+                context['proximo_lote'] = f"cursor={context['proximo_cursor']}"
+        elif context['is_paginated'] and context['page_obj'].has_next():
+            if self.request.GET.get('q'):
+                context['proximo_lote'] = f"page={context['page_obj'].next_page_number()}"
+            else:
+                context['proximo_cursor'] = codificar_cursor(eventos[-1])
+                context['proximo_lote'] = f"cursor={context['proximo_cursor']}"
+        context['eventos'] = eventos
+
+        for evento in eventos:
+            evento.is_owner = organizador_id is not None and evento.organizador_id == organizador_id
+            if is_participante:
+                evento.is_inscrito = evento.inscricao_id is not None
+        self.versoes_eventos = renderizar_cards(eventos, context['is_organizador'])
 
-        eventos_com_propriedades = []
-        for evento in eventos_filtrados:
-            evento.vagas_restantes = evento.capacidade_max - evento.inscricao_set.count()
-            evento.is_owner = (organizador_usuario == evento.organizador)
+        return context
 
-            if is_authenticated and context['is_participante']:
-                try:
-                    inscricao = Inscricao.objects.get(evento=evento, participante__user=user)
-                    evento.is_inscrito = True
-                    evento.inscricao_id = inscricao.id
-                except Inscricao.DoesNotExist:
-                    evento.is_inscrito = False
-                    evento.inscricao_id = None
 
-            eventos_com_propriedades.append(evento)
+class EventoFragmentoView(EventoListView):
+    template_name = 'eventos/evento_cards.html'
+    fragmento = True
+    cabecalhos_em_cache = ('X-Proximo-Lote',)
 
-        context['eventos'] = eventos_com_propriedades
-        return context
+    def render_to_response(self, context, **response_kwargs):
+        response = super().render_to_response(context, **response_kwargs)
+        if context['proximo_lote']:
+            response['X-Proximo-Lote'] = context['proximo_lote']
+        return response
 
 
 class EventoCreateView(LoginRequiredMixin, OrganizadorRequiredMixin, CreateView):
@@ -95,7 +196,7 @@ class EventoCreateView(LoginRequiredMixin, OrganizadorRequiredMixin, CreateView)
     success_url = reverse_lazy('evento-list')
 
     def form_valid(self, form):
-        form.instance.organizador = self.request.organizador_logado
+        form.instance.organizador_id = self.request.organizador_logado_id
         return super().form_valid(form)
 
 
@@ -105,6 +206,13 @@ class EventoUpdateView(LoginRequiredMixin, OrganizadorRequiredMixin, EventoOwner
     template_name = 'eventos/evento_form.html'
     success_url = reverse_lazy('evento-list')
 
+    def form_valid(self, form):
+        response = super().form_valid(form)
+        # Capacidade aumentada: as vagas novas vão primeiro para a lista de espera
+        if self.object.vagas_restantes > 0:
+            promover_da_espera(self.object.pk, limite=self.object.vagas_restantes)
+        return response
+
     def get_initial(self):
         initial = super().get_initial()
         if self.object:
@@ -116,6 +224,48 @@ class EventoDeleteView(LoginRequiredMixin, OrganizadorRequiredMixin, EventoOwner
     model = Evento
     success_url = reverse_lazy('evento-list')
 
+    def form_valid(self, form):
+        excluir_eventos(Evento.objects.filter(pk=self.object.pk))
+        return redirect(self.get_success_url())
+
+
+class InscricaoImportarView(LoginRequiredMixin, OrganizadorRequiredMixin, EventoOwnerRequiredMixin, FormView):
+    form_class = ImportarInscricoesForm
+    template_name = 'eventos/evento_importar.html'
+    success_url = reverse_lazy('evento-list')
+    erros_exibidos = 10
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['evento'] = get_object_or_404(Evento, pk=self.kwargs['pk'])
+        return context
+
+    def form_valid(self, form):
+        evento = get_object_or_404(Evento, pk=self.kwargs['pk'])
+        try:
+            resultado = importar_inscricoes(evento, form.cleaned_data['arquivo'])
+        except ImportacaoRecusada as erro:
+            form.add_error('arquivo', f'Importação cancelada: {erro}')
+            return self.form_invalid(form)
+
+        messages.success(
+            self.request,
+            f'{resultado["inscritos"]} inscrições importadas para "{evento.titulo}" '
+            f'({resultado["usuarios_criados"]} usuários novos, {resultado["ja_inscritos"]} já inscritos).'
+        )
+        erros = resultado['erros']
+        if erros:
+            detalhes = '; '.join(
+                f'linha {linha}: {mensagem}' if linha else mensagem
+                for linha, mensagem in erros[:self.erros_exibidos]
+            )
+            restantes = len(erros) - self.erros_exibidos
+            messages.warning(
+                self.request,
+                f'{len(erros)} linhas ignoradas — {detalhes}' + (f' e mais {restantes}.' if restantes > 0 else '.')
+            )
+        return super().form_valid(form)
+
 
 class ParticipanteSignUpView(CreateView):
     model = User
@@ -137,46 +287,18 @@ class ParticipanteSignUpView(CreateView):
         return (response)
 
 
-class ParticipanteListView(LoginRequiredMixin, ParticipanteRequiredMixin, ListView):
-    model = Participante
+class ParticipanteListView(LoginRequiredMixin, ParticipanteRequiredMixin, HistoricoPerfilMixin, TemplateView):
     template_name = 'eventos/perfil_participante.html'
-    context_object_name ='perfil_p'
-
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-
-        participante = get_object_or_404(Participante, user=self.request.user)
-        minhas_inscricoes = Inscricao.objects.filter(participante=participante).order_by('-data_envio')
-        total_inscricoes = minhas_inscricoes.count()
-
-        context['participante'] = participante
-        context['inscricoes'] = minhas_inscricoes
-        context['total_inscricoes'] = total_inscricoes
-
-        return context
 
 
-class ParticipanteUpdateView(LoginRequiredMixin, ParticipanteRequiredMixin, UpdateView):
+class ParticipanteUpdateView(LoginRequiredMixin, ParticipanteRequiredMixin, HistoricoPerfilMixin, UpdateView):
     model = Participante
     form_class = ParticipanteForm
     template_name = 'eventos/perfil_participante_update.html'
     success_url = reverse_lazy('perfil-participante')
 
     def get_object(self, queryset=None):
-        return get_object_or_404(Participante, user=self.request.user)
-
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-
-        participante = get_object_or_404(Participante, user=self.request.user)
-        minhas_inscricoes = Inscricao.objects.filter(participante=participante).order_by('-data_envio')
-        total_inscricoes = minhas_inscricoes.count()
-
-        context['participante'] = participante
-        context['inscricoes'] = minhas_inscricoes
-        context['total_inscricoes'] = total_inscricoes
-
-        return context
+        return self.get_perfil().participante
 
 
 class ParticipanteDeleteView(LoginRequiredMixin, ParticipanteRequiredMixin, DeleteView):
@@ -186,13 +308,9 @@ class ParticipanteDeleteView(LoginRequiredMixin, ParticipanteRequiredMixin, Dele
     def get_object(self, queryset=None):
         return get_object_or_404(Participante, user=self.request.user)
 
-    def post(self, request, *args, **kwargs):
-        participante = self.get_object()
-        user_to_delete = participante.user
-        response = super().post(request, *args, **kwargs)
-        user_to_delete.delete()
-
-        return response
+    def form_valid(self, form):
+        excluir_participante(self.object)
+        return redirect(self.get_success_url())
 
 
 class OrganizadorSignUpView(CreateView):
@@ -215,49 +333,18 @@ class OrganizadorSignUpView(CreateView):
         return response
 
 
-class OrganizadorListView(LoginRequiredMixin, OrganizadorRequiredMixin, ListView):
-    model = Organizador
+class OrganizadorListView(LoginRequiredMixin, OrganizadorRequiredMixin, HistoricoPerfilMixin, TemplateView):
     template_name = 'eventos/perfil_organizador.html'
-    context_object_name = 'perfil_o'
 
-    def get_object(self):
-        return get_object_or_404(Organizador, user=self.request.user)
-
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
 
-        organizador = get_object_or_404(Organizador, user=self.request.user)
-        meus_eventos = Evento.objects.filter(organizador=organizador).order_by('-data')
-        total_eventos = meus_eventos.count()
-
-        context['organizador'] = organizador
-        context['eventos'] = meus_eventos
-        context['total_eventos'] = total_eventos
-
-        return context
-
-
-class OrganizadorUpdateView(LoginRequiredMixin, OrganizadorRequiredMixin, UpdateView):
+class OrganizadorUpdateView(LoginRequiredMixin, OrganizadorRequiredMixin, HistoricoPerfilMixin, UpdateView):
     model = Organizador
     form_class = OrganizadorForm
     template_name = 'eventos/perfil_organizador_update.html'
     success_url = reverse_lazy('perfil-organizador')
 
-    def get_object(self):
-        return get_object_or_404(Organizador, user=self.request.user)
-
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-
-        organizador = get_object_or_404(Organizador, user=self.request.user)
-        meus_eventos = Evento.objects.filter(organizador=organizador).order_by('-data')
-        total_eventos = meus_eventos.count()
-
-        context['organizador'] = organizador
-        context['eventos'] = meus_eventos
-        context['total_eventos'] = total_eventos
-
-        return context
+    def get_object(self, queryset=None):
+        return self.get_perfil().organizador
 
 class OrganizadorDeleteView(LoginRequiredMixin, OrganizadorRequiredMixin, DeleteView):
     model = Organizador
@@ -266,15 +353,11 @@ class OrganizadorDeleteView(LoginRequiredMixin, OrganizadorRequiredMixin, Delete
     def get_object(self, queryset=None):
         return get_object_or_404(Organizador, user=self.request.user)
 
-    def post(self, request, *args, **kwargs):
-        organizador = self.get_object()
-        user_to_delete = organizador.user
-        response = super().post(request, *args, **kwargs)
-        user_to_delete.delete()
-
-        return response
+    def form_valid(self, form):
+        excluir_organizador(self.object)
+        return redirect(self.get_success_url())
 
-class UserUpdateView(LoginRequiredMixin, UpdateView):
+class UserUpdateView(LoginRequiredMixin, HistoricoPerfilMixin, UpdateView):
     model = User
     form_class = UserForm
     template_name = 'eventos/perfil_user_update.html'
@@ -282,92 +365,61 @@ class UserUpdateView(LoginRequiredMixin, UpdateView):
     def get_object(self, queryset=None):
         return self.request.user
 
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        user = self.request.user
-
-        context['is_organizador'] = hasattr(user, 'organizador')
-        context['is_participante'] = hasattr(user, 'participante')
-
-        if context['is_participante']:
-            participante = get_object_or_404(Participante, user=user)
-            minhas_inscricoes = Inscricao.objects.filter(participante=participante).order_by('-data_envio')
-            total_inscricoes = minhas_inscricoes.count()
-            context['participante'] = participante
-            context['inscricoes'] = minhas_inscricoes
-            context['total_inscricoes'] = total_inscricoes
-
-        elif context['is_organizador']:
-            organizador = get_object_or_404(Organizador, user=user)
-            eventos_organizador = Evento.objects.filter(organizador=organizador).order_by('-data')
-            total_eventos = eventos_organizador.count()
-
-            context['organizador'] = organizador
-            context['eventos'] = eventos_organizador
-            context['total_eventos'] = total_eventos
-
-        return context
-
     def get_success_url(self):
-        user = self.request.user
+        perfil = self.request.perfil
 
-        if hasattr(user, 'organizador'):
+        if perfil.is_organizador:
             return reverse_lazy('perfil-organizador')
 
-        elif hasattr(user, 'participante'):
+        elif perfil.is_participante:
             return reverse_lazy('perfil-participante')
 
         return reverse_lazy('home')
 
 
-def enviar_email_confirmacao(participante, evento):
-    html_content = render_to_string('emails/confirmacao_inscricao.html', {
-        'participante': participante,
-        'evento': evento
-    })
-
-    text_content = strip_tags(html_content)
-
-    email = EmailMultiAlternatives(
-        subject='Confirmação de Inscrição no Evento',
-        body=text_content,
-        from_email='senac@eventoscontrole.com.br',
-        to=[participante.user.email]
-    )
-
-    email.attach_alternative(html_content, "text/html")
-    email.send(fail_silently=True)
-
-
 class InscricaoCreateView(LoginRequiredMixin, ParticipanteRequiredMixin, View):
     def post(self, request, evento_id):
         evento = get_object_or_404(Evento, id=evento_id)
+        participante = vincular_usuario(request.perfil, request.user).participante
 
         try:
-            participante = Participante.objects.get(user=request.user)
-        except Participante.DoesNotExist:
-            messages.error(request, 'Você precisa ter um perfil de participante para se inscrever.')
+            inscrever(evento, participante)
+        except CapacidadeEsgotada:
+            return self.entrar_na_espera(evento, participante)
+        except InscricaoRecusada as erro:
+            messages.error(request, erro.mensagem)
             return redirect('evento-list')
 
-        if Inscricao.objects.filter(evento=evento, participante=participante).exists():
-            messages.error(request, 'Você já está inscrito(a) neste evento.')
-            return redirect('evento-list')
+        enviar_email_confirmacao(participante, evento)
 
-        inscricoes_atuais = Inscricao.objects.filter(evento=evento).count()
+        messages.success(request, f'Sua inscrição para o evento "{evento.titulo}" foi confirmada!')
 
-        if inscricoes_atuais >= evento.capacidade_max:
-            messages.error(request, 'Desculpe, a capacidade máxima para este evento já foi atingida.')
-            return redirect('evento-list')
+        return redirect('evento-list')
 
-        Inscricao.objects.create(
-            evento=evento,
-            participante=participante,
-        )
+    def entrar_na_espera(self, evento, participante):
+        try:
+            posicao = entrar_na_espera(evento, participante)
+        except InscricaoRecusada as erro:
+            messages.error(self.request, erro.mensagem)
+            return redirect('evento-list')
 
-        enviar_email_confirmacao(participante, evento)
+        if posicao is None:
+            # Uma vaga abriu nesse meio tempo; o e-mail da promoção já foi enfileirado
+            messages.success(self.request, f'Sua inscrição para o evento "{evento.titulo}" foi confirmada!')
+        else:
+            messages.info(
+                self.request,
+                f'O evento "{evento.titulo}" está lotado. Você está na posição {posicao} da lista de espera '
+                f'e será inscrito(a) automaticamente quando uma vaga for liberada.'
+            )
+        return redirect('evento-list')
 
-        messages.success(request, f'Sua inscrição para o evento "{evento.titulo}" foi confirmada!')
 
+class ListaEsperaDeleteView(LoginRequiredMixin, ParticipanteRequiredMixin, View):
+    def post(self, request, pk):
+        espera = get_object_or_404(ListaEspera, pk=pk, participante_id=request.participante_logado_id)
+        sair_da_espera(espera)
+        messages.success(request, f'Você saiu da lista de espera do evento "{espera.evento.titulo}".')
         return redirect('evento-list')
 
 
@@ -375,25 +427,177 @@ class InscricaoDeleteView(LoginRequiredMixin, ParticipanteRequiredMixin, DeleteV
     model = Inscricao
     success_url = '/eventos'
 
+    def get_queryset(self):
+        return Inscricao.objects.filter(participante__user=self.request.user)
+
+    def form_valid(self, form):
+        cancelar_inscricao(self.object)
+        return redirect(self.get_success_url())
+
 
 class DashboardView(LoginRequiredMixin, OrganizadorRequiredMixin, ListView):
     model = Inscricao
     template_name = 'eventos/dashboard.html'
     context_object_name = 'inscricoes'
+    paginate_by = 50
 
     def get_queryset(self):
         return Inscricao.objects.filter(
-            evento__organizador=self.request.organizador_logado
-        ).select_related('evento', 'participante__user').order_by('-data_envio')
+            evento__organizador_id=self.request.organizador_logado_id
+        ).select_related('evento', 'participante__user').order_by('-data_envio', '-id')
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
+        context.update(resumo_dashboard(self.request.organizador_logado_id))
+        return context
+
+class DashboardExportarView(LoginRequiredMixin, OrganizadorRequiredMixin, View):
+    tabelas = {
+        'inscricoes': (CABECALHO_INSCRICOES, linhas_inscricoes),
+        'eventos': (CABECALHO_EVENTOS, linhas_eventos),
+    }
+    tipos = {
+        'csv': 'text/csv; charset=utf-8',
+        'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    }
+
+    def get(self, request, tabela):
+        if tabela not in self.tabelas:
+            raise Http404('Tabela de exportação inexistente.')
+
+        formato = request.GET.get('formato', 'csv')
+        if formato not in self.tipos:
+            formato = 'csv'
+        gzip = request.GET.get('gzip') == '1'
+
+        cabecalho, linhas = self.tabelas[tabela]
+        nome_arquivo = f'{tabela}.{formato}'
+        content_type = self.tipos[formato]
+        if gzip:
+            nome_arquivo += '.gz'
+            content_type = 'application/gzip'
+
+        blocos = exportar(cabecalho, linhas(request.organizador_logado_id), formato=formato, gzip=gzip)
+        if isinstance(request, ASGIRequest):
+            blocos = blocos_assincronos(blocos)
+        response = StreamingHttpResponse(blocos, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="{nome_arquivo}"'
+        return response
 
-        context['eventos'] = Evento.objects.filter(
-            organizador=self.request.organizador_logado
-        ).order_by('-data')
 
-        return context
+class HomeView(PaginaAnonimaEmCacheMixin, TemplateView):
+    template_name='eventos/home.html'
+
+    async def get(self, request, *args, **kwargs):
+        return self.render_to_response(self.get_context_data(**kwargs))
+
+
+class DisponibilidadeView(View):
+    async def get(self, request):
+        ids = ids_de_eventos(request.GET.get('ids', ''))
+        if not settings.CACHE_CATALOGO:
+            response = JsonResponse(await self.vagas(ids))
+            patch_cache_control(response, max_age=TEMPO_CACHE_DISPONIBILIDADE)
+            return response
+
+        chave = chave_disponibilidade(await aversoes_eventos(ids), ids)
+        etag = quote_etag(hashlib.md5(chave.encode()).hexdigest())
 
-class HomeView(TemplateView):
-    template_name='eventos/home.html'
\ No newline at end of file
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            vagas = await cache.aget(chave)
+            if vagas is None:
+                vagas = await self.vagas(ids)
+                await cache.aset(chave, vagas, TEMPO_CACHE_DISPONIBILIDADE)
+            response = JsonResponse(vagas)
+
+        response['ETag'] = etag
+        patch_cache_control(response, max_age=TEMPO_CACHE_DISPONIBILIDADE)
+        return response
+
+    async def vagas(self, ids):
+        eventos = Evento.objects.filter(pk__in=ids).values_list('pk', 'capacidade_max', 'inscritos')
+        return {str(pk): capacidade - inscritos async for pk, capacidade, inscritos in eventos}
+
+
+class VagasStreamView(View):
+    # Sob o config.asgi o caminho é atendido antes do Django por transmissao.aplicacao_sse,
+    # sem thread por conexão; esta view cobre o roteamento padrão e o WSGI
+    async def get(self, request):
+        # Sob WSGI cada conexão prenderia um worker para sempre; 204 faz o EventSource desistir
+        # e a página segue no polling do JSON de disponibilidade
+        if not isinstance(request, ASGIRequest):
+            return HttpResponse(status=204)
+        if transmissor.total_assinantes >= MAX_ASSINANTES:
+            response = HttpResponse('Muitas conexões abertas.', status=503)
+            response['Retry-After'] = 30
+            return response
+
+        ids = {str(pk) for pk in ids_de_eventos(request.GET.get('ids', ''))} or None
+
+        async def fluxo():
+            assinatura = transmissor.assinar(ids)
+            try:
+                async for mensagem in transmissor.mensagens(assinatura):
+                    yield mensagem
+            finally:
+                # Django cancela o streaming quando o cliente desconecta
+                transmissor.cancelar(assinatura)
+
+        response = StreamingHttpResponse(fluxo(), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+
+class DashboardDadosView(PerfilAssincronoMixin, View):
+    async def get(self, request):
+        perfil = await self.resolver_perfil()
+        if not request.user.is_authenticated:
+            return redirect_to_login(request.get_full_path())
+        if not perfil.is_organizador:
+            return JsonResponse({'erro': 'Apenas usuários com perfil de organizador podem fazer isso.'}, status=403)
+
+        resumo = await aresumo_dashboard(perfil.organizador_id)
+        resumo['eventos'] = [
+            {
+                'id': evento.pk,
+                'titulo': evento.titulo,
+                'data': evento.data,
+                'capacidade_max': evento.capacidade_max,
+                'total_inscritos': evento.total_inscritos,
+                'taxa_ocupacao': round(evento.taxa_ocupacao, 2),
+            }
+            for evento in resumo['eventos']
+        ]
+        return JsonResponse(resumo)
+
+
+class EstatisticasCacheView(StaffRequiredMixin, View):
+    def get(self, request):
+        return JsonResponse(estatisticas_cache())
+
+
+class EstatisticasInstrumentacaoView(StaffRequiredMixin, View):
+    def get(self, request):
+        return JsonResponse(estatisticas_instrumentacao())
+
+
+class MidiaView(View):
+    def get(self, request, nome):
+        # Banners e renditions locais têm o hash do conteúdo no nome: nunca mudam, o cache pode ser eterno
+        try:
+            caminho = armazenamento_local.path(nome)
+        except SuspiciousFileOperation:
+            raise Http404
+        if not os.path.isfile(caminho):
+            raise Http404
+
+        if settings.MIDIA_X_ACCEL_REDIRECT:
+            response = HttpResponse(content_type=mimetypes.guess_type(nome)[0] or 'application/octet-stream')
+            response['X-Accel-Redirect'] = settings.MIDIA_X_ACCEL_REDIRECT + nome
+        else:
+            # FileResponse usa o wsgi.file_wrapper do servidor (sendfile no gunicorn)
+            response = FileResponse(open(caminho, 'rb'))
+        patch_cache_control(response, public=True, max_age=60 * 60 * 24 * 365, immutable=True)
+        return response
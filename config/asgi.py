@@ -13,4 +13,18 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Importado depois do setup do Django, que o get_asgi_application faz
+from django.urls import reverse
+
+from app.transmissao import aplicacao_sse
+
+CAMINHO_STREAM_VAGAS = reverse('evento-vagas-stream')
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'http' and scope['path'] == CAMINHO_STREAM_VAGAS:
+        await aplicacao_sse(scope, receive, send)
+    else:
+        await django_application(scope, receive, send)
@@ -24,8 +24,20 @@ CLOUDINARY_URL = os.getenv("CLOUDINARY_URL")
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
-DEFAULT_FILE_STORAGE = 'cloudinary_storage.storage.MediaCloudinaryStorage'
-STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
+
+# Banners: "local" (disco, endereçado por conteúdo, servido por app.views.MidiaView) ou "cloudinary"
+BANNER_STORAGE = os.getenv("BANNER_STORAGE") or ('cloudinary' if CLOUDINARY_URL else 'local')
+BACKENDS_BANNER = {
+    'local': {'BACKEND': 'app.armazenamento.ArmazenamentoLocal'},
+    'cloudinary': {'BACKEND': 'app.armazenamento.ArmazenamentoCloudinary'},
+}
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage'},
+    'banners': BACKENDS_BANNER[BANNER_STORAGE],
+}
+# Prefixo de uma location "internal" do nginx: a view só autoriza e o nginx envia o arquivo
+MIDIA_X_ACCEL_REDIRECT = os.getenv("MIDIA_X_ACCEL_REDIRECT", "")
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/5.2/howto/deployment/checklist/
@@ -38,6 +50,9 @@ DEBUG = os.getenv("DEBUG")
 
 ALLOWED_HOSTS = os.getenv("ALLOWED_HOSTS").split(',')
 
+# Endereço público do site, para links e imagens em e-mails (o Render define RENDER_EXTERNAL_URL)
+SITE_URL = os.getenv('SITE_URL', os.getenv('RENDER_EXTERNAL_URL', 'http://localhost:8000')).rstrip('/')
+
 # Application definition
 
 INSTALLED_APPS = [
@@ -50,17 +65,18 @@ INSTALLED_APPS = [
     'widget_tweaks',
     'django_filters',
     'cloudinary',
-    'cloudinary_storage',
     'app'
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    'app.middleware.InstrumentacaoMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'app.middleware.PerfilUsuarioMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -100,6 +116,46 @@ DATABASES = {
     }
 }
 
+if DATABASES['default']['ENGINE'] == 'django.db.backends.postgresql':
+    if os.getenv('DB_POOL', 'False') == 'True':
+        # Pool nativo do Django 5.1+ (exige psycopg 3 com psycopg-pool); não combina com CONN_MAX_AGE
+        DATABASES['default']['OPTIONS'] = {
+            'pool': {
+                'min_size': int(os.getenv('DB_POOL_MIN', 2)),
+                'max_size': int(os.getenv('DB_POOL_MAX', 10)),
+                'timeout': int(os.getenv('DB_POOL_TIMEOUT', 10)),
+            },
+        }
+    else:
+        # Conexão persistente por worker; o health check descarta conexões quebradas antes do uso
+        DATABASES['default']['CONN_MAX_AGE'] = int(os.getenv('DB_CONN_MAX_AGE', 60))
+        DATABASES['default']['CONN_HEALTH_CHECKS'] = os.getenv('DB_CONN_HEALTH_CHECKS', 'True') == 'True'
+
+if DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3':
+    # Abrir um arquivo SQLite é barato; conexões persistentes só seguram locks entre requisições
+    DATABASES['default']['CONN_MAX_AGE'] = int(os.getenv('DB_CONN_MAX_AGE', 0))
+    # Transações IMMEDIATE pegam o lock de escrita no BEGIN, evitando "database is locked"
+    # quando duas transações tentam promover um lock de leitura ao mesmo tempo.
+    DATABASES['default']['OPTIONS'] = {'transaction_mode': 'IMMEDIATE', 'timeout': 20}
+    # Banco de testes em arquivo: o SQLite em memória compartilhada recusa escritas
+    # concorrentes ("table is locked") em vez de aguardar, o que quebra os testes de carga.
+    DATABASES['default']['TEST'] = {'NAME': BASE_DIR / 'test_db.sqlite3'}
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'gereventos'),
+    }
+}
+
+if CACHES['default']['BACKEND'].endswith(('LocMemCache', 'FileBasedCache')):
+    # O limite padrão (300 entradas) é menor que um catálogo com alguns milhares de cards
+    CACHES['default']['OPTIONS'] = {'MAX_ENTRIES': 10000}
+
+# Cards, páginas anônimas e disponibilidade em cache, invalidados pelas versões de cada evento guardadas
+# no próprio cache. Com vários workers, essas versões precisam de um cache compartilhado (check app.W002)
+CACHE_CATALOGO = os.getenv('CACHE_CATALOGO', 'True') == 'True'
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -154,5 +210,19 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Fração das requisições medidas pelo InstrumentacaoMiddleware (0 desliga, 1 mede todas)
+INSTRUMENTACAO_AMOSTRAGEM = float(os.getenv('INSTRUMENTACAO_AMOSTRAGEM', 0))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'app.instrumentacao': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+    },
+}
+
 LOGIN_URL = reverse_lazy('login')
 LOGIN_REDIRECT_URL = '/'